@@ -12,11 +12,12 @@ from datetime import datetime, timedelta
 import urllib.parse
 
 from app.db.session import get_db
+from app.api.idempotency import idempotent, IdempotentRoute
 from app.schemas.user import UserCreate, UserResponse, UserLogin, Token
 from app.services.user import create_user, authenticate_user, get_user_by_email
 from app.core.config import settings
 
-router = APIRouter()
+router = APIRouter(route_class=IdempotentRoute)
 logger = logging.getLogger(__name__)
 
 # OAuth2 configuration for Google
@@ -41,6 +42,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encoded_jwt
 
 @router.post("/register", response_model=Dict[str, Any], status_code=status.HTTP_201_CREATED)
+@idempotent
 def register(user_in: UserCreate, response: Response, db: Session = Depends(get_db)) -> Any:
     """
     Register a new user.
@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, UploadFile, File, Form, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from datetime import datetime, time
 import os
 import shutil
 from pathlib import Path
 import uuid
 
 from app.db.session import get_db
-from app.schemas.club import ClubCreate, ClubResponse, ClubUpdate, ClubDetailResponse, PictureUpload
+from app.schemas.club import ClubCreate, ClubResponse, ClubUpdate, ClubDetailResponse, ClubAvailabilityResponse, ClubSearchResponse, ClubNearbyResponse, ClubListItem, PictureUpload, OpeningHours, CourtCreate, CourtResponse
 from app.services.club import (
     create_club as create_club_service, get_clubs_by_owner, get_club_by_id,
     update_club, add_club_picture, remove_club_picture, get_all_clubs_service,
-    get_club_details_service
+    get_club_details_service, get_opening_hours_service, set_opening_hours_service,
+    get_courts_service, add_court_service, deactivate_court_service, search_clubs_service,
+    parse_club_fields, CLUB_SORTS, find_clubs_near_service, get_clubs_details_service
 )
+from app.schemas.club import (
+    DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, MAX_CLUB_PAGE_SIZE, DEFAULT_NEAR_LIMIT, MAX_NEAR_LIMIT, MAX_NEAR_RADIUS_KM,
+    MAX_DETAILS_IDS
+)
+from app.services.availability import search_available_clubs
 from app.api.dependencies import get_current_user
 from app.models import User
 
@@ -32,16 +40,135 @@ def create_club_endpoint(
     """Create a new club"""
     return create_club_service(db=db, club=club, owner_id=current_user.id)
 
-@router.get("/", response_model=List[ClubResponse])
+@router.get("/", response_model=List[ClubListItem], response_model_exclude_unset=True)
 def get_all_clubs(
+    response: Response,
+    name: str = None,
+    town: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    sort: str = Query("id", description=f"One of {', '.join(CLUB_SORTS)}"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return; every column if omitted"),
+    limit: Optional[int] = Query(None, gt=0, le=MAX_CLUB_PAGE_SIZE, description="Page size; omit to get every club"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    db: Session = Depends(get_db)
+):
+    """Get clubs with optional filtering by name, town, and price range.
+
+    Sorting by price, -price, rating (best first) or newest is done in SQL.
+    With `limit`, the cursor for the next page is returned in the
+    X-Next-Cursor header. `fields` selects only the listed columns.
+    """
+    if sort not in CLUB_SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort must be one of {', '.join(CLUB_SORTS)}"
+        )
+    
+    clubs, next_cursor = get_all_clubs_service(
+        db=db, name=name, town=town, min_price=min_price, max_price=max_price,
+        fields=parse_club_fields(fields), sort=sort, cursor=cursor, limit=limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [ClubListItem(**club) for club in clubs]
+
+@router.get("/available", response_model=List[ClubAvailabilityResponse])
+def get_available_clubs(
+    date: str = Query(..., description="Date in YYYY-MM-DD format"),
+    start_time: str = Query("00:00", description="Start of the time window (HH:MM)"),
+    end_time: Optional[str] = Query(None, description="End of the time window (HH:MM), end of day if omitted"),
+    name: str = None,
+    town: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    db: Session = Depends(get_db)
+):
+    """Find clubs with a free time slot in a time window, with the same filters as the club list"""
+    try:
+        requested_date = datetime.strptime(date, '%Y-%m-%d').date()
+        window_start = datetime.strptime(start_time, '%H:%M').time()
+        window_end = datetime.strptime(end_time, '%H:%M').time() if end_time else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date or time format. Use YYYY-MM-DD and HH:MM"
+        )
+    
+    if window_end is not None and window_end != time.min and window_end <= window_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_time must be after start_time"
+        )
+    
+    results = search_available_clubs(
+        db=db, day=requested_date, window_start=window_start, window_end=window_end,
+        name=name, town=town, min_price=min_price, max_price=max_price
+    )
+    return [
+        ClubAvailabilityResponse(**ClubResponse.model_validate(club).model_dump(), free_slots=free_slots)
+        for club, free_slots in results
+    ]
+
+@router.get("/search", response_model=List[ClubSearchResponse])
+def search_clubs(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in the club name, town or description"),
+    town: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    db: Session = Depends(get_db)
+):
+    """Search clubs by text, best matches first. Words match as prefixes and names tolerate typos."""
+    results = search_clubs_service(
+        db=db, q=q, town=town, min_price=min_price, max_price=max_price, limit=limit
+    )
+    return [
+        ClubSearchResponse(**ClubResponse.model_validate(club).model_dump(), rank=round(rank, 4))
+        for club, rank in results
+    ]
+
+@router.get("/near", response_model=List[ClubNearbyResponse])
+def get_clubs_near(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude in degrees"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude in degrees"),
+    limit: int = Query(DEFAULT_NEAR_LIMIT, ge=1, le=MAX_NEAR_LIMIT, description="Number of nearest clubs to return"),
+    radius_km: Optional[float] = Query(None, gt=0, le=MAX_NEAR_RADIUS_KM, description="Only clubs within this distance"),
     name: str = None,
     town: str = None,
     min_price: float = None,
     max_price: float = None,
     db: Session = Depends(get_db)
 ):
-    """Get all clubs in the system with optional filtering by name, town, and price range"""
-    return get_all_clubs_service(db=db, name=name, town=town, min_price=min_price, max_price=max_price)
+    """Find the nearest clubs to a point, with the same filters as the club list. Clubs without coordinates are skipped."""
+    results = find_clubs_near_service(
+        db=db, latitude=lat, longitude=lon, limit=limit, radius_km=radius_km,
+        name=name, town=town, min_price=min_price, max_price=max_price
+    )
+    return [
+        ClubNearbyResponse(**ClubResponse.model_validate(club).model_dump(), distance_km=round(distance, 3))
+        for club, distance in results
+    ]
+
+@router.get("/details", response_model=List[Dict[str, Any]])
+def get_clubs_details(
+    ids: str = Query(..., description=f"Comma-separated club ids, at most {MAX_DETAILS_IDS}"),
+    db: Session = Depends(get_db)
+):
+    """Get the details of several clubs at once, in the requested order. Unknown ids are left out."""
+    try:
+        club_ids = [int(club_id) for club_id in ids.split(",") if club_id.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of integers"
+        )
+    if len(club_ids) > MAX_DETAILS_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_DETAILS_IDS} ids can be requested at once"
+        )
+    return get_clubs_details_service(db, club_ids)
 
 @router.get("/owner/{owner_id}", response_model=List[ClubResponse])
 def get_clubs_by_owner_id(
@@ -87,6 +214,69 @@ def get_club_details(
         )
     return club_details
 
+@router.get("/{club_id}/opening-hours", response_model=OpeningHours)
+def get_opening_hours(
+    club_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get the opening hours and slot length of a club. An empty list of days means the default hours."""
+    club = get_club_by_id(db=db, club_id=club_id)
+    if not club:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Club with id {club_id} not found"
+        )
+    return get_opening_hours_service(db=db, club=club)
+
+@router.put("/{club_id}/opening-hours", response_model=OpeningHours)
+def set_opening_hours(
+    club_id: int,
+    opening_hours: OpeningHours,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Replace the opening hours and slot length of a club. Weekdays left out are closed."""
+    return set_opening_hours_service(
+        db=db,
+        club_id=club_id,
+        opening_hours=opening_hours,
+        owner_id=current_user.id
+    )
+
+@router.get("/{club_id}/courts", response_model=List[CourtResponse])
+def get_courts(
+    club_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get the courts of a club in the order bookings are assigned to them."""
+    club = get_club_by_id(db=db, club_id=club_id)
+    if not club:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Club with id {club_id} not found"
+        )
+    return get_courts_service(db=db, club=club)
+
+@router.post("/{club_id}/courts", response_model=CourtResponse, status_code=status.HTTP_201_CREATED)
+def add_court(
+    club_id: int,
+    court: CourtCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Add a bookable court to a club."""
+    return add_court_service(db=db, club_id=club_id, court=court, owner_id=current_user.id)
+
+@router.delete("/{club_id}/courts/{court_id}", response_model=CourtResponse)
+def deactivate_court(
+    club_id: int,
+    court_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Retire a court. Past reservations keep referring to it."""
+    return deactivate_court_service(db=db, club_id=club_id, court_id=court_id, owner_id=current_user.id)
+
 @router.put("/{club_id}", response_model=ClubResponse)
 def update_club_endpoint(
     club_id: int,
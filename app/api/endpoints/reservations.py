@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import pytz
@@ -8,134 +10,361 @@ import logging
 
 from app.db.session import get_db
 from app.api.dependencies import get_current_user, get_current_user_optional
-from app.models import User, Club, Reservation, PaymentMethodEnum
-from app.schemas.reservation import ReservationBase, ReservationCreate, ReservationResponse, TimeSlot, AvailableSlotsResponse
+from app.api.idempotency import idempotent, IdempotentRoute
+from app.models import User, Club, Reservation, ReservationStatusEnum, PaymentMethodEnum, UserRoleEnum
+from app.schemas.reservation import (
+    ReservationBase, ReservationCreate, ReservationResponse, TimeSlot, AvailableSlotsResponse,
+    ReservationSeriesCreate, ReservationSeriesResponse, SlotHoldCreate, SlotHoldResponse, ClubStatsResponse,
+    WaitlistCreate, WaitlistEntryResponse
+)
+from app.services.availability import (
+    is_overlap_violation, get_court_masks, get_court_masks_range, get_free_courts, get_active_court_ids, mark_reservation_booked,
+    release_reservation, build_slot_grid, build_calendar, get_slot_template, MAX_CALENDAR_DAYS,
+    reservations_committed, reservation_cancel_committed, slot_change_events,
+    reservation_day_masks, held_by_others, get_held_masks, place_slot_hold, release_slot_hold
+)
+from app.services.holds import slot_holds
+from app.services.heatmap import get_occupancy_heatmap, MAX_HEATMAP_DAYS
+from app.services.stats import (
+    add_to_daily_stats, remove_from_daily_stats, get_club_stats, MAX_STATS_DAYS, STATS_GRANULARITIES
+)
+from app.services.availability_cache import booked_mask_cache
+from app.services.waitlist import join_waitlist, get_user_waitlist, leave_waitlist, promote_waitlist
+from app.services.reservation import (
+    create_reservation_series, lock_partition_boundary, assign_courts, get_user_reservations_service, get_club_reservations_service,
+    stream_user_reservations, stream_club_reservations, decode_cursor,
+    export_club_reservations_csv, export_club_reservations_parquet, parquet_export_available
+)
 
-router = APIRouter()
+router = APIRouter(route_class=IdempotentRoute)
 logger = logging.getLogger(__name__)
 
+# Largest page size accepted by the paginated listings
+MAX_PAGE_SIZE = 500
+
+# Inserts tried by one booking when the court it picked turns out to be taken
+BOOKING_ATTEMPTS = 3
+
 # Use the imported schemas instead of redefining here
 
+def check_guest_booking(current_user: Optional[User], guest_name: Optional[str], payment_method) -> None:
+    """Apply the extra booking rules for guests who are not logged in."""
+    # For guest users (not logged in), ensure guest_name is provided
+    if not current_user and not guest_name:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Guest name is required for non-logged-in users"
+        )
+    
+    # If not logged in, only card payment is allowed
+    if not current_user and payment_method != PaymentMethodEnum.CARD:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only card payment is allowed for non-logged-in users"
+        )
+
+def get_owned_club(db: Session, club_id: int, current_user: Optional[User]) -> Club:
+    """Load a club, allowing access only to its owner."""
+    # Verify the club exists
+    club = db.query(Club).filter(Club.id == club_id).first()
+    if not club:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Club not found")
+    
+    # If user is not the club owner, restrict access
+    if not current_user or current_user.id != club.owner_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only club owners can see all reservations"
+        )
+    
+    return club
+
+def listing_filters(
+    scope: Optional[str] = Query(None, pattern="^(upcoming|past|cancelled|all)$", description="Only upcoming, past or cancelled reservations, or all of them; active ones by default"),
+    date_from: Optional[str] = Query(None, alias="from", description="First date in YYYY-MM-DD format"),
+    date_to: Optional[str] = Query(None, alias="to", description="Last date in YYYY-MM-DD format (inclusive)"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page")
+) -> Dict[str, Any]:
+    """Shared query parameters of the reservation listings.
+    
+    The cursor is decoded here so a malformed one is rejected before a
+    streaming response has started.
+    """
+    try:
+        first_day = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+        last_day = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD"
+        )
+    after = decode_cursor(cursor) if cursor else None
+    return {"scope": scope, "first_day": first_day, "last_day": last_day, "after": after}
+
+def resolve_start_time(reservation_time, date_str: Optional[str]) -> datetime:
+    """Turn a request's reservation_time (datetime, or "HH:MM" plus date) into a naive datetime."""
+    # For time slot reservations, the input is in "HH:MM" format plus a date
+    # We'll parse it into a naive datetime first (without timezone)
+    start_time = None
+    
+    logger.info(f"Received reservation_time: {reservation_time}, type: {type(reservation_time)}")
+    
+    if isinstance(reservation_time, str) and ":" in reservation_time:
+        # This is a time string like "14:00" - need to combine with date
+        time_parts = reservation_time.split(":")
+        hour = int(time_parts[0])
+        minute = int(time_parts[1]) if len(time_parts) > 1 else 0
+    
+        # Get date from the request or use today
+        try:
+            if date_str:
+                logger.info(f"Using date from request: {date_str}")
+                reservation_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    
+                # Create a naive datetime (no timezone) with the date and time components
+                start_time = datetime.combine(
+                    reservation_date, 
+                    datetime.min.time().replace(hour=hour, minute=minute)
+                )
+                logger.info(f"Created naive datetime: {start_time}")
+    
+                # NO timezone assignment - we'll keep it naive to avoid conversion
+            else:
+                # Default to today if no date provided
+                today = datetime.now().date()
+                start_time = datetime.combine(
+                    today, 
+                    datetime.min.time().replace(hour=hour, minute=minute)
+                )
+                logger.info(f"Created naive datetime with today's date: {start_time}")
+        except ValueError as e:
+            logger.error(f"Error parsing reservation time: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid date or time format: {e}"
+            )
+    else:
+        # It's a datetime object
+        start_time = reservation_time
+        # Remove timezone if present to ensure consistent behavior
+        if hasattr(start_time, 'tzinfo') and start_time.tzinfo is not None:
+            # Convert to naive datetime at the same wall time
+            start_time = start_time.replace(tzinfo=None)
+        logger.info(f"Using datetime object: {start_time}")
+    
+    return start_time
+
+def pick_court(db: Session, club_id: int, court_id: Optional[int], start_time: datetime, duration: float) -> int:
+    """Choose the court for a booking from the club's availability matrix.
+    
+    A requested court must belong to the club and not be held by someone
+    else; otherwise the first court that is neither booked nor held is
+    taken. The matrix may come from a cache that is stale with several
+    workers; create_reservation then re-picks with repick_court.
+    """
+    if court_id is not None:
+        if court_id not in get_active_court_ids(db, club_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Court not found")
+        if held_by_others(court_id, reservation_day_masks(start_time, duration)):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The requested time slot is currently held by another user"
+            )
+        return court_id
+    
+    free = get_free_courts(db, club_id, start_time, duration)
+    if free:
+        return free[0]
+    if get_free_courts(db, club_id, start_time, duration, include_held=True):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The requested time slot is currently held by another user"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="The requested time slot is already booked"
+    )
+
+def repick_court(db: Session, club_id: int, start_time: datetime, duration: float, hold_id: Optional[str]) -> int:
+    """Choose a court again from the reservations table after the cached pick was already booked."""
+    booked_mask_cache.invalidate(club_id, reservation_day_masks(start_time, duration))
+    courts, conflicts = assign_courts(db, club_id, [start_time], duration, hold_id=hold_id)
+    if start_time in courts:
+        return courts[start_time]
+    if conflicts[start_time] == "Currently held by another user":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The requested time slot is currently held by another user"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="The requested time slot is already booked"
+    )
+
 @router.get("/my-reservations", response_model=List[Dict[str, Any]])
 def get_my_reservations(
+    response: Response,
+    limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE, description="Page size; omit to get every reservation"),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    filters: Dict[str, Any] = Depends(listing_filters),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all reservations for the current user with club information."""
-    # Get all reservations for the current user
-    reservations = db.query(Reservation).filter(Reservation.user_id == current_user.id).all()
-    
-    # Prepare response with enhanced information
-    result = []
-    for reservation in reservations:
-        # Get club information
-        club = db.query(Club).filter(Club.id == reservation.club_id).first()
-        
-        # Determine status based on reservation time
-        now = datetime.now()
-        reservation_end_time = reservation.reservation_time + timedelta(hours=reservation.duration)
-        
-        if reservation_end_time < now:
-            status = "completed"
-        else:
-            status = "confirmed"
-        
-        # Format start and end times
-        start_time = reservation.reservation_time.strftime('%H:%M')
-        end_time = reservation_end_time.strftime('%H:%M')
-        
-        # Create a dictionary with all needed information
-        reservation_data = {
-            "id": reservation.id,
-            "club_id": reservation.club_id,
-            "club_name": club.name if club else "Unknown Club",
-            "date": reservation.reservation_time.strftime('%Y-%m-%d'),
-            "start_time": start_time,
-            "end_time": end_time,
-            "duration": reservation.duration,
-            "status": status,
-            "estimated_price": reservation.estimated_price,
-            "payment_method": reservation.payment_method,
-            "reservation_time": reservation.reservation_time.isoformat(),
-            "created_at": reservation.created_at.isoformat() if reservation.created_at else None,
-            "user_name": current_user.username
-        }
-        
-        result.append(reservation_data)
-    
-    # Sort by reservation time, with upcoming reservations first
-    result.sort(key=lambda x: x["reservation_time"])
+    """Get reservations for the current user with club information.
+    
+    Results are ordered by reservation time. With `limit`, the cursor for the
+    next page is returned in the X-Next-Cursor header. `format=ndjson` streams
+    every matching reservation as one JSON object per line.
+    """
+    if output_format == "ndjson":
+        return StreamingResponse(
+            stream_user_reservations(current_user.id, current_user.username, **filters),
+            media_type="application/x-ndjson"
+        )
     
+    result, next_cursor = get_user_reservations_service(db, current_user, limit=limit, **filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return result
 
 @router.get("/club/{club_id}", response_model=List[Dict[str, Any]])
 def get_club_reservations(
     club_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE, description="Page size; omit to get every reservation"),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    filters: Dict[str, Any] = Depends(listing_filters),
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
-    """Get all reservations for a specific club."""
-    # Verify the club exists
-    club = db.query(Club).filter(Club.id == club_id).first()
-    if not club:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Club not found")
+    """Get reservations for a specific club.
     
-    # If user is not the club owner, restrict access
-    if not current_user or current_user.id != club.owner_id:
+    Supports the same pagination, filters and NDJSON streaming as /my-reservations.
+    """
+    club = get_owned_club(db, club_id, current_user)
+    
+    if output_format == "ndjson":
+        return StreamingResponse(
+            stream_club_reservations(club.id, club.name, **filters),
+            media_type="application/x-ndjson"
+        )
+    
+    result, next_cursor = get_club_reservations_service(db, club, limit=limit, **filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return result
+
+@router.get("/club/{club_id}/stats", response_model=ClubStatsResponse)
+def get_club_stats_dashboard(
+    club_id: int,
+    date_from: str = Query(..., alias="from", description="First date in YYYY-MM-DD format"),
+    date_to: str = Query(..., alias="to", description="Last date in YYYY-MM-DD format (inclusive)"),
+    granularity: str = Query("day", description="day, week or month"),
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """Revenue, hours booked and utilization of a club for its owner, from the daily rollup."""
+    club = get_owned_club(db, club_id, current_user)
+    
+    if granularity not in STATS_GRANULARITIES:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only club owners can see all reservations"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"granularity must be one of {', '.join(STATS_GRANULARITIES)}"
         )
     
-    # Get all reservations for this club
-    reservations = db.query(Reservation).filter(Reservation.club_id == club_id).all()
+    try:
+        first_day = datetime.strptime(date_from, '%Y-%m-%d').date()
+        last_day = datetime.strptime(date_to, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD"
+        )
     
-    # Prepare response with enhanced information
-    result = []
-    for reservation in reservations:
-        # Get user information
-        user = db.query(User).filter(User.id == reservation.user_id).first()
-        
-        # Determine status based on reservation time
-        now = datetime.now()
-        reservation_end_time = reservation.reservation_time + timedelta(hours=reservation.duration)
-        
-        if reservation_end_time < now:
-            status = "completed"
-        else:
-            status = "confirmed"
-        
-        # Format start and end times
-        start_time = reservation.reservation_time.strftime('%H:%M')
-        end_time = reservation_end_time.strftime('%H:%M')
-        
-        # Create a dictionary with all needed information
-        reservation_data = {
-            "id": reservation.id,
-            "club_id": reservation.club_id,
-            "club_name": club.name,
-            "date": reservation.reservation_time.strftime('%Y-%m-%d'),
-            "start_time": start_time,
-            "end_time": end_time,
-            "duration": reservation.duration,
-            "status": status,
-            "estimated_price": reservation.estimated_price,
-            "payment_method": reservation.payment_method,
-            "reservation_time": reservation.reservation_time.isoformat(),
-            "created_at": reservation.created_at.isoformat() if reservation.created_at else None,
-            "user_id": reservation.user_id,
-            "user_name": user.username if user else reservation.guest_name or "Unknown",
-            "guest_name": reservation.guest_name
-        }
-        
-        result.append(reservation_data)
+    if last_day < first_day:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must not be before 'from'"
+        )
     
-    # Sort by reservation time, with upcoming reservations first
-    result.sort(key=lambda x: x["reservation_time"])
+    if (last_day - first_day).days + 1 > MAX_STATS_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_STATS_DAYS} days"
+        )
     
-    return result
+    return get_club_stats(db, club, first_day, last_day, granularity)
+
+@router.get("/heatmap", response_model=Dict[str, Any])
+def get_occupancy_heatmap_endpoint(
+    club_ids: List[int] = Query(..., alias="club_id", description="Club to include; repeat to compare several clubs"),
+    date_from: str = Query(..., alias="from", description="First date in YYYY-MM-DD format"),
+    date_to: str = Query(..., alias="to", description="Last date in YYYY-MM-DD format (inclusive)"),
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """Booking density per weekday and hour of day for one or more of the owner's clubs."""
+    clubs = [get_owned_club(db, club_id, current_user) for club_id in dict.fromkeys(club_ids)]
+    
+    try:
+        first_day = datetime.strptime(date_from, '%Y-%m-%d').date()
+        last_day = datetime.strptime(date_to, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD"
+        )
+    
+    if last_day < first_day:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must not be before 'from'"
+        )
+    
+    if (last_day - first_day).days + 1 > MAX_HEATMAP_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_HEATMAP_DAYS} days"
+        )
+    
+    return get_occupancy_heatmap(db, clubs, first_day, last_day)
+
+@router.get("/club/{club_id}/export")
+def export_club_reservations(
+    club_id: int,
+    output_format: str = Query("csv", alias="format", pattern="^(csv|parquet)$"),
+    filters: Dict[str, Any] = Depends(listing_filters),
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """Export a club's reservations as CSV or Parquet.
+    
+    Rows are streamed from a server-side cursor in chunks, so memory use does not
+    grow with the number of reservations. Accepts the same filters as the listing.
+    """
+    club = get_owned_club(db, club_id, current_user)
+    filename = f"club_{club.id}_reservations"
+    
+    if output_format == "parquet":
+        if not parquet_export_available():
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="Parquet export requires the pyarrow package"
+            )
+        return StreamingResponse(
+            export_club_reservations_parquet(club.id, club.name, **filters),
+            media_type="application/vnd.apache.parquet",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.parquet"'}
+        )
+    
+    return StreamingResponse(
+        export_club_reservations_csv(club.id, club.name, **filters),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+    )
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=ReservationResponse)
+@idempotent
 def create_reservation(
     reservation: ReservationCreate,
     db: Session = Depends(get_db),
@@ -150,69 +379,9 @@ def create_reservation(
         if not club:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Club not found")
         
-        # For guest users (not logged in), ensure guest_name is provided
-        if not current_user and not reservation.guest_name:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Guest name is required for non-logged-in users"
-            )
-        
-        # If not logged in, only card payment is allowed
-        if not current_user and reservation.payment_method != PaymentMethodEnum.CARD:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Only card payment is allowed for non-logged-in users"
-            )
-        
-        # For time slot reservations, the input is in "HH:MM" format plus a date
-        # We'll parse it into a naive datetime first (without timezone)
-        start_time = None
+        check_guest_booking(current_user, reservation.guest_name, reservation.payment_method)
         
-        logger.info(f"Received reservation_time: {reservation.reservation_time}, type: {type(reservation.reservation_time)}")
-        
-        if isinstance(reservation.reservation_time, str) and ":" in reservation.reservation_time:
-            # This is a time string like "14:00" - need to combine with date
-            time_parts = reservation.reservation_time.split(":")
-            hour = int(time_parts[0])
-            minute = int(time_parts[1]) if len(time_parts) > 1 else 0
-            
-            # Get date from the request or use today
-            try:
-                if hasattr(reservation, 'date') and reservation.date:
-                    date_str = reservation.date
-                    logger.info(f"Using date from request: {date_str}")
-                    reservation_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                    
-                    # Create a naive datetime (no timezone) with the date and time components
-                    start_time = datetime.combine(
-                        reservation_date, 
-                        datetime.min.time().replace(hour=hour, minute=minute)
-                    )
-                    logger.info(f"Created naive datetime: {start_time}")
-                    
-                    # NO timezone assignment - we'll keep it naive to avoid conversion
-                else:
-                    # Default to today if no date provided
-                    today = datetime.now().date()
-                    start_time = datetime.combine(
-                        today, 
-                        datetime.min.time().replace(hour=hour, minute=minute)
-                    )
-                    logger.info(f"Created naive datetime with today's date: {start_time}")
-            except ValueError as e:
-                logger.error(f"Error parsing reservation time: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid date or time format: {e}"
-                )
-        else:
-            # It's a datetime object
-            start_time = reservation.reservation_time
-            # Remove timezone if present to ensure consistent behavior
-            if hasattr(start_time, 'tzinfo') and start_time.tzinfo is not None:
-                # Convert to naive datetime at the same wall time
-                start_time = start_time.replace(tzinfo=None)
-            logger.info(f"Using datetime object: {start_time}")
+        start_time = resolve_start_time(reservation.reservation_time, reservation.date)
         
         logger.info(f"Final reservation start time (naive): {start_time}")
         
@@ -220,61 +389,95 @@ def create_reservation(
         end_time = start_time + timedelta(hours=reservation.duration)
         logger.info(f"Reservation end time: {end_time}")
         
-        # Make sure dates are consistent - all naive datetimes
-        requested_date = start_time.date()
-        day_start = datetime.combine(requested_date, datetime.min.time())
-        day_end = datetime.combine(requested_date, datetime.max.time())
-        
-        logger.info(f"Checking reservations between {day_start} and {day_end}")
-        
-        # Query all reservations for this club on the requested date
-        # Note: In SQLAlchemy queries, it'll handle timezone conversions for us
-        day_reservations = db.query(Reservation).filter(
-            Reservation.club_id == reservation.club_id,
-            Reservation.reservation_time >= day_start,
-            Reservation.reservation_time <= day_end
-        ).all()
-        
-        # Check for overlaps manually
-        for existing_res in day_reservations:
-            # Get naive datetime for consistent comparison
-            existing_start = existing_res.reservation_time
-            if existing_start.tzinfo is not None:
-                existing_start = existing_start.replace(tzinfo=None)
-                
-            existing_end = existing_start + timedelta(hours=existing_res.duration)
-            
-            logger.info(f"Comparing with existing reservation: {existing_start} to {existing_end}")
-            
-            # Both datetimes are now naive, comparison is consistent
-            if start_time < existing_end and end_time > existing_start:
-                logger.warning(f"Time slot already booked: {start_time} to {end_time} overlaps with {existing_start} to {existing_end}")
+        user_id = current_user.id if current_user else None
+        if reservation.hold_id:
+            # A matching hold already checked opening hours and the index, and picked the court
+            hold = slot_holds.get(reservation.hold_id)
+            if hold is not None and hold.user_id != user_id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="This hold belongs to another user"
+                )
+            if hold is None or not hold.covers(club.id, start_time, reservation.duration):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Your hold has expired or does not match this booking"
+                )
+            court_id = hold.court_id
+        else:
+            if not get_slot_template(db, club).covers(start_time, reservation.duration):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="The requested time slot is already booked"
+                    detail="The requested time is outside the club's opening hours"
                 )
+            court_id = pick_court(db, club.id, reservation.court_id, start_time, reservation.duration)
         
         # Calculate estimated price
         estimated_price = club.hourly_price * reservation.duration
+        club_id = club.id
         
         # Convert enum to string for SQLAlchemy
         payment_method_value = reservation.payment_method.value
         logger.info(f"Using payment method value: {payment_method_value}")
         
-        # Create the reservation - using naive datetime to avoid timezone conversions
-        new_reservation = Reservation(
-            club_id=reservation.club_id,
-            user_id=current_user.id if current_user else None,
-            reservation_time=start_time,  # Use naive datetime
-            duration=reservation.duration,
-            guest_name=reservation.guest_name,
-            payment_method=payment_method_value,  # Use string value directly
-            estimated_price=estimated_price
-        )
+        for attempt in range(BOOKING_ATTEMPTS):
+            if attempt:
+                # The court was picked from a stale view; ask the database which one is free
+                court_id = repick_court(db, club_id, start_time, reservation.duration, reservation.hold_id)
+            
+            # Near a month start the booking can overlap one in the neighbouring
+            # partition, which the per-partition constraint does not see
+            if lock_partition_boundary(db, club_id, [start_time], reservation.duration):
+                _, conflicts = assign_courts(
+                    db, club_id, [start_time], reservation.duration, court_id=court_id, hold_id=reservation.hold_id
+                )
+                if conflicts and reservation.court_id is None:
+                    court_id = repick_court(db, club_id, start_time, reservation.duration, reservation.hold_id)
+                elif conflicts:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="The requested time slot is already booked"
+                    )
+            
+            # Create the reservation - using naive datetime to avoid timezone conversions.
+            # Overlaps are rejected by the reservations_no_overlap constraints, so the
+            # insert is attempted directly instead of scanning the day first.
+            new_reservation = Reservation(
+                club_id=club_id,
+                court_id=court_id,
+                user_id=user_id,
+                reservation_time=start_time,  # Use naive datetime
+                duration=reservation.duration,
+                guest_name=reservation.guest_name,
+                payment_method=payment_method_value,  # Use string value directly
+                estimated_price=estimated_price
+            )
+            
+            db.add(new_reservation)
+            try:
+                db.flush()
+                break
+            except IntegrityError as e:
+                db.rollback()
+                if not is_overlap_violation(e):
+                    raise
+                logger.warning(f"Court {court_id} already booked: {start_time} to {end_time} for club {club_id}")
+                # A court the user asked for has no substitute
+                if reservation.court_id is not None or attempt == BOOKING_ATTEMPTS - 1:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="The requested time slot is already booked"
+                    )
+        
+        # Keep the availability index and daily stats in step within the same transaction
+        mark_reservation_booked(db, new_reservation)
+        add_to_daily_stats(db, [new_reservation])
         
-        db.add(new_reservation)
         db.commit()
         db.refresh(new_reservation)
+        if reservation.hold_id:
+            slot_holds.release(reservation.hold_id)
+        reservations_committed([new_reservation])
         
         logger.info(f"Reservation created successfully: {new_reservation.id} for {new_reservation.reservation_time.strftime('%Y-%m-%d %H:%M')}")
         return new_reservation
@@ -289,18 +492,145 @@ def create_reservation(
             detail=f"Error creating reservation: {str(e)}"
         )
 
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=ReservationSeriesResponse)
+def create_reservations_bulk(
+    series: ReservationSeriesCreate,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """Create a recurring series or a list of reservations at the same time of day.
+    
+    All occurrences are checked against existing bookings with one query and the
+    free ones are inserted in a single transaction. Taken occurrences are reported
+    in `conflicts`.
+    """
+    club = db.query(Club).filter(Club.id == series.club_id).first()
+    if not club:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Club not found")
+    
+    check_guest_booking(current_user, series.guest_name, series.payment_method)
+    
+    created, conflicts = create_reservation_series(
+        db=db,
+        club=club,
+        series=series,
+        user_id=current_user.id if current_user else None
+    )
+    return {"created": created, "conflicts": conflicts}
+
+@router.post("/holds", status_code=status.HTTP_201_CREATED, response_model=SlotHoldResponse)
+def create_slot_hold(
+    hold: SlotHoldCreate,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """Hold a time slot for a few minutes while the booking form is completed.
+    
+    Pass the returned hold_id with POST /reservations/ to book the held slot.
+    Other users see held slots as unavailable until the hold is used,
+    released or expires.
+    """
+    club = db.query(Club).filter(Club.id == hold.club_id).first()
+    if not club:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Club not found")
+    
+    start_time = resolve_start_time(hold.reservation_time, hold.date)
+    if start_time < datetime.now():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot book time slots in the past"
+        )
+    
+    slot_hold = place_slot_hold(
+        db=db,
+        club=club,
+        start_time=start_time,
+        duration=hold.duration,
+        user_id=current_user.id if current_user else None,
+        court_id=hold.court_id
+    )
+    return {
+        "hold_id": slot_hold.hold_id,
+        "club_id": slot_hold.club_id,
+        "court_id": slot_hold.court_id,
+        "reservation_time": slot_hold.start_time,
+        "duration": slot_hold.duration,
+        "expires_at": slot_hold.expires_at
+    }
+
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_slot_hold(
+    hold_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Release one of your holds that will not be used. Guest holds simply expire."""
+    hold = slot_holds.get(hold_id)
+    # Other users' holds are reported as missing, like unknown ones
+    if hold is None or hold.user_id != current_user.id or release_slot_hold(hold_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hold not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post("/waitlist", status_code=status.HTTP_201_CREATED, response_model=WaitlistEntryResponse)
+def create_waitlist_entry(
+    waitlist: WaitlistCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue for a slot that is already booked or held.
+    
+    When the slot is cancelled, queued users are booked in the order they
+    joined; check GET /reservations/waitlist for the resulting reservation_id.
+    """
+    club = db.query(Club).filter(Club.id == waitlist.club_id).first()
+    if not club:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Club not found")
+    
+    return join_waitlist(
+        db=db,
+        club=club,
+        user=current_user,
+        start_time=resolve_start_time(waitlist.reservation_time, waitlist.date),
+        duration=waitlist.duration,
+        payment_method=waitlist.payment_method
+    )
+
+@router.get("/waitlist", response_model=List[WaitlistEntryResponse])
+def get_my_waitlist(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List the current user's waitlist entries, waiting and promoted."""
+    return get_user_waitlist(db, current_user)
+
+@router.delete("/waitlist/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_waitlist_entry(
+    entry_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Leave the waitlist for a slot."""
+    leave_waitlist(db, entry_id, current_user)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 @router.delete("/{reservation_id}", response_model=Dict[str, Any])
 def cancel_reservation(
     reservation_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
-    """Cancel an existing reservation and return its details."""
+    """Cancel an existing reservation and return its details.
+    
+    Users waiting for the freed time are promoted after the response is sent.
+    """
     reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
     
     if not reservation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
     
+    if reservation.is_cancelled:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Reservation is already cancelled")
+    
     # Check permissions: only the user who made the reservation or the club owner can cancel it
     if current_user:
         club = db.query(Club).filter(Club.id == reservation.club_id).first()
@@ -318,7 +648,7 @@ def cancel_reservation(
             detail="Authentication required to cancel a reservation"
         )
     
-    # Get reservation details before deletion
+    # Get reservation details for the response
     club_name = "Unknown Club"
     if club := db.query(Club).filter(Club.id == reservation.club_id).first():
         club_name = club.name
@@ -349,9 +679,19 @@ def cancel_reservation(
         "user_name": user_name
     }
     
-    # Delete the reservation
-    db.delete(reservation)
+    # Keep the row for history, but take it out of every active-only check,
+    # and free its slots in the availability index
+    reservation.status = ReservationStatusEnum.CANCELLED
+    reservation.cancelled_at = datetime.now(pytz.utc)
+    reservation.cancelled_by_id = current_user.id
+    db.flush()
+    release_reservation(db, reservation)
+    remove_from_daily_stats(db, reservation)
     db.commit()
+    reservation_cancel_committed(reservation)
+    background_tasks.add_task(
+        promote_waitlist, reservation.club_id, reservation.reservation_time, reservation.end_time
+    )
     
     return reservation_info
 
@@ -387,95 +727,107 @@ def get_available_slots(
             detail="Cannot book time slots in the past"
         )
     
-    # Create naive datetime bounds for the requested date
-    day_start = datetime.combine(requested_date, datetime.min.time())
-    day_end = datetime.combine(requested_date, datetime.max.time())
-    
-    logger.info(f"Querying reservations between {day_start} and {day_end}")
-    
-    # Get ALL reservations for this club on the requested date
-    reservations = db.query(Reservation).filter(
-        Reservation.club_id == club_id,
-        Reservation.reservation_time >= day_start,
-        Reservation.reservation_time <= day_end
-    ).all()
-    
-    # Also validate the time range query with a more explicit query
-    # This will ensure we catch any reservations with date issues
-    club_reservations = db.query(Reservation).filter(
-        Reservation.club_id == club_id
-    ).all()
-    
-    # Filter manually to ensure we catch all reservations on this date
-    date_reservations = []
-    for res in club_reservations:
-        res_time = res.reservation_time
-        if res_time.tzinfo is not None:
-            res_time = res_time.replace(tzinfo=None)
-        
-        if res_time.date() == requested_date:
-            date_reservations.append(res)
-    
-    # Log comprehensive info about all found reservations
-    logger.info(f"Found {len(reservations)} existing reservations from primary query")
-    logger.info(f"Found {len(date_reservations)} reservations from secondary validation query")
-    
-    # Combine results from both queries to be extra sure
-    all_reservations = list(set(reservations + date_reservations))
-    logger.info(f"Total unique reservations for club {club_id} on {requested_date}: {len(all_reservations)}")
-    
-    # Log each reservation for debugging
-    for res in all_reservations:
-        res_time = res.reservation_time
-        # Ensure time is naive for consistent processing
-        if res_time.tzinfo is not None:
-            res_time = res_time.replace(tzinfo=None)
-        logger.info(f"Existing reservation: ID={res.id}, Time={res_time.strftime('%Y-%m-%d %H:%M')}, Duration={res.duration}h")
-    
-    # Collect all hours that are booked
-    reservation_hours = set()  # Use a set for faster lookups
-    for res in all_reservations:
-        # Get naive time for consistent processing
-        res_time = res.reservation_time
-        if res_time.tzinfo is not None:
-            res_time = res_time.replace(tzinfo=None)
-            
-        # Add all hours covered by the reservation
-        start_hour = res_time.hour
-        end_hour = start_hour + int(res.duration)
-        
-        for hour in range(start_hour, end_hour):
-            reservation_hours.add(hour)
-            logger.info(f"Marking hour {hour} as reserved from reservation ID={res.id}")
+    # Served from the availability cache, or a single primary-key lookup in
+    # the availability index on a miss
+    court_masks = get_court_masks(db, club_id, requested_date)
+    held_masks = get_held_masks({requested_date: court_masks})[requested_date]
+    all_slots = build_slot_grid(get_slot_template(db, club), requested_date, court_masks, held_masks)
     
-    logger.info(f"Reserved hours: {sorted(reservation_hours)}")
+    available_count = len([s for s in all_slots if s['is_available']])
+    logger.info(f"Returning {len(all_slots)} time slots for club {club_id} on {requested_date} with {available_count} available")
     
-    # Define available hours (could be customized based on club settings)
-    open_hour = 8  # 8 AM
-    close_hour = 22  # 10 PM
+    return all_slots
+
+@router.get("/available-slots/{club_id}/events")
+def subscribe_available_slots(
+    club_id: int,
+    date: str = Query(..., description="Date in YYYY-MM-DD format"),
+    db: Session = Depends(get_db)
+):
+    """Push slot changes for a club and date as server-sent events.
     
-    # Generate all possible time slots as the UI would display them
-    all_slots = []
+    The stream starts with a `snapshot` event holding the same slot list as
+    /available-slots, followed by `delta` events listing only the slots whose
+    availability changed, so clients no longer need to poll.
+    """
+    club = db.query(Club).filter(Club.id == club_id).first()
+    if not club:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Club not found")
     
-    for hour in range(open_hour, close_hour):
-        # Format as the UI expects (HH:00)
-        slot_time = f"{hour:02d}:00"
-        
-        # Slot is unavailable if the hour appears in reserved hours
-        is_available = hour not in reservation_hours
-        
-        # Add the slot with its availability status
-        slot_info = {
-            "start_time": slot_time,
-            "end_time": f"{(hour+1):02d}:00",
-            "is_available": is_available,
-            "date": requested_date.strftime("%Y-%m-%d")
-        }
-        
-        logger.info(f"Slot {slot_info['start_time']} is {'available' if is_available else 'unavailable'}")
-        all_slots.append(slot_info)
+    try:
+        requested_date = datetime.strptime(date, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD"
+        )
     
-    available_count = len([s for s in all_slots if s['is_available']])
-    logger.info(f"Returning {len(all_slots)} time slots for {requested_date} with {available_count} available")
+    if requested_date < datetime.now().date():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot book time slots in the past"
+        )
+    
+    return StreamingResponse(
+        slot_change_events(club_id, get_slot_template(db, club), requested_date),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/availability-cache/stats", response_model=Dict[str, Any])
+def get_availability_cache_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Hit/miss counters of this worker's availability cache (admins only)."""
+    if current_user.role != UserRoleEnum.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can view cache statistics"
+        )
+    return booked_mask_cache.stats()
+
+@router.get("/availability/{club_id}", response_model=List[Dict[str, Any]])
+def get_availability_calendar(
+    club_id: int,
+    date_from: str = Query(..., alias="from", description="First date in YYYY-MM-DD format"),
+    date_to: str = Query(..., alias="to", description="Last date in YYYY-MM-DD format (inclusive)"),
+    db: Session = Depends(get_db)
+):
+    """Get the time slot grid for every day in a date range with a single query."""
+    # Verify the club exists
+    club = db.query(Club).filter(Club.id == club_id).first()
+    if not club:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Club not found")
+    
+    # Parse the dates
+    try:
+        first_day = datetime.strptime(date_from, '%Y-%m-%d').date()
+        last_day = datetime.strptime(date_to, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD"
+        )
+    
+    if last_day < first_day:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must not be before 'from'"
+        )
+    
+    if (last_day - first_day).days + 1 > MAX_CALENDAR_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_CALENDAR_DAYS} days"
+        )
+    
+    if first_day < datetime.now().date():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot book time slots in the past"
+        )
+    
+    court_masks = get_court_masks_range(db, club_id, first_day, last_day)
+    logger.info(f"Returning availability for club {club_id} from {first_day} to {last_day}")
     
-    return all_slots 
\ No newline at end of file
+    return build_calendar(get_slot_template(db, club), court_masks, get_held_masks(court_masks))
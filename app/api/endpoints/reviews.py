@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 
 from app.api.dependencies import get_db, get_current_user
+from app.api.idempotency import idempotent, IdempotentRoute
 from app.models import User, Club
 from app.schemas import ReviewCreate, ReviewResponse, ReviewWithUser, CommentCreate, CommentResponse, CommentWithUser, CommentWithReplies
 from app.services import (
@@ -14,9 +15,10 @@ from app.services import (
     get_club_by_id
 )
 
-router = APIRouter()
+router = APIRouter(route_class=IdempotentRoute)
 
 @router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
+@idempotent
 def create_review(
     review: ReviewCreate,
     db: Session = Depends(get_db),
@@ -73,6 +75,7 @@ def get_club_average_rating(
     return {"average_rating": get_club_average_rating_service(db=db, club_id=club_id)}
 
 @router.post("/comments", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
+@idempotent
 def create_comment(
     comment: CommentCreate,
     db: Session = Depends(get_db),
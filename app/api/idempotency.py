@@ -0,0 +1,177 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+
+# Keys longer than this are rejected instead of being stored
+MAX_KEY_LENGTH = 255
+
+# Responses larger than this are passed through without being stored
+MAX_STORED_BODY = 64 * 1024
+
+
+def idempotent(endpoint: Callable) -> Callable:
+    """Mark a POST endpoint as honouring the Idempotency-Key header.
+
+    Must be placed below the router decorator, on a router created with
+    route_class=IdempotentRoute.
+    """
+    endpoint.idempotent = True
+    return endpoint
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    deadline: float
+
+
+class IdempotencyStore:
+    """Bounded, expiring store of first responses, with per-key in-flight tracking.
+
+    Entries are kept in LRU order and dropped after IDEMPOTENCY_TTL seconds.
+    While a request for a key is running, duplicates wait on its event
+    instead of running the endpoint a second time.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._responses: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Event] = {}
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        stored = self._responses.get(key)
+        if stored is None:
+            return None
+        if stored.deadline < time.monotonic():
+            del self._responses[key]
+            return None
+        self._responses.move_to_end(key)
+        return stored
+
+    def begin(self, key: str) -> Optional[asyncio.Event]:
+        """Claim a key. Returns the event to wait on if another request holds it."""
+        running = self._in_flight.get(key)
+        if running is not None:
+            return running
+        self._in_flight[key] = asyncio.Event()
+        return None
+
+    def finish(self, key: str, response: Optional[StoredResponse]) -> None:
+        if response is not None:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+        self._in_flight.pop(key).set()
+
+
+class IdempotentRoute(APIRoute):
+    """Route class that replays the first response of endpoints marked with @idempotent.
+
+    Requests carrying an Idempotency-Key header are keyed by the key, the
+    path and the caller's credentials. The check runs before dependencies
+    are resolved, so a repeat with the same body gets the stored status,
+    headers and body back without any database work. A repeat with a
+    different body is rejected with 422. 5xx responses are not stored, so
+    those requests can be retried.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "idempotent", False):
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+            if idempotency_key is None:
+                return await handler(request)
+            if len(idempotency_key) > MAX_KEY_LENGTH:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"
+                )
+
+            # Different users (or anonymous callers) never share keys
+            credentials = request.headers.get("authorization", "") + "|" + request.cookies.get("access_token", "")
+            key = hashlib.sha256(
+                "|".join([idempotency_key, request.url.path, hashlib.sha256(credentials.encode()).hexdigest()]).encode()
+            ).hexdigest()
+            fingerprint = hashlib.sha256(await request.body()).hexdigest()
+
+            while True:
+                stored = idempotency_store.get(key)
+                if stored is not None:
+                    if stored.fingerprint != fingerprint:
+                        raise HTTPException(
+                            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail="Idempotency-Key was already used with a different request body"
+                        )
+                    return _replay(stored)
+
+                running = idempotency_store.begin(key)
+                if running is None:
+                    break
+                # A duplicate is in flight; wait for it and replay its response
+                await running.wait()
+
+            stored = None
+            try:
+                response = await handler(request)
+                stored = _stored_response(fingerprint, response.status_code, response.raw_headers, getattr(response, "body", None))
+                return response
+            except HTTPException as e:
+                body = json.dumps({"detail": e.detail}).encode()
+                headers = [(b"content-type", b"application/json")]
+                headers += [(name.lower().encode(), value.encode()) for name, value in (e.headers or {}).items()]
+                stored = _stored_response(fingerprint, e.status_code, headers, body)
+                raise
+            finally:
+                idempotency_store.finish(key, stored)
+
+        return idempotent_handler
+
+
+def _stored_response(fingerprint: str, status_code: int, headers, body: Optional[bytes]) -> Optional[StoredResponse]:
+    # Streaming responses and server errors are never replayed
+    if body is None or status_code >= 500 or len(body) > MAX_STORED_BODY:
+        return None
+    return StoredResponse(
+        fingerprint=fingerprint,
+        status=status_code,
+        headers=[(name, value) for name, value in headers if name != b"content-length"],
+        body=body,
+        deadline=time.monotonic() + idempotency_store.ttl_seconds
+    )
+
+
+def _replay(stored: StoredResponse) -> Response:
+    logger.info("Replaying stored response for repeated Idempotency-Key")
+    response = Response(content=stored.body, status_code=stored.status)
+    response.raw_headers.extend(stored.headers)
+    response.raw_headers.append((REPLAYED_HEADER, b"true"))
+    return response
+
+
+idempotency_store = IdempotencyStore(
+    max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+    ttl_seconds=settings.IDEMPOTENCY_TTL
+)
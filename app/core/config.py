@@ -21,6 +21,24 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_DAYS: int = 15
     
+    # Availability cache (per worker process); a size or TTL of 0 disables it
+    AVAILABILITY_CACHE_SIZE: int = int(os.getenv("AVAILABILITY_CACHE_SIZE", "20000"))
+    AVAILABILITY_CACHE_TTL: float = float(os.getenv("AVAILABILITY_CACHE_TTL", "30"))
+    
+    # Seconds before the in-process club location index is reloaded from the database
+    CLUB_LOCATION_INDEX_TTL: float = float(os.getenv("CLUB_LOCATION_INDEX_TTL", "300"))
+    
+    # Slot change push: "local" for a single worker, "postgres" (LISTEN/NOTIFY) for several
+    SLOT_EVENTS_BACKEND: str = os.getenv("SLOT_EVENTS_BACKEND", "local")
+    
+    # Tentative slot holds taken while a user fills in the booking form
+    SLOT_HOLD_MINUTES: int = int(os.getenv("SLOT_HOLD_MINUTES", "5"))
+    SLOT_HOLDS_MAX: int = int(os.getenv("SLOT_HOLDS_MAX", "10000"))
+    
+    # Stored first responses for requests sent with an Idempotency-Key header
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+    IDEMPOTENCY_TTL: float = float(os.getenv("IDEMPOTENCY_TTL", str(24 * 60 * 60)))
+    
     @property
     def get_database_url(self) -> str:
         if self.DATABASE_URL:
@@ -0,0 +1,190 @@
+"""Monthly range partitions of the reservations table.
+
+reservations is partitioned by RANGE (reservation_time), one partition per
+calendar month plus a default partition for anything outside the prepared
+range. Queries that bound reservation_time only touch the partitions they
+need. Partitions of past months can be detached into an archive schema
+(optionally on a cold tablespace) with ``manage_reservation_partitions.py``;
+rebuilds of the tables derived from reservations only rewrite the days after
+the last archived month (see archive_horizon). Archived tables no longer
+follow schema changes of the parent, so migrations that alter reservations
+apply the same change to them.
+
+PostgreSQL cannot enforce the booking overlap constraint on the partitioned
+parent, so every partition gets its own copy. Two bookings in different
+partitions can only collide when one of them crosses a month start; those
+bookings are serialised and checked explicitly (see
+app.services.reservation.lock_partition_boundary).
+"""
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+import re
+
+from sqlalchemy import text
+
+PARENT_TABLE = "reservations"
+DEFAULT_PARTITION = "reservations_default"
+ARCHIVE_SCHEMA = "reservations_archive"
+
+# Name (prefix) of the per-partition exclusion constraints that reject overlapping bookings
+OVERLAP_CONSTRAINT_NAME = "reservations_no_overlap"
+
+# Predicate of the overlap constraints and partial indexes; cancelled rows are kept
+# for history but never take part in overlap checks
+ACTIVE_RESERVATION = "status = 'active'"
+
+# Longest booking accepted, which bounds how far a booking can reach into the next month
+MAX_BOOKING_HOURS = 24
+
+# Months of partitions kept ready ahead of the current one
+MONTHS_AHEAD = 24
+
+_PARTITION_NAME = re.compile(r"^reservations_y(\d{4})m(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"reservations_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def crosses_month_boundary(start: datetime, duration: float) -> bool:
+    """True when a booking could overlap a booking stored in another partition.
+
+    That is the case when it runs past the next month start, or begins less
+    than MAX_BOOKING_HOURS after its own month start (where a booking from the
+    previous month may still be running).
+    """
+    next_month = datetime.combine(add_months(month_start(start.date()), 1), datetime.min.time())
+    this_month = datetime.combine(month_start(start.date()), datetime.min.time())
+    return (
+        start + timedelta(hours=duration) > next_month
+        or start - this_month < timedelta(hours=MAX_BOOKING_HOURS)
+    )
+
+
+def _add_overlap_constraint(conn, table: str) -> None:
+    suffix = table[len(PARENT_TABLE) + 1:]
+    conn.execute(text(
+        f"ALTER TABLE {table} ADD CONSTRAINT {OVERLAP_CONSTRAINT_NAME}_{suffix} "
+        "EXCLUDE USING gist (court_id WITH =, "
+        "tsrange(reservation_time, reservation_time + duration * interval '1 hour') WITH &&) "
+        f"WHERE ({ACTIVE_RESERVATION})"
+    ))
+
+
+def _table_exists(conn, name: str, schema: str = "public") -> bool:
+    return conn.execute(text("SELECT to_regclass(:name)"), {"name": f"{schema}.{name}"}).scalar() is not None
+
+
+def create_default_partition(conn) -> bool:
+    if _table_exists(conn, DEFAULT_PARTITION):
+        return False
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+    _add_overlap_constraint(conn, DEFAULT_PARTITION)
+    return True
+
+
+def create_month_partition(conn, month: date) -> bool:
+    """Create and attach the partition for one month, if it does not exist yet.
+
+    Rows that were parked in the default partition for that month are moved
+    into the new partition before it is attached.
+    """
+    name = partition_name(month)
+    if _table_exists(conn, name) or _table_exists(conn, name, ARCHIVE_SCHEMA):
+        return False
+
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    _add_overlap_constraint(conn, name)
+    if _table_exists(conn, DEFAULT_PARTITION):
+        conn.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE reservation_time >= '{lower}' AND reservation_time < '{upper}' RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ))
+    conn.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    ))
+    return True
+
+
+def ensure_partitions(conn, first_month: date, last_month: date) -> List[str]:
+    """Make sure the default partition and every month in [first_month, last_month] exist."""
+    created = [DEFAULT_PARTITION] if create_default_partition(conn) else []
+    month = month_start(first_month)
+    while month <= last_month:
+        if create_month_partition(conn, month):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def attached_partitions(conn) -> List[str]:
+    rows = conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PARENT_TABLE}).scalars().all()
+    return sorted(rows)
+
+
+def archived_partitions(conn) -> List[str]:
+    rows = conn.execute(text(
+        "SELECT tablename FROM pg_tables WHERE schemaname = :schema"
+    ), {"schema": ARCHIVE_SCHEMA}).scalars().all()
+    return sorted(name for name in rows if partition_month(name) is not None)
+
+
+def archive_horizon(conn) -> Optional[date]:
+    """First day whose reservations are all still attached, or None when nothing is archived.
+
+    Archiving always takes the oldest months, so every month before the
+    horizon lives in the archive schema and is invisible to queries on
+    reservations. Rebuilds of derived tables must leave those days alone.
+    """
+    months = [partition_month(name) for name in archived_partitions(conn)]
+    return add_months(max(months), 1) if months else None
+
+
+def archive_partitions(conn, before_month: date, tablespace: Optional[str] = None) -> List[str]:
+    """Detach month partitions older than before_month into the archive schema.
+
+    The archived tables stay queryable as reservations_archive.<name> but are
+    no longer seen by any query on reservations. With a tablespace they are
+    also moved to (cold) storage.
+    """
+    conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+    archived = []
+    for name in attached_partitions(conn):
+        month = partition_month(name)
+        if month is None or month >= before_month:
+            continue
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        if tablespace:
+            conn.execute(text(f'ALTER TABLE {ARCHIVE_SCHEMA}.{name} SET TABLESPACE "{tablespace}"'))
+        archived.append(name)
+    return archived
+
+
+def create_initial_partitions(target, connection, **kw) -> None:
+    """after_create hook so create_all builds a usable partitioned table."""
+    if connection.dialect.name != "postgresql":
+        return
+    today = date.today()
+    ensure_partitions(connection, month_start(today), add_months(month_start(today), MONTHS_AHEAD))
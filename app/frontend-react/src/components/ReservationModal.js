@@ -63,12 +63,18 @@ const ReservationModal = ({ club, isOpen, onClose, isLoggedIn, userData }) => {
     }
   }, [club, duration, timeSlots.length]);
 
-  // Refetch time slots when date changes
+  // Follow live slot changes for the selected date instead of fetching once
   useEffect(() => {
     if (isOpen && club && date) {
       // Clear the selected time slot when date changes
       setSelectedTimeSlot(null);
-      fetchAvailableTimeSlots();
+      setLoading(true);
+      setError("");
+      const unsubscribe = reservationService.subscribeToTimeSlots(club.id, date, (data) => {
+        applyTimeSlots(data);
+        setLoading(false);
+      });
+      return unsubscribe;
     }
   }, [date, club, isOpen]);
   
@@ -112,88 +118,97 @@ const ReservationModal = ({ club, isOpen, onClose, isLoggedIn, userData }) => {
     setTimeSlots(updatedSlots);
   };
   
-  const fetchAvailableTimeSlots = async () => {
-    setLoading(true);
-    setError("");
-    setSelectedTimeSlot(null); // Clear selection when fetching new slots
+  // Show a slot list from the server, keeping slots booked in this session unavailable
+  const applyTimeSlots = (data) => {
+    console.log("Available time slots:", data);
     
-    try {
-      console.log(`Fetching available slots for club ${club.id} on date ${date}`);
-      const data = await reservationService.getAvailableTimeSlots(club.id, date);
-      console.log("Available time slots:", data);
+    // Drop the selection if the slot was just taken by someone else
+    setSelectedTimeSlot(selected => {
+      if (!selected || !Array.isArray(data)) return selected;
+      const current = data.find(slot => slot.start_time === selected.start_time);
+      return current && current.is_available ? selected : null;
+    });
+    
+    // Make a deep copy to avoid reference issues with the array
+    if (Array.isArray(data)) {
+      // Sort time slots by time for better UI presentation
+      const sortedData = [...data].sort((a, b) => {
+        // Convert time strings to comparable values (e.g., '14:00' to 1400)
+        const timeA = parseInt(a.start_time.replace(':', ''));
+        const timeB = parseInt(b.start_time.replace(':', ''));
+        return timeA - timeB;
+      });
       
-      // Make a deep copy to avoid reference issues with the array
-      if (Array.isArray(data)) {
-        // Sort time slots by time for better UI presentation
-        const sortedData = [...data].sort((a, b) => {
-          // Convert time strings to comparable values (e.g., '14:00' to 1400)
-          const timeA = parseInt(a.start_time.replace(':', ''));
-          const timeB = parseInt(b.start_time.replace(':', ''));
-          return timeA - timeB;
-        });
-        
-        // Apply any slots booked during this session that might not be
-        // reflected in the backend response yet
-        let bookedSlots = [];
-        try {
-          // Try to get previously booked slots from sessionStorage
-          const savedBookedSlots = sessionStorage.getItem('bookedTimeSlots');
-          if (savedBookedSlots) {
-            bookedSlots = JSON.parse(savedBookedSlots);
-            console.log("Found previously booked slots in session:", bookedSlots);
-            
-            // Filter slots relevant to this club and date
-            const relevantBookedSlots = bookedSlots.filter(slot => 
-              slot.clubId === club.id && slot.date === date
-            );
+      // Apply any slots booked during this session that might not be
+      // reflected in the backend response yet
+      let bookedSlots = [];
+      try {
+        // Try to get previously booked slots from sessionStorage
+        const savedBookedSlots = sessionStorage.getItem('bookedTimeSlots');
+        if (savedBookedSlots) {
+          bookedSlots = JSON.parse(savedBookedSlots);
+          console.log("Found previously booked slots in session:", bookedSlots);
+          
+          // Filter slots relevant to this club and date
+          const relevantBookedSlots = bookedSlots.filter(slot => 
+            slot.clubId === club.id && slot.date === date
+          );
+          
+          if (relevantBookedSlots.length > 0) {
+            console.log("Applying booked slots from session to UI:", relevantBookedSlots);
             
-            if (relevantBookedSlots.length > 0) {
-              console.log("Applying booked slots from session to UI:", relevantBookedSlots);
-              
-              // Mark booked slots as unavailable
-              const updatedWithBookedSlots = sortedData.map(slot => {
-                // Find if this slot is in our booked slots
-                const matchingBookedSlot = relevantBookedSlots.find(
-                  bookedSlot => bookedSlot.time === slot.start_time
-                );
-                
-                if (matchingBookedSlot) {
-                  // Mark as unavailable, and if permanent, add the permanent flag
-                  return { 
-                    ...slot, 
-                    is_available: false,
-                    is_permanently_booked: matchingBookedSlot.permanent || false
-                  };
-                }
-                return slot;
-              });
-              
-              // Now check duration-based availability
-              setTimeSlots(updatedWithBookedSlots);
+            // Mark booked slots as unavailable
+            const updatedWithBookedSlots = sortedData.map(slot => {
+              // Find if this slot is in our booked slots
+              const matchingBookedSlot = relevantBookedSlots.find(
+                bookedSlot => bookedSlot.time === slot.start_time
+              );
               
-              // Need to delay to ensure the state is updated
-              setTimeout(() => {
-                updateAvailableSlotsForDuration();
-              }, 0);
-              
-              setLoading(false);
-              return;
-            }
+              if (matchingBookedSlot) {
+                // Mark as unavailable, and if permanent, add the permanent flag
+                return { 
+                  ...slot, 
+                  is_available: false,
+                  is_permanently_booked: matchingBookedSlot.permanent || false
+                };
+              }
+              return slot;
+            });
+            
+            // Now check duration-based availability
+            setTimeSlots(updatedWithBookedSlots);
+            
+            // Need to delay to ensure the state is updated
+            setTimeout(() => {
+              updateAvailableSlotsForDuration();
+            }, 0);
+            
+            return;
           }
-        } catch (error) {
-          console.error("Error reading booked slots from session:", error);
         }
-        
-        // If no session booked slots or error, just use the sorted data
-        setTimeSlots(sortedData);
-        
-        // Update availability based on duration after state is updated
-        setTimeout(() => {
-          updateAvailableSlotsForDuration();
-        }, 0);
-      } else {
-        setTimeSlots([]);
+      } catch (error) {
+        console.error("Error reading booked slots from session:", error);
       }
+      
+      // If no session booked slots or error, just use the sorted data
+      setTimeSlots(sortedData);
+      
+      // Update availability based on duration after state is updated
+      setTimeout(() => {
+        updateAvailableSlotsForDuration();
+      }, 0);
+    } else {
+      setTimeSlots([]);
+    }
+  };
+  
+  const fetchAvailableTimeSlots = async () => {
+    setLoading(true);
+    setError("");
+    
+    try {
+      console.log(`Fetching available slots for club ${club.id} on date ${date}`);
+      applyTimeSlots(await reservationService.getAvailableTimeSlots(club.id, date));
     } catch (error) {
       console.error("Error fetching time slots:", error);
       setError(error.message || "An error occurred while fetching available time slots");
@@ -418,7 +433,7 @@ const ReservationModal = ({ club, isOpen, onClose, isLoggedIn, userData }) => {
     setDate(newDate);
     
     // Keep all permanently booked times in session storage
-    // They will be applied when fetchAvailableTimeSlots runs
+    // They will be applied when the new date's slot list arrives
   };
   
   if (!isOpen) return null;
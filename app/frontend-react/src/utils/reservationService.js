@@ -84,12 +84,136 @@ const getAvailableTimeSlots = async (clubId, date) => {
   }
 };
 
+/**
+ * Subscribe to live slot changes for a club on a date instead of polling
+ * @param {number} clubId - Club ID
+ * @param {string} date - Date in YYYY-MM-DD format
+ * @param {Function} onSlots - Called with the full slot list, first on connect and then after every change
+ * @returns {Function} Call to close the subscription
+ */
+const subscribeToTimeSlots = (clubId, date, onSlots) => {
+  const source = new EventSource(`${API_PATH}/reservations/available-slots/${clubId}/events?date=${date}`);
+  let slots = [];
+
+  source.addEventListener('snapshot', (event) => {
+    slots = JSON.parse(event.data);
+    onSlots(slots);
+  });
+
+  source.addEventListener('delta', (event) => {
+    const changed = new Map(JSON.parse(event.data).map(slot => [slot.start_time, slot]));
+    slots = slots.map(slot => changed.get(slot.start_time) || slot);
+    onSlots(slots);
+  });
+
+  source.onerror = (error) => {
+    // EventSource reconnects on its own and receives a fresh snapshot
+    console.error('Slot event stream error:', error);
+  };
+
+  return () => source.close();
+};
+
+/**
+ * Get the time slot grid for every day in a date range in one request
+ * @param {number} clubId - Club ID
+ * @param {string} fromDate - First date in YYYY-MM-DD format
+ * @param {string} toDate - Last date in YYYY-MM-DD format (inclusive, at most 31 days after fromDate)
+ * @returns {Promise<Array>} Array of { date, slots } objects, one per day
+ */
+const getAvailabilityCalendar = async (clubId, fromDate, toDate) => {
+  try {
+    const response = await fetch(`${API_PATH}/reservations/availability/${clubId}?from=${fromDate}&to=${toDate}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json'
+      }
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw {
+        status: response.status,
+        message: errorData.detail || `Error ${response.status}: ${response.statusText}`
+      };
+    }
+
+    const data = await response.json();
+    return data;
+  } catch (error) {
+    console.error('Error fetching availability calendar:', error);
+    throw error;
+  }
+};
+
+/**
+ * Hold a time slot for a few minutes while the booking form is filled in
+ * @param {Object} holdData - { club_id, reservation_time (HH:MM), date (YYYY-MM-DD), duration }
+ * @returns {Promise<Object>} { hold_id, expires_at, ... }; pass hold_id to createReservation
+ */
+const holdTimeSlot = async (holdData) => {
+  try {
+    const token = getToken();
+    const headers = {
+      'Content-Type': 'application/json'
+    };
+    
+    if (token) {
+      headers['Authorization'] = `Bearer ${token}`;
+    }
+
+    const response = await fetch(`${API_PATH}/reservations/holds`, {
+      method: 'POST',
+      headers,
+      body: JSON.stringify(holdData)
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw {
+        status: response.status,
+        message: errorData.detail || `Error ${response.status}: ${response.statusText}`
+      };
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error('Error holding time slot:', error);
+    throw error;
+  }
+};
+
+/**
+ * Release a hold that will not be used (e.g. the booking modal was closed)
+ * Only logged-in users can release their holds; guest holds expire on their own.
+ * @param {string} holdId - Hold ID returned by holdTimeSlot
+ */
+const releaseHold = async (holdId) => {
+  const token = getToken();
+  if (!token) {
+    return;
+  }
+  
+  try {
+    await fetch(`${API_PATH}/reservations/holds/${holdId}`, {
+      method: 'DELETE',
+      headers: {
+        'Authorization': `Bearer ${token}`
+      }
+    });
+  } catch (error) {
+    // The hold expires on its own anyway
+    console.error('Error releasing hold:', error);
+  }
+};
+
 /**
  * Create a new reservation
- * @param {Object} reservationData - Reservation data
+ * @param {Object} reservationData - Reservation data (may include hold_id from holdTimeSlot)
+ * @param {string} [idempotencyKey] - Key to reuse across retries of the same booking
  * @returns {Promise<Object>} Created reservation object
  */
-const createReservation = async (reservationData) => {
+const createReservation = async (reservationData, idempotencyKey = null) => {
   try {
     const token = getToken();
     const headers = {
@@ -100,6 +224,11 @@ const createReservation = async (reservationData) => {
       headers['Authorization'] = `Bearer ${token}`;
     }
 
+    // Reuse the same key when retrying so the server replays the first result
+    if (idempotencyKey) {
+      headers['Idempotency-Key'] = idempotencyKey;
+    }
+
     // Make a copy of the data to send to the server
     // The backend now expects reservation_time as a string (HH:MM) plus a separate date field
     // No need to convert to ISO format - the backend will handle that
@@ -201,6 +330,10 @@ const cancelReservation = async (reservationId) => {
 const reservationService = {
   getMyReservations,
   getAvailableTimeSlots,
+  subscribeToTimeSlots,
+  getAvailabilityCalendar,
+  holdTimeSlot,
+  releaseHold,
   createReservation,
   cancelReservation
 };
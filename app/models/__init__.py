@@ -1,4 +1,7 @@
 from app.models.user import User, UserRoleEnum, UserBadgeEnum
-from app.models.club import Club
+from app.models.club import Club, ClubOpeningHours, Court
 from app.models.review import Review, Comment
-from app.models.reservation import Reservation, PaymentMethodEnum 
\ No newline at end of file
+from app.models.reservation import Reservation, PaymentMethodEnum, ReservationStatusEnum
+from app.models.availability import ClubDayAvailability
+from app.models.stats import ClubDailyStats
+from app.models.waitlist import WaitlistEntry, WaitlistStatusEnum
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import BIT
+from sqlalchemy.sql import func
+from sqlalchemy.sql.sqltypes import TIMESTAMP
+from sqlalchemy.types import TypeDecorator
+
+from app.db.session import Base
+
+# The availability index works on quarter-hour slots, so any booking that
+# starts and ends on a 15 minute boundary maps to an exact set of bits.
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+
+class SlotMask(TypeDecorator):
+    """A day's slot bitmap stored as BIT(96).
+
+    Python sees a plain int where bit ``i`` is slot ``i`` of the day. In the
+    database the leftmost bit is slot 0 (00:00), so the raw value reads in
+    time order in psql.
+    """
+    impl = BIT(SLOTS_PER_DAY)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return format(value, f"0{SLOTS_PER_DAY}b")[::-1]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return int(value[::-1], 2)
+
+
+class ClubDayAvailability(Base):
+    """Booked-slot bitmap for one court of a club on one day.
+
+    Maintained by the reservation endpoints and rebuildable from the
+    ``reservations`` table with ``rebuild_availability_index.py``.
+    """
+    __tablename__ = "club_day_availability"
+
+    club_id = Column(Integer, ForeignKey("clubs.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    court_id = Column(Integer, ForeignKey("courts.id", ondelete="CASCADE"), primary_key=True)
+    booked_mask = Column(SlotMask, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
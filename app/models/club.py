@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, JSON, Time, Boolean, UniqueConstraint, Index, Computed, DDL, event, case, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from typing import List, Optional
@@ -7,8 +8,28 @@ import json
 
 from app.db.session import Base
 
+# Text search configuration of the club search vector. 'simple' does no
+# stemming, which suits proper names and keeps prefix matching predictable.
+SEARCH_CONFIG = "simple"
+
+# Weighted document searched by /clubs/search: name, then town, then description
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(town, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')"
+)
+
 class Club(Base):
     __tablename__ = "clubs"
+    __table_args__ = (
+        Index("ix_clubs_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram indexes serve fuzzy matching and the substring ILIKE filters
+        Index("ix_clubs_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_clubs_town_trgm", "town", postgresql_using="gin", postgresql_ops={"town": "gin_trgm_ops"}),
+        # Keysets of the price and newest sorts of the club list, scanned in either direction
+        Index("ix_clubs_hourly_price_id", "hourly_price", "id"),
+        Index("ix_clubs_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
@@ -17,10 +38,20 @@ class Club(Base):
     hourly_price = Column(Float, nullable=False)
     description = Column(Text, nullable=True)
     address = Column(String, nullable=True)
+    latitude = Column(Float, nullable=True)  # WGS84 degrees, set with longitude
+    longitude = Column(Float, nullable=True)
     website = Column(String, nullable=True)
     social_media = Column(JSON, nullable=True)
     pictures = Column(JSON, nullable=True, default="[]")
+    slot_minutes = Column(Integer, nullable=False, default=60, server_default="60")  # booking granularity
+    # Review and comment aggregates, kept up to date by the review service and
+    # repaired by reconcile_club_counters.py
+    rating_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    reviews_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
     owner_id = Column(Integer, ForeignKey("users.id"))
+    # Maintained by the database; deferred so ordinary club loads skip it
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now())
     
@@ -30,6 +61,13 @@ class Club(Base):
     reviews = relationship("Review", back_populates="club")
     comments = relationship("Comment", back_populates="club")
     reservations = relationship("Reservation", back_populates="club")
+    opening_hours = relationship("ClubOpeningHours", back_populates="club", cascade="all, delete-orphan")
+    courts = relationship("Court", back_populates="club", cascade="all, delete-orphan", order_by="Court.position, Court.id")
+    
+    @property
+    def average_rating(self) -> float:
+        """Mean review rating, 0 for clubs without reviews."""
+        return self.rating_sum / self.reviews_count if self.reviews_count else 0.0
     
     def add_picture(self, picture_url: str) -> None:
         """Add a picture URL to the club's pictures list."""
@@ -57,4 +95,60 @@ class Club(Base):
         try:
             return json.loads(self.pictures)
         except (TypeError, json.JSONDecodeError):
-            return [] 
\ No newline at end of file
+            return []
+
+
+
+# SQL form of Club.average_rating; the rating sort of the club list uses it
+# verbatim so that the expression index below applies
+CLUB_AVERAGE_RATING = case(
+    (Club.reviews_count > literal_column("0"), Club.rating_sum.op("/")(Club.reviews_count)),
+    else_=literal_column("0.0", Float)
+)
+
+Index("ix_clubs_average_rating_id", CLUB_AVERAGE_RATING, Club.id)
+
+# The trigram indexes need the pg_trgm operator classes
+event.listen(
+    Club.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+class ClubOpeningHours(Base):
+    """Opening hours of a club on one weekday (0 = Monday).
+
+    A club without any rows uses the default hours; once hours are set,
+    weekdays without a row are closed. A close_time of 00:00 means midnight.
+    """
+    __tablename__ = "club_opening_hours"
+    __table_args__ = (
+        UniqueConstraint("club_id", "weekday", name="uq_club_opening_hours_club_id_weekday"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    club_id = Column(Integer, ForeignKey("clubs.id", ondelete="CASCADE"), nullable=False)
+    weekday = Column(Integer, nullable=False)
+    open_time = Column(Time, nullable=False)
+    close_time = Column(Time, nullable=False)
+    
+    club = relationship("Club", back_populates="opening_hours")
+
+
+class Court(Base):
+    """A bookable court (or other resource) of a club.
+
+    Every reservation is assigned to one court, and overlapping bookings are
+    only rejected on the same court. Retired courts are deactivated rather
+    than deleted so their booking history stays intact.
+    """
+    __tablename__ = "courts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    club_id = Column(Integer, ForeignKey("clubs.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    position = Column(Integer, nullable=False, default=0, server_default="0")  # display and assignment order
+    is_active = Column(Boolean, nullable=False, default=True, server_default="true")
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    
+    club = relationship("Club", back_populates="courts")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum as SQLAlchemyEnum, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum as SQLAlchemyEnum, DateTime, Index, DDL, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import TIMESTAMP
@@ -6,6 +6,7 @@ import enum
 from datetime import datetime, timedelta
 
 from app.db.session import Base
+from app.db.partitions import OVERLAP_CONSTRAINT_NAME, ACTIVE_RESERVATION, create_initial_partitions
 
 
 class PaymentMethodEnum(str, enum.Enum):
@@ -13,30 +14,67 @@ class PaymentMethodEnum(str, enum.Enum):
     CARD = "card"
 
 
+class ReservationStatusEnum(str, enum.Enum):
+    ACTIVE = "active"
+    CANCELLED = "cancelled"
+    # Not stored; reported for active reservations that have already ended
+    COMPLETED = "completed"
+
+
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Availability and overlap lookups only ever want active bookings
+        Index(
+            "ix_reservations_club_id_reservation_time", "club_id", "reservation_time",
+            postgresql_where=text(ACTIVE_RESERVATION)
+        ),
+        Index("ix_reservations_user_id_reservation_time", "user_id", "reservation_time"),
+        Index(
+            "ix_reservations_court_id_reservation_time", "court_id", "reservation_time",
+            postgresql_where=text(ACTIVE_RESERVATION)
+        ),
+        # Monthly partitions, see app.db.partitions. Each partition carries its own
+        # exclusion constraint so two bookings for the same court cannot overlap.
+        {"postgresql_partition_by": "RANGE (reservation_time)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    # The partition key has to be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     club_id = Column(Integer, ForeignKey("clubs.id"), nullable=False)
+    court_id = Column(Integer, ForeignKey("courts.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     # Store datetime without timezone to avoid conversion issues
-    reservation_time = Column(DateTime(timezone=False), nullable=False)
+    reservation_time = Column(DateTime(timezone=False), primary_key=True)
     duration = Column(Float, nullable=False, default=1.0)  # in hours
     guest_name = Column(String, nullable=True)
     payment_method = Column(SQLAlchemyEnum(PaymentMethodEnum, native_enum=False), nullable=False)
     estimated_price = Column(Float, nullable=False)
+    status = Column(
+        SQLAlchemyEnum(ReservationStatusEnum, native_enum=False, values_callable=lambda e: [m.value for m in e]),
+        nullable=False,
+        default=ReservationStatusEnum.ACTIVE,
+        server_default=ReservationStatusEnum.ACTIVE.value
+    )
+    cancelled_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    cancelled_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now())
     
     # Relationships
     club = relationship("Club", back_populates="reservations")
-    user = relationship("User", back_populates="reservations")
+    court = relationship("Court")
+    user = relationship("User", back_populates="reservations", foreign_keys=[user_id])
     
     @property
     def end_time(self):
         """Calculate the end time based on reservation time and duration"""
         return self.reservation_time + timedelta(hours=self.duration)
     
+    @property
+    def is_cancelled(self):
+        return self.status == ReservationStatusEnum.CANCELLED
+    
     @property
     def is_past(self):
         """Check if the reservation is in the past"""
@@ -49,4 +87,19 @@ class Reservation(Base):
         # If now has timezone but end time doesn't, make end timezone-aware
         elif now.tzinfo is not None and end.tzinfo is None:
             now = now.replace(tzinfo=None)
-        return end < now 
\ No newline at end of file
+        return end < now
+
+
+# GiST needs btree_gist to index the plain integer court_id equality
+event.listen(
+    Reservation.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql")
+)
+
+# A partitioned table holds no rows itself; create the default and monthly partitions
+event.listen(
+    Reservation.__table__,
+    "after_create",
+    create_initial_partitions
+)
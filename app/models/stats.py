@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.sql.sqltypes import TIMESTAMP
+
+from app.db.session import Base
+
+
+class ClubDailyStats(Base):
+    """Per-club, per-day booking totals for owner dashboards.
+
+    Reservations count towards the day they start on. Kept up to date by the
+    reservation endpoints and rebuildable with ``rebuild_daily_stats.py``.
+    """
+    __tablename__ = "club_daily_stats"
+
+    club_id = Column(Integer, ForeignKey("clubs.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    reservations_count = Column(Integer, nullable=False, default=0)
+    booked_hours = Column(Float, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
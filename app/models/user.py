@@ -42,7 +42,7 @@ class User(Base):
     member_of_club = relationship("Club", back_populates="members", foreign_keys=[member_of_club_id])
     reviews = relationship("Review", back_populates="user")
     comments = relationship("Comment", back_populates="user")
-    reservations = relationship("Reservation", back_populates="user")
+    reservations = relationship("Reservation", back_populates="user", foreign_keys="Reservation.user_id")
     
     def add_badge(self, badge: UserBadgeEnum):
         """Add a badge to the user's collection if they don't already have it"""
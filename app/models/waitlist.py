@@ -0,0 +1,56 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Enum as SQLAlchemyEnum, DateTime, Index, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from sqlalchemy.sql.sqltypes import TIMESTAMP
+import enum
+
+from app.db.session import Base
+from app.models.reservation import PaymentMethodEnum
+
+
+class WaitlistStatusEnum(str, enum.Enum):
+    WAITING = "waiting"
+    PROMOTED = "promoted"
+    CANCELLED = "cancelled"
+
+
+class WaitlistEntry(Base):
+    """A user queued for a club slot that was fully booked.
+
+    When a cancellation frees the slot, waiting entries are turned into
+    reservations in queue order (see app.services.waitlist).
+    """
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        # Promotion looks up the waiting entries of a club around the freed time
+        Index(
+            "ix_waitlist_entries_club_id_reservation_time", "club_id", "reservation_time",
+            postgresql_where=text("status = 'waiting'")
+        ),
+        # A user queues at most once for the same slot
+        Index(
+            "uq_waitlist_entries_waiting_slot", "club_id", "user_id", "reservation_time",
+            unique=True,
+            postgresql_where=text("status = 'waiting'")
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    club_id = Column(Integer, ForeignKey("clubs.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    reservation_time = Column(DateTime(timezone=False), nullable=False)
+    duration = Column(Float, nullable=False, default=1.0)  # in hours
+    payment_method = Column(SQLAlchemyEnum(PaymentMethodEnum, native_enum=False), nullable=False)
+    status = Column(
+        SQLAlchemyEnum(WaitlistStatusEnum, native_enum=False, values_callable=lambda e: [m.value for m in e]),
+        nullable=False,
+        default=WaitlistStatusEnum.WAITING,
+        server_default=WaitlistStatusEnum.WAITING.value
+    )
+    # Set on promotion; not a foreign key because reservations are keyed by (id, reservation_time)
+    reservation_id = Column(Integer, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    promoted_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    club = relationship("Club")
+    user = relationship("User")
@@ -1,7 +1,7 @@
 from app.schemas.user import UserCreate, UserLogin, UserResponse, UserUpdate, UserRoleEnum
-from app.schemas.club import ClubCreate, ClubResponse, ClubUpdate, ClubDetailResponse
+from app.schemas.club import ClubCreate, ClubResponse, ClubUpdate, ClubDetailResponse, ClubAvailabilityResponse, ClubSearchResponse, ClubNearbyResponse, ClubListItem, OpeningHours, OpeningHoursDay, CourtCreate, CourtResponse
 from app.schemas.review import ReviewCreate, ReviewResponse, ReviewWithUser, CommentCreate, CommentResponse, CommentWithUser, CommentWithReplies
-from app.schemas.reservation import ReservationBase, ReservationCreate, ReservationResponse, TimeSlot, AvailableSlotsResponse, PaymentMethodEnum
+from app.schemas.reservation import ReservationBase, ReservationCreate, ReservationResponse, TimeSlot, AvailableSlotsResponse, PaymentMethodEnum, ReservationSeriesCreate, ReservationConflict, ReservationSeriesResponse, SlotHoldCreate, SlotHoldResponse, WaitlistCreate, WaitlistEntryResponse, ClubStatsPeriod, ClubStatsResponse
 
 __all__ = [
     "UserCreate", 
@@ -13,6 +13,14 @@ __all__ = [
     "ClubResponse", 
     "ClubUpdate", 
     "ClubDetailResponse",
+    "ClubAvailabilityResponse",
+    "OpeningHours",
+    "OpeningHoursDay",
+    "ClubSearchResponse",
+    "ClubListItem",
+    "ClubNearbyResponse",
+    "CourtCreate",
+    "CourtResponse",
     "ReviewCreate", 
     "ReviewResponse", 
     "ReviewWithUser",
@@ -25,5 +33,14 @@ __all__ = [
     "ReservationResponse",
     "TimeSlot",
     "AvailableSlotsResponse",
-    "PaymentMethodEnum"
+    "PaymentMethodEnum",
+    "ReservationSeriesCreate",
+    "ReservationConflict",
+    "ReservationSeriesResponse",
+    "SlotHoldCreate",
+    "SlotHoldResponse",
+    "WaitlistCreate",
+    "WaitlistEntryResponse",
+    "ClubStatsPeriod",
+    "ClubStatsResponse"
 ] 
\ No newline at end of file
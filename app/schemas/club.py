@@ -1,7 +1,39 @@
-from pydantic import BaseModel, Field, HttpUrl, field_validator
-from datetime import datetime
+from pydantic import BaseModel, Field, HttpUrl, field_validator, model_validator
+from datetime import datetime, time
 from typing import Optional, List, Dict, Any, Union
 
+# Most courts a club can be created with in one request
+MAX_INITIAL_COURTS = 64
+
+# Page size bounds of /clubs/search
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Largest page of the club list
+MAX_CLUB_PAGE_SIZE = 200
+
+# Most clubs fetched by one /clubs/details request
+MAX_DETAILS_IDS = 100
+
+# Bounds of /clubs/near
+DEFAULT_NEAR_LIMIT = 10
+MAX_NEAR_LIMIT = 100
+MAX_NEAR_RADIUS_KM = 20000.0
+
+def parse_pictures(v):
+    """Pictures are stored as a JSON string in older rows and as a list in newer ones."""
+    if v is None:
+        return []
+    
+    if isinstance(v, str):
+        try:
+            import json
+            return json.loads(v)
+        except json.JSONDecodeError:
+            return []
+    
+    return v
+
 class ClubBase(BaseModel):
     name: str
     town: str
@@ -9,11 +41,19 @@ class ClubBase(BaseModel):
     hourly_price: float = Field(..., gt=0)
     description: Optional[str] = None
     address: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     website: Optional[str] = None
     social_media: Optional[Dict[str, str]] = None
+    
+    @model_validator(mode='after')
+    def validate_coordinates(self):
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("latitude and longitude must be given together")
+        return self
 
 class ClubCreate(ClubBase):
-    pass
+    courts: int = Field(1, ge=1, le=MAX_INITIAL_COURTS)  # number of bookable courts
 
 class ClubUpdate(BaseModel):
     name: Optional[str] = None
@@ -22,8 +62,16 @@ class ClubUpdate(BaseModel):
     hourly_price: Optional[float] = Field(None, gt=0)
     description: Optional[str] = None
     address: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     website: Optional[str] = None
     social_media: Optional[Dict[str, str]] = None
+    
+    @model_validator(mode='after')
+    def validate_coordinates(self):
+        if ('latitude' in self.model_fields_set) != ('longitude' in self.model_fields_set):
+            raise ValueError("latitude and longitude must be updated together")
+        return self
 
 class PictureUpload(BaseModel):
     picture_url: str
@@ -32,6 +80,10 @@ class ClubResponse(ClubBase):
     id: int
     owner_id: int
     pictures: List[str] = []
+    slot_minutes: int = 60
+    average_rating: float = 0.0
+    reviews_count: int = 0
+    comments_count: int = 0
     created_at: datetime
     
     class Config:
@@ -40,20 +92,91 @@ class ClubResponse(ClubBase):
     @field_validator('pictures', mode='before')
     @classmethod
     def validate_pictures(cls, v):
-        if v is None:
-            return []
-        
-        if isinstance(v, str):
-            try:
-                import json
-                return json.loads(v)
-            except json.JSONDecodeError:
-                return []
-        
-        return v
+        return parse_pictures(v)
+
+class ClubListItem(BaseModel):
+    """A club in the paginated list; only the columns requested with ``fields=`` are set."""
+    id: int
+    name: Optional[str] = None
+    town: Optional[str] = None
+    telephone: Optional[str] = None
+    hourly_price: Optional[float] = None
+    description: Optional[str] = None
+    address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    website: Optional[str] = None
+    social_media: Optional[Dict[str, str]] = None
+    pictures: Optional[List[str]] = None
+    slot_minutes: Optional[int] = None
+    owner_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    average_rating: Optional[float] = None
+    reviews_count: Optional[int] = None
+    comments_count: Optional[int] = None
+    
+    @field_validator('pictures', mode='before')
+    @classmethod
+    def validate_pictures(cls, v):
+        return parse_pictures(v)
 
 class ClubDetailResponse(ClubResponse):
-    average_rating: float = 0.0
-    reviews_count: int = 0
-    comments_count: int = 0
-    owner_name: Optional[str] = None 
\ No newline at end of file
+    owner_name: Optional[str] = None
+
+class ClubAvailabilityResponse(ClubResponse):
+    free_slots: List[str] = []
+
+class ClubSearchResponse(ClubResponse):
+    rank: float = 0.0  # higher is a better match
+
+class ClubNearbyResponse(ClubResponse):
+    distance_km: float
+
+class OpeningHoursDay(BaseModel):
+    weekday: int = Field(..., ge=0, le=6)  # 0 = Monday
+    open_time: time
+    close_time: time  # 00:00 means midnight
+    
+    class Config:
+        from_attributes = True
+    
+    @field_validator('open_time', 'close_time')
+    @classmethod
+    def validate_quarter_hour(cls, v):
+        if v.minute % 15 or v.second or v.microsecond:
+            raise ValueError("Opening hours must be on a 15 minute boundary")
+        return v
+
+class OpeningHours(BaseModel):
+    slot_minutes: int = Field(60, ge=15, le=240)
+    days: List[OpeningHoursDay] = []
+    
+    @field_validator('slot_minutes')
+    @classmethod
+    def validate_slot_minutes(cls, v):
+        if v % 15:
+            raise ValueError("Slot length must be a multiple of 15 minutes")
+        return v
+    
+    @field_validator('days')
+    @classmethod
+    def validate_days(cls, v):
+        for day in v:
+            closes_at_midnight = day.close_time == time.min
+            if not closes_at_midnight and day.close_time <= day.open_time:
+                raise ValueError("close_time must be after open_time")
+        return v
+
+class CourtCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    position: Optional[int] = None  # appended after the existing courts when omitted
+
+class CourtResponse(BaseModel):
+    id: int
+    club_id: int
+    name: str
+    position: int
+    is_active: bool
+    
+    class Config:
+        from_attributes = True
@@ -4,6 +4,8 @@ from datetime import datetime, date as date_type
 import pytz
 from enum import Enum
 
+from app.db.partitions import MAX_BOOKING_HOURS
+
 # These schema models should match the FastAPI endpoint request/response models
 
 class PaymentMethodEnum(str, Enum):
@@ -13,7 +15,7 @@ class PaymentMethodEnum(str, Enum):
 class ReservationBase(BaseModel):
     club_id: int
     reservation_time: Union[datetime, str]  # Accept either datetime or string (HH:MM)
-    duration: float = Field(1.0, gt=0)
+    duration: float = Field(1.0, gt=0, le=MAX_BOOKING_HOURS)
     payment_method: PaymentMethodEnum
     date: Optional[str] = None  # Optional date field for string time formats
     
@@ -31,6 +33,8 @@ class ReservationBase(BaseModel):
 
 class ReservationCreate(ReservationBase):
     guest_name: Optional[str] = None
+    hold_id: Optional[str] = None  # from POST /reservations/holds
+    court_id: Optional[int] = None  # any free court when omitted
     
     @validator('guest_name')
     def validate_guest_name(cls, value, values, **kwargs):
@@ -44,13 +48,16 @@ class ReservationCreate(ReservationBase):
 class ReservationResponse(BaseModel):
     id: int
     club_id: int
+    court_id: int
     user_id: Optional[int] = None
     reservation_time: datetime
     duration: float
     guest_name: Optional[str] = None
     payment_method: PaymentMethodEnum
     estimated_price: float
+    status: str = "active"
     created_at: datetime
+    cancelled_at: Optional[datetime] = None
     
     class Config:
         orm_mode = True
@@ -61,4 +68,84 @@ class TimeSlot(BaseModel):
 
 class AvailableSlotsResponse(BaseModel):
     date: str
-    slots: List[TimeSlot] 
\ No newline at end of file
+    slots: List[TimeSlot]
+
+class SlotHoldCreate(BaseModel):
+    club_id: int
+    reservation_time: Union[datetime, str]  # datetime, or HH:MM together with date
+    duration: float = Field(1.0, gt=0, le=MAX_BOOKING_HOURS)
+    date: Optional[str] = None
+    court_id: Optional[int] = None  # any free court when omitted
+
+class WaitlistCreate(BaseModel):
+    club_id: int
+    reservation_time: Union[datetime, str]  # datetime, or HH:MM together with date
+    duration: float = Field(1.0, gt=0, le=MAX_BOOKING_HOURS)
+    payment_method: PaymentMethodEnum
+    date: Optional[str] = None
+
+class WaitlistEntryResponse(BaseModel):
+    id: int
+    club_id: int
+    reservation_time: datetime
+    duration: float
+    payment_method: PaymentMethodEnum
+    status: str
+    reservation_id: Optional[int] = None
+    created_at: datetime
+    promoted_at: Optional[datetime] = None
+    
+    class Config:
+        orm_mode = True
+
+class SlotHoldResponse(BaseModel):
+    hold_id: str
+    club_id: int
+    court_id: int
+    reservation_time: datetime
+    duration: float
+    expires_at: datetime
+
+class ReservationSeriesCreate(BaseModel):
+    """A batch of bookings at the same time of day.
+
+    Either list the dates explicitly, or give first_date plus occurrences
+    (and optionally interval_days, weekly by default) for a recurring series.
+    """
+    club_id: int
+    start_time: str  # HH:MM
+    duration: float = Field(1.0, gt=0, le=MAX_BOOKING_HOURS)
+    payment_method: PaymentMethodEnum
+    guest_name: Optional[str] = None
+    dates: Optional[List[str]] = None  # YYYY-MM-DD
+    first_date: Optional[str] = None  # YYYY-MM-DD
+    occurrences: Optional[int] = Field(None, gt=0)
+    interval_days: int = Field(7, gt=0)
+    skip_conflicts: bool = True  # book the free occurrences when some are taken
+    court_id: Optional[int] = None  # any free court for each occurrence when omitted
+
+class ReservationConflict(BaseModel):
+    date: str
+    start_time: str
+    end_time: str
+    detail: str
+
+class ReservationSeriesResponse(BaseModel):
+    created: List[ReservationResponse]
+    conflicts: List[ReservationConflict]
+
+class ClubStatsPeriod(BaseModel):
+    period_start: Optional[date_type] = None  # None for the totals row
+    reservations: int
+    booked_hours: float
+    revenue: float
+    open_hours: float
+    utilization: Optional[float] = None  # booked_hours / open_hours
+
+class ClubStatsResponse(BaseModel):
+    club_id: int
+    granularity: str
+    date_from: date_type
+    date_to: date_type
+    totals: ClubStatsPeriod
+    periods: List[ClubStatsPeriod]
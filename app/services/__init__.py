@@ -1,5 +1,5 @@
 from app.services.user import create_user, get_user_by_email, verify_password, get_user_by_id, authenticate_user
-from app.services.club import create_club, get_club_by_id, update_club, get_clubs_by_owner, get_all_clubs_service, get_club_details_service
+from app.services.club import create_club, get_club_by_id, update_club, get_clubs_by_owner, get_all_clubs_service, get_club_details_service, get_clubs_details_service
 from app.services.review import create_review_service, get_club_reviews_service, get_club_average_rating_service, create_comment_service, get_club_comments_service
 
 __all__ = [
@@ -14,6 +14,7 @@ __all__ = [
     "get_clubs_by_owner",
     "get_all_clubs_service",
     "get_club_details_service",
+    "get_clubs_details_service",
     "create_review_service",
     "get_club_reviews_service",
     "get_club_average_rating_service",
@@ -0,0 +1,721 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, literal, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Dict, Any, AsyncIterator, Iterable, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, date, time, timedelta
+import asyncio
+import itertools
+import json
+import math
+import threading
+import logging
+import numpy as np
+
+from app.db.partitions import ARCHIVE_SCHEMA, MAX_BOOKING_HOURS, add_months, archive_horizon, partition_name
+from app.db.session import SessionLocal
+from app.models import Reservation, ReservationStatusEnum, Club, ClubOpeningHours, Court
+from app.models.reservation import OVERLAP_CONSTRAINT_NAME
+from app.models.availability import ClubDayAvailability, SlotMask, SLOT_MINUTES, SLOTS_PER_DAY
+from app.services.club import apply_club_filters
+from app.services.availability_cache import booked_mask_cache, CourtMasks
+from app.services.slot_events import publish_slot_change, slot_event_hub
+from app.services.holds import SlotHold, slot_holds, new_slot_hold
+
+logger = logging.getLogger(__name__)
+
+# Opening hours of clubs that have not configured their own
+DEFAULT_OPEN_HOUR = 8
+DEFAULT_CLOSE_HOUR = 22
+
+# Number of compiled club slot templates kept in memory
+TEMPLATE_CACHE_SIZE = 4096
+
+# Longest date range served by the availability calendar, in days
+MAX_CALENDAR_DAYS = 31
+
+# Seconds between keep-alive comments on idle slot event streams
+SLOT_EVENTS_HEARTBEAT = 15
+
+MASK_BYTES = SLOTS_PER_DAY // 8
+
+
+def slot_range_mask(first_slot: int, last_slot: int) -> int:
+    """Bitmask with slots first_slot (inclusive) to last_slot (exclusive) set."""
+    if last_slot <= first_slot:
+        return 0
+    return ((1 << (last_slot - first_slot)) - 1) << first_slot
+
+
+def _naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def reservation_day_masks(start: datetime, duration: float) -> Dict[date, int]:
+    """Split a booking into per-day slot masks.
+
+    Partially covered slots count as booked, and bookings that run past
+    midnight contribute to the next day as well.
+    """
+    start = _naive(start)
+    end = start + timedelta(hours=duration)
+    slot_seconds = SLOT_MINUTES * 60
+
+    masks = {}
+    day = start.date()
+    while datetime.combine(day, time.min) < end:
+        day_start = datetime.combine(day, time.min)
+        lo = max(start, day_start)
+        hi = min(end, day_start + timedelta(days=1))
+        first_slot = int((lo - day_start).total_seconds() // slot_seconds)
+        last_slot = math.ceil((hi - day_start).total_seconds() / slot_seconds)
+        mask = slot_range_mask(first_slot, last_slot)
+        if mask:
+            masks[day] = mask
+        day += timedelta(days=1)
+
+    return masks
+
+
+def is_overlap_violation(error: IntegrityError) -> bool:
+    """Check whether an IntegrityError came from a partition's reservation overlap constraint."""
+    diag = getattr(error.orig, "diag", None)
+    return (getattr(diag, "constraint_name", None) or "").startswith(OVERLAP_CONSTRAINT_NAME)
+
+
+def court_matrix(masks: Iterable[int]) -> np.ndarray:
+    """Unpack slot bitmaps into a (len(masks), SLOTS_PER_DAY) boolean matrix.
+
+    Row r, column i is bit i of masks[r], i.e. quarter-hour i of the day.
+    """
+    raw = b"".join(mask.to_bytes(MASK_BYTES, "little") for mask in masks)
+    packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, MASK_BYTES)
+    return np.unpackbits(packed, axis=1, bitorder="little").astype(bool)
+
+
+def free_court_counts(slot_matrix: np.ndarray, court_masks: Iterable[int]) -> np.ndarray:
+    """How many courts are free for the whole of each slot.
+
+    slot_matrix is the (slots, SLOTS_PER_DAY) matrix of a slot template. One
+    product of the courts x quarter-hours booking matrix with it counts the
+    clashes of every court with every slot, so the answer for all slots and
+    courts comes from a single array reduction.
+    """
+    booked = court_matrix(court_masks).astype(np.int32)
+    clashes = booked @ slot_matrix.T.astype(np.int32)
+    return (clashes == 0).sum(axis=0)
+
+
+def free_court_counts_by_group(slot_matrix: np.ndarray, court_masks: List[int], group_starts: List[int]) -> np.ndarray:
+    """free_court_counts for several clubs sharing one slot matrix, in one reduction.
+
+    court_masks lists the courts of every club back to back and group_starts
+    the index of each club's first court. Returns a (clubs, slots) array.
+    """
+    booked = court_matrix(court_masks).astype(np.int32)
+    free = (booked @ slot_matrix.T.astype(np.int32)) == 0
+    return np.add.reduceat(free, group_starts, axis=0)
+
+
+def free_courts(court_masks: Dict[date, CourtMasks], day_masks: Dict[date, int]) -> List[int]:
+    """Courts on which none of the requested slots are taken, in court order.
+
+    court_masks holds the booked (or booked plus held) bitmaps per court for
+    every day in day_masks.
+    """
+    court_ids = list(next(iter(court_masks.values()), {}))
+    clashes = np.zeros(len(court_ids), dtype=bool)
+    for day, mask in day_masks.items():
+        masks = court_masks.get(day, {})
+        booked = court_matrix([masks.get(court_id, 0) for court_id in court_ids])
+        clashes |= (booked & court_matrix([mask])[0]).any(axis=1)
+    return [court_id for court_id, clash in zip(court_ids, clashes) if not clash]
+
+
+def get_active_court_ids(db: Session, club_id: int) -> List[int]:
+    """Ids of a club's active courts in assignment order."""
+    return [
+        court_id for (court_id,) in db.query(Court.id).filter(
+            Court.club_id == club_id,
+            Court.is_active.is_(True)
+        ).order_by(Court.position, Court.id)
+    ]
+
+
+def _load_court_masks(db: Session, club_id: int, days: List[date]) -> Dict[date, CourtMasks]:
+    court_ids = get_active_court_ids(db, club_id)
+    rows = db.query(ClubDayAvailability.day, ClubDayAvailability.court_id, ClubDayAvailability.booked_mask).filter(
+        ClubDayAvailability.club_id == club_id,
+        ClubDayAvailability.day >= days[0],
+        ClubDayAvailability.day <= days[-1]
+    ).all()
+    stored = {(day, court_id): mask for day, court_id, mask in rows}
+    return {
+        day: {court_id: stored.get((day, court_id), 0) for court_id in court_ids}
+        for day in days
+    }
+
+
+def get_court_masks(db: Session, club_id: int, day: date) -> CourtMasks:
+    """Booked-slot bitmap of each active court of a club on a day (0 where nothing is booked)."""
+    return get_court_masks_range(db, club_id, day, day)[day]
+
+
+def get_court_masks_range(db: Session, club_id: int, first_day: date, last_day: date) -> Dict[date, CourtMasks]:
+    """Per-court booked-slot bitmaps for every day in [first_day, last_day].
+
+    Days missing from the cache are loaded with one range query.
+    """
+    day_count = (last_day - first_day).days + 1
+    days = [first_day + timedelta(days=offset) for offset in range(day_count)]
+    masks = {day: booked_mask_cache.get(club_id, day) for day in days}
+    missing = [day for day, court_masks in masks.items() if court_masks is None]
+    if not missing:
+        return masks
+
+    generation = booked_mask_cache.generation()
+    loaded = _load_court_masks(db, club_id, missing)
+    for day in missing:
+        masks[day] = loaded[day]
+        booked_mask_cache.put(club_id, day, masks[day], generation)
+    return masks
+
+
+def reservations_committed(reservations: List[Reservation]) -> None:
+    """Patch the availability cache and notify subscribers once new reservations are committed."""
+    changed = {}
+    for reservation in reservations:
+        day_masks = reservation_day_masks(reservation.reservation_time, reservation.duration)
+        booked_mask_cache.patch(reservation.club_id, reservation.court_id, day_masks)
+        changed.setdefault(reservation.club_id, set()).update(day_masks)
+    for club_id, days in changed.items():
+        publish_slot_change(club_id, sorted(days))
+
+
+def reservation_cancel_committed(reservation: Reservation) -> None:
+    """Drop cached availability for the days a committed cancellation freed and notify subscribers."""
+    days = list(reservation_day_masks(reservation.reservation_time, reservation.duration))
+    booked_mask_cache.invalidate(reservation.club_id, days)
+    publish_slot_change(reservation.club_id, days)
+
+
+def mark_reservation_booked(db: Session, reservation: Reservation) -> None:
+    """Set the reservation's slots in the index.
+
+    Runs as a single upsert that ORs the new bits into the stored mask, so
+    concurrent bookings on the same court/day never overwrite each other.
+    Must be called inside the transaction that inserts the reservation.
+    """
+    mark_reservations_booked(db, [reservation])
+
+
+def mark_reservations_booked(db: Session, reservations: List[Reservation]) -> None:
+    """Set the slots of several reservations in the index with one upsert."""
+    masks = {}
+    for reservation in reservations:
+        for day, mask in reservation_day_masks(reservation.reservation_time, reservation.duration).items():
+            key = (reservation.club_id, reservation.court_id, day)
+            masks[key] = masks.get(key, 0) | mask
+    if not masks:
+        return
+
+    stmt = pg_insert(ClubDayAvailability).values([
+        {"club_id": club_id, "court_id": court_id, "day": day, "booked_mask": mask}
+        for (club_id, court_id, day), mask in masks.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ClubDayAvailability.club_id, ClubDayAvailability.day, ClubDayAvailability.court_id],
+        set_={"booked_mask": ClubDayAvailability.booked_mask.op("|")(stmt.excluded.booked_mask)}
+    )
+    db.execute(stmt)
+
+
+def lock_days(db: Session, club_id: int, court_id: int, days: Iterable[date]) -> None:
+    """Row-lock a court's index entries for the given days until the transaction ends."""
+    db.query(ClubDayAvailability.day).filter(
+        ClubDayAvailability.club_id == club_id,
+        ClubDayAvailability.court_id == court_id,
+        ClubDayAvailability.day.in_(list(days))
+    ).with_for_update().all()
+
+
+def release_reservation(db: Session, reservation: Reservation) -> None:
+    """Clear a cancelled reservation's slots from the index.
+
+    Slots are not simply cleared bit by bit, because a neighbouring booking
+    may share a partially covered slot. Instead the affected days are
+    locked and recomputed from what is left in the reservations table.
+    Call this after the reservation has been cancelled and flushed.
+    """
+    days = list(reservation_day_masks(reservation.reservation_time, reservation.duration))
+    lock_days(db, reservation.club_id, reservation.court_id, days)
+    for day in days:
+        rebuild_day(db, reservation.club_id, reservation.court_id, day)
+
+
+def rebuild_day(db: Session, club_id: int, court_id: int, day: date) -> int:
+    """Recompute one court/day entry from the reservations table."""
+    day_start = datetime.combine(day, time.min)
+
+    # Bookings that started the previous evening can still spill into this day
+    reservations = db.query(Reservation.reservation_time, Reservation.duration).filter(
+        Reservation.court_id == court_id,
+        Reservation.status == ReservationStatusEnum.ACTIVE,
+        Reservation.reservation_time >= day_start - timedelta(days=1),
+        Reservation.reservation_time < day_start + timedelta(days=1)
+    ).all()
+
+    mask = 0
+    for reservation_time, duration in reservations:
+        mask |= reservation_day_masks(reservation_time, duration).get(day, 0)
+
+    stmt = pg_insert(ClubDayAvailability).values(club_id=club_id, court_id=court_id, day=day, booked_mask=mask)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ClubDayAvailability.club_id, ClubDayAvailability.day, ClubDayAvailability.court_id],
+        set_={"booked_mask": stmt.excluded.booked_mask}
+    )
+    db.execute(stmt)
+    return mask
+
+
+def _archived_tail(db: Session, horizon: date, club_id: Optional[int]) -> List[Tuple[int, int, datetime, float]]:
+    """Active bookings of the last archived month that may still run past the horizon."""
+    table = f"{ARCHIVE_SCHEMA}.{partition_name(add_months(horizon, -1))}"
+    since = datetime.combine(horizon, time.min) - timedelta(hours=MAX_BOOKING_HOURS)
+    sql = (
+        f"SELECT club_id, court_id, reservation_time, duration FROM {table} "
+        "WHERE status = 'active' AND reservation_time >= :since"
+    )
+    params = {"since": since}
+    if club_id is not None:
+        sql += " AND club_id = :club_id"
+        params["club_id"] = club_id
+    return db.execute(text(sql), params).all()
+
+
+def rebuild_availability_index(db: Session, club_id: Optional[int] = None, batch_size: int = 1000) -> int:
+    """Rebuild the availability index from the reservations table.
+
+    Rebuilds a single club when club_id is given, otherwise every club.
+    Days in archived partitions keep their entries; bookings at the end of
+    the last archived month that run into the next day are read from the
+    archive. Returns the number of court/day entries written.
+    """
+    index_query = db.query(ClubDayAvailability)
+    reservations_query = db.query(
+        Reservation.club_id, Reservation.court_id, Reservation.reservation_time, Reservation.duration
+    ).filter(Reservation.status == ReservationStatusEnum.ACTIVE)
+    if club_id is not None:
+        index_query = index_query.filter(ClubDayAvailability.club_id == club_id)
+        reservations_query = reservations_query.filter(Reservation.club_id == club_id)
+
+    archived_tail = []
+    horizon = archive_horizon(db.connection())
+    if horizon is not None:
+        index_query = index_query.filter(ClubDayAvailability.day >= horizon)
+        reservations_query = reservations_query.filter(Reservation.reservation_time >= horizon)
+        archived_tail = _archived_tail(db, horizon, club_id)
+
+    masks = {}
+    bookings = itertools.chain(reservations_query.yield_per(batch_size), archived_tail)
+    for res_club_id, court_id, reservation_time, duration in bookings:
+        for day, mask in reservation_day_masks(reservation_time, duration).items():
+            if horizon is not None and day < horizon:
+                continue
+            key = (res_club_id, court_id, day)
+            masks[key] = masks.get(key, 0) | mask
+
+    index_query.delete(synchronize_session=False)
+    rows = [
+        {"club_id": key[0], "court_id": key[1], "day": key[2], "booked_mask": mask}
+        for key, mask in masks.items()
+    ]
+    for i in range(0, len(rows), batch_size):
+        db.execute(pg_insert(ClubDayAvailability).values(rows[i:i + batch_size]))
+    db.commit()
+    booked_mask_cache.clear()
+
+    logger.info(f"Rebuilt availability index with {len(rows)} court/day entries")
+    return len(rows)
+
+
+class SlotTemplate:
+    """A club's bookable slots for each weekday, compiled to bitmasks.
+
+    weekday_slots[weekday] is a list of (start_minute, end_minute, mask) and
+    open_masks[weekday] has every slot inside opening hours set, so checking
+    a day's availability is a bitwise AND against its booked-slot bitmap.
+    slot_matrix(day) is the same slot list as a boolean (slots, quarter-hours)
+    matrix for checking every court at once.
+    """
+
+    def __init__(self, slot_minutes: int, weekday_hours: List[List[Tuple[int, int]]]):
+        self.slot_minutes = slot_minutes
+        self.weekday_slots = []
+        self.open_masks = []
+        self._slot_matrices: Dict[int, np.ndarray] = {}
+        for periods in weekday_hours:
+            slots = []
+            open_mask = 0
+            for open_minute, close_minute in periods:
+                open_mask |= slot_range_mask(open_minute // SLOT_MINUTES, close_minute // SLOT_MINUTES)
+                for start in range(open_minute, close_minute - slot_minutes + 1, slot_minutes):
+                    end = start + slot_minutes
+                    slots.append((start, end, slot_range_mask(start // SLOT_MINUTES, end // SLOT_MINUTES)))
+            self.weekday_slots.append(slots)
+            self.open_masks.append(open_mask)
+
+    def slots(self, day: date) -> List[Tuple[int, int, int]]:
+        return self.weekday_slots[day.weekday()]
+
+    def slot_matrix(self, day: date) -> np.ndarray:
+        weekday = day.weekday()
+        matrix = self._slot_matrices.get(weekday)
+        if matrix is None:
+            matrix = court_matrix([mask for _, _, mask in self.weekday_slots[weekday]])
+            self._slot_matrices[weekday] = matrix
+        return matrix
+
+    def is_open(self, day: date, mask: int) -> bool:
+        """True when every slot in mask lies within the opening hours of day."""
+        return mask & ~self.open_masks[day.weekday()] == 0
+
+    def open_hours(self, day: date) -> float:
+        """Hours the club is open on day."""
+        return bin(self.open_masks[day.weekday()]).count("1") * SLOT_MINUTES / 60
+
+    def covers(self, start: datetime, duration: float) -> bool:
+        """True when a booking lies entirely within opening hours."""
+        return all(
+            self.is_open(day, mask)
+            for day, mask in reservation_day_masks(start, duration).items()
+        )
+
+
+def _minute_of_day(value: time, is_close: bool = False) -> int:
+    minute = value.hour * 60 + value.minute
+    # A closing time of 00:00 means the club stays open until midnight
+    if is_close and minute == 0:
+        return 24 * 60
+    return minute
+
+
+def format_minute(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def compile_slot_template(slot_minutes: int, opening_hours: List[ClubOpeningHours]) -> SlotTemplate:
+    """Compile a club's opening hours into a SlotTemplate.
+
+    Clubs without configured hours are open DEFAULT_OPEN_HOUR to
+    DEFAULT_CLOSE_HOUR every day.
+    """
+    if not opening_hours:
+        default = [(DEFAULT_OPEN_HOUR * 60, DEFAULT_CLOSE_HOUR * 60)]
+        return SlotTemplate(slot_minutes, [default] * 7)
+
+    weekday_hours = [[] for _ in range(7)]
+    for hours in opening_hours:
+        weekday_hours[hours.weekday].append(
+            (_minute_of_day(hours.open_time), _minute_of_day(hours.close_time, is_close=True))
+        )
+    return SlotTemplate(slot_minutes, weekday_hours)
+
+
+# Compiled templates by club id, tagged with the club state they were built from
+_template_cache: "OrderedDict[int, Tuple[Any, SlotTemplate]]" = OrderedDict()
+_template_lock = threading.Lock()
+
+
+def _template_key(club: Club):
+    # Changing the hours bumps clubs.updated_at, so the key changes with them
+    return (club.updated_at, club.slot_minutes)
+
+
+def _cache_template(club_id: int, key, template: SlotTemplate) -> None:
+    with _template_lock:
+        _template_cache[club_id] = (key, template)
+        _template_cache.move_to_end(club_id)
+        while len(_template_cache) > TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+
+
+def get_slot_templates(db: Session, clubs: List[Club]) -> Dict[int, SlotTemplate]:
+    """Return the slot template of each club, compiling stale ones with one query."""
+    templates = {}
+    stale = []
+    for club in clubs:
+        cached = _template_cache.get(club.id)
+        if cached and cached[0] == _template_key(club):
+            templates[club.id] = cached[1]
+        else:
+            stale.append(club)
+
+    if stale:
+        hours_by_club = {club.id: [] for club in stale}
+        for hours in db.query(ClubOpeningHours).filter(
+            ClubOpeningHours.club_id.in_(list(hours_by_club))
+        ).all():
+            hours_by_club[hours.club_id].append(hours)
+        for club in stale:
+            template = compile_slot_template(club.slot_minutes or 60, hours_by_club[club.id])
+            _cache_template(club.id, _template_key(club), template)
+            templates[club.id] = template
+
+    return templates
+
+
+def get_slot_template(db: Session, club: Club) -> SlotTemplate:
+    """Return the compiled slot template for a club."""
+    return get_slot_templates(db, [club])[club.id]
+
+
+def build_slot_grid(template: SlotTemplate, day: date, court_masks: CourtMasks, held_masks: Optional[CourtMasks] = None) -> List[Dict[str, Any]]:
+    """Turn a day's per-court booked and held bitmaps into the slot list the UI expects.
+
+    A slot is available while at least one court is free for all of it.
+    """
+    date_str = day.strftime("%Y-%m-%d")
+    held_masks = held_masks or {}
+    slot_matrix = template.slot_matrix(day)
+    unbooked = free_court_counts(slot_matrix, court_masks.values())
+    if any(held_masks.values()):
+        free = free_court_counts(
+            slot_matrix, [mask | held_masks.get(court_id, 0) for court_id, mask in court_masks.items()]
+        )
+    else:
+        free = unbooked
+    return [
+        {
+            "start_time": format_minute(start),
+            "end_time": format_minute(end),
+            "is_available": bool(free[i]),
+            "is_held": bool(unbooked[i]) and not free[i],
+            "free_courts": int(free[i]),
+            "date": date_str
+        }
+        for i, (start, end, _) in enumerate(template.slots(day))
+    ]
+
+
+def build_calendar(template: SlotTemplate, court_masks: Dict[date, CourtMasks], held_masks: Optional[Dict[date, CourtMasks]] = None) -> List[Dict[str, Any]]:
+    """Slot grids for a range of days, as returned by the availability calendar."""
+    held_masks = held_masks or {}
+    return [
+        {"date": day.strftime("%Y-%m-%d"), "slots": build_slot_grid(template, day, masks, held_masks.get(day))}
+        for day, masks in sorted(court_masks.items())
+    ]
+
+
+def get_held_masks(court_masks: Dict[date, CourtMasks], exclude: Optional[str] = None) -> Dict[date, CourtMasks]:
+    """Slots covered by live holds on each court for each of the given days."""
+    return {
+        day: {court_id: slot_holds.held_mask(court_id, day, exclude=exclude) for court_id in masks}
+        for day, masks in court_masks.items()
+    }
+
+
+def held_by_others(court_id: int, day_masks: Dict[date, int], hold_id: Optional[str] = None) -> bool:
+    """Check whether a court's slots are covered by a live hold other than hold_id."""
+    return any(
+        slot_holds.held_mask(court_id, day, exclude=hold_id) & mask
+        for day, mask in day_masks.items()
+    )
+
+
+def get_free_courts(db: Session, club_id: int, start_time: datetime, duration: float, include_held: bool = False) -> List[int]:
+    """Active courts of a club that are free (and, unless include_held, not held) for a booking."""
+    day_masks = reservation_day_masks(start_time, duration)
+    court_masks = get_court_masks_range(db, club_id, min(day_masks), max(day_masks))
+    if not include_held:
+        held = get_held_masks(court_masks)
+        court_masks = {
+            day: {court_id: mask | held[day][court_id] for court_id, mask in masks.items()}
+            for day, masks in court_masks.items()
+        }
+    return free_courts(court_masks, day_masks)
+
+
+def place_slot_hold(
+    db: Session,
+    club: Club,
+    start_time: datetime,
+    duration: float,
+    user_id: Optional[int],
+    court_id: Optional[int] = None
+) -> SlotHold:
+    """Hold a free court for SLOT_HOLD_MINUTES so the booking can be completed without racing others.
+
+    Takes the requested court, or the first court that is free.
+    """
+    if not get_slot_template(db, club).covers(start_time, duration):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The requested time is outside the club's opening hours"
+        )
+
+    candidates = get_free_courts(db, club.id, start_time, duration, include_held=True)
+    if court_id is not None:
+        candidates = [candidate for candidate in candidates if candidate == court_id]
+    if not candidates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The requested time slot is already booked"
+        )
+
+    day_masks = reservation_day_masks(start_time, duration)
+    for candidate in candidates:
+        hold = new_slot_hold(club.id, candidate, start_time, duration, day_masks, user_id)
+        if slot_holds.acquire(hold):
+            publish_slot_change(club.id, day_masks)
+            logger.info(f"Hold {hold.hold_id} placed on court {candidate} of club {club.id} at {start_time} for {duration}h")
+            return hold
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="The requested time slot is currently held by another user"
+    )
+
+
+def release_slot_hold(hold_id: str) -> Optional[SlotHold]:
+    """Drop a hold and tell subscribers its slots are free again."""
+    hold = slot_holds.release(hold_id)
+    if hold is not None:
+        publish_slot_change(hold.club_id, hold.day_masks)
+    return hold
+
+
+def _load_slot_grid(club_id: int, template: SlotTemplate, day: date) -> List[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        court_masks = get_court_masks(db, club_id, day)
+        return build_slot_grid(template, day, court_masks, get_held_masks({day: court_masks})[day])
+    finally:
+        db.close()
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def slot_change_events(club_id: int, template: SlotTemplate, day: date) -> AsyncIterator[str]:
+    """Server-sent events for one club and day.
+
+    Sends the full slot grid as a "snapshot" event, then a "delta" event with
+    only the slots whose availability changed whenever a booking,
+    cancellation or hold for that day is published. Idle streams re-check
+    the day on every heartbeat so expired holds show up as free again.
+    Re-reads go through the availability cache, so a burst of subscribers
+    costs one index lookup per change.
+    """
+    loop, changed = slot_event_hub.subscribe(club_id, day)
+    try:
+        grid = await run_in_threadpool(_load_slot_grid, club_id, template, day)
+        yield _sse("snapshot", grid)
+
+        while True:
+            try:
+                await asyncio.wait_for(changed.wait(), SLOT_EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                pass
+            changed.clear()
+
+            new_grid = await run_in_threadpool(_load_slot_grid, club_id, template, day)
+            delta = [slot for slot, old_slot in zip(new_grid, grid) if slot != old_slot]
+            grid = new_grid
+            yield _sse("delta", delta) if delta else ": keep-alive\n\n"
+    finally:
+        slot_event_hub.unsubscribe(club_id, day, (loop, changed))
+
+
+def search_available_clubs(
+    db: Session,
+    day: date,
+    window_start: time,
+    window_end: Optional[time] = None,
+    name: str = None,
+    town: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    now: Optional[datetime] = None
+) -> List[Tuple[Club, List[str]]]:
+    """Find clubs with at least one free slot inside a time window on a day.
+
+    The club filters and a coarse free-time test run as one query: active
+    courts are outer-joined to their index row for the day and courts whose
+    window is entirely booked are dropped in SQL with a bitwise AND. Slot
+    holds are added to the remaining courts' bitmaps, which are then checked
+    against the clubs' compiled slot templates (fetched with one more query
+    when not cached): clubs with the same slots that day share one matrix
+    reduction, so the work grows with the number of distinct opening hours
+    rather than the number of clubs. Courts without an index row have
+    nothing booked. Returns (club, free slot start times).
+    """
+    now = now or datetime.now()
+    earliest = _minute_of_day(window_start)
+    latest = _minute_of_day(window_end, is_close=True) if window_end else 24 * 60
+    if day == now.date():
+        earliest = max(earliest, now.hour * 60 + now.minute)
+    elif day < now.date():
+        return []
+    if latest <= earliest:
+        return []
+
+    window = slot_range_mask(math.ceil(earliest / SLOT_MINUTES), latest // SLOT_MINUTES)
+    booked_mask = ClubDayAvailability.booked_mask
+    window_literal = literal(window, SlotMask())
+    query = db.query(Club, Court.id, booked_mask).join(
+        Court,
+        and_(Court.club_id == Club.id, Court.is_active.is_(True))
+    ).outerjoin(
+        ClubDayAvailability,
+        and_(ClubDayAvailability.court_id == Court.id, ClubDayAvailability.day == day)
+    )
+    query = apply_club_filters(query, name=name, town=town, min_price=min_price, max_price=max_price)
+    query = query.filter(or_(
+        booked_mask.is_(None),
+        booked_mask.op("&")(window_literal) != window_literal
+    ))
+    clubs: Dict[int, Club] = {}
+    court_masks: Dict[int, CourtMasks] = {}
+    for club, court_id, court_mask in query.all():
+        clubs[club.id] = club
+        court_masks.setdefault(club.id, {})[court_id] = court_mask or 0
+
+    # Held slots are as unavailable as booked ones
+    all_courts = {court_id: mask for masks in court_masks.values() for court_id, mask in masks.items()}
+    held = get_held_masks({day: all_courts})[day]
+
+    # Clubs whose slots that day are the same share one slot matrix
+    templates = get_slot_templates(db, list(clubs.values()))
+    groups: Dict[Tuple[Tuple[int, int, int], ...], List[int]] = {}
+    for club_id in clubs:
+        groups.setdefault(tuple(templates[club_id].slots(day)), []).append(club_id)
+
+    free_slots_by_club: Dict[int, List[str]] = {}
+    for slots, club_ids in groups.items():
+        window_slots = [slot for slot in slots if slot[0] >= earliest and slot[1] <= latest]
+        if not window_slots:
+            continue
+        masks = []
+        group_starts = []
+        for club_id in club_ids:
+            group_starts.append(len(masks))
+            masks.extend(mask | held[court_id] for court_id, mask in court_masks[club_id].items())
+        slot_matrix = court_matrix([mask for _, _, mask in window_slots])
+        free = free_court_counts_by_group(slot_matrix, masks, group_starts)
+        for club_id, club_free in zip(club_ids, free):
+            free_slots_by_club[club_id] = [
+                format_minute(start) for (start, _, _), free_count in zip(window_slots, club_free) if free_count
+            ]
+
+    return [
+        (club, free_slots_by_club[club_id])
+        for club_id, club in clubs.items()
+        if free_slots_by_club.get(club_id)
+    ]
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Any, Iterable, Optional, Tuple
+import threading
+import time
+
+from app.core.config import settings
+
+CacheKey = Tuple[int, date]
+
+# Booked-slot bitmap of each active court of a club on one day, in court order
+CourtMasks = Dict[int, int]
+
+# Fewest recent writes remembered to decide whether a concurrent fill is stale
+MIN_TRACKED_WRITES = 1024
+
+
+class BookedMaskCache:
+    """In-process LRU cache of per-court booked-slot bitmaps keyed by (club_id, day).
+
+    Writers patch or drop entries after their transaction commits. Every
+    write bumps a generation counter and records it against the keys (or
+    club) it touched; a reader only stores what it loaded if its key was not
+    written in the meantime, so a slow read can never put a mask older than
+    a committed booking back into the cache, while writes to other clubs and
+    days do not discard it. Only the most recent writes are remembered;
+    fills older than a forgotten write are discarded. The TTL bounds
+    staleness from writes made by other worker processes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, CourtMasks]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        # Generation of the last write to each key and club, oldest first
+        self._written: "OrderedDict[CacheKey, int]" = OrderedDict()
+        self._club_written: Dict[int, int] = {}
+        self._max_written = max(4 * max_entries, MIN_TRACKED_WRITES)
+        # Fills from before this generation may race a write that is no longer remembered
+        self._oldest_valid = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def generation(self) -> int:
+        """Snapshot to pass to put() for a value about to be loaded from the database."""
+        return self._generation
+
+    def get(self, club_id: int, day: date) -> Optional[CourtMasks]:
+        if not self.enabled:
+            return None
+        key = (club_id, day)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, club_id: int, day: date, court_masks: CourtMasks, generation: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (club_id, day)
+            if (
+                generation < self._oldest_valid
+                or self._written.get(key, 0) > generation
+                or self._club_written.get(club_id, 0) > generation
+            ):
+                return
+            self._store(key, court_masks)
+
+    def patch(self, club_id: int, court_id: int, day_masks: Dict[date, int]) -> None:
+        """OR newly booked slots of a court into cached entries after the booking committed."""
+        with self._lock:
+            for day, mask in day_masks.items():
+                self._mark_written((club_id, day))
+                entry = self._entries.get((club_id, day))
+                if entry is None:
+                    continue
+                if court_id not in entry[1]:
+                    # A court added since the entry was loaded; reload it instead
+                    del self._entries[(club_id, day)]
+                    continue
+                # Entries are shared with readers, so patch a copy
+                court_masks = dict(entry[1])
+                court_masks[court_id] |= mask
+                self._entries[(club_id, day)] = (entry[0], court_masks)
+
+    def invalidate(self, club_id: int, days: Iterable[date]) -> None:
+        """Drop cached entries, e.g. after a cancellation committed."""
+        with self._lock:
+            for day in days:
+                self._mark_written((club_id, day))
+                self._entries.pop((club_id, day), None)
+
+    def invalidate_club(self, club_id: int) -> None:
+        """Drop every cached day of a club, e.g. after its courts changed."""
+        with self._lock:
+            self._generation += 1
+            self._club_written[club_id] = self._generation
+            for key in [key for key in self._entries if key[0] == club_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._oldest_valid = self._generation
+            self._written.clear()
+            self._club_written.clear()
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+            }
+
+    def _mark_written(self, key: CacheKey) -> None:
+        self._generation += 1
+        self._written[key] = self._generation
+        self._written.move_to_end(key)
+        if len(self._written) > self._max_written:
+            _, forgotten = self._written.popitem(last=False)
+            self._oldest_valid = forgotten
+
+    def _store(self, key: CacheKey, court_masks: CourtMasks) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, court_masks)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+booked_mask_cache = BookedMaskCache(
+    max_entries=settings.AVAILABILITY_CACHE_SIZE,
+    ttl_seconds=settings.AVAILABILITY_CACHE_TTL
+)
@@ -1,13 +1,20 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, or_, tuple_
 from fastapi import HTTPException, status
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
+import base64
 import json
+import re
 
-from app.models.club import Club
-from app.schemas.club import ClubCreate, ClubUpdate, PictureUpload
+import numpy as np
+
+from app.models.club import Club, ClubOpeningHours, Court, SEARCH_CONFIG, CLUB_AVERAGE_RATING
+from app.models.reservation import Reservation, ReservationStatusEnum
+from app.schemas.club import ClubCreate, ClubUpdate, PictureUpload, OpeningHours, CourtCreate
+from app.services.availability_cache import booked_mask_cache
+from app.services.geo import club_locations, haversine_km
 from app.models.user import User, UserRoleEnum
-from app.models import Review, Comment
 
 def get_club_by_id(db: Session, club_id: int) -> Optional[Club]:
     return db.query(Club).filter(Club.id == club_id).first()
@@ -38,16 +45,21 @@ def create_club(db: Session, club: ClubCreate, owner_id: int) -> Club:
         hourly_price=club.hourly_price,
         description=club.description,
         address=club.address,
+        latitude=club.latitude,
+        longitude=club.longitude,
         website=club.website,
         social_media=club.social_media,
         pictures="[]",  
         owner_id=owner_id
     )
+    db_club.courts = [Court(name=f"Court {number}", position=number) for number in range(1, club.courts + 1)]
     
     db.add(db_club)
     db.commit()
     db.refresh(db_club)
     
+    if db_club.latitude is not None:
+        club_locations.invalidate()
     return db_club
 
 def update_club(db: Session, club_id: int, club_update: ClubUpdate, owner_id: int) -> Club:
@@ -75,6 +87,8 @@ def update_club(db: Session, club_id: int, club_update: ClubUpdate, owner_id: in
     db.commit()
     db.refresh(db_club)
     
+    if "latitude" in update_data:
+        club_locations.invalidate()
     return db_club
 
 def add_club_picture(db: Session, club_id: int, picture_url: str, owner_id: int) -> Club:
@@ -129,11 +143,8 @@ def remove_club_picture(db: Session, club_id: int, picture_url: str, owner_id: i
     
     return db_club
 
-def get_all_clubs_service(db: Session, name: str = None, town: str = None, min_price: float = None, max_price: float = None) -> List[Club]:
-    """Get all clubs in the system with optional filtering."""
-    query = db.query(Club)
-    
-    # Apply filters if provided
+def apply_club_filters(query, name: str = None, town: str = None, min_price: float = None, max_price: float = None):
+    """Apply the optional name, town and price range filters to a query over Club."""
     if name:
         query = query.filter(Club.name.ilike(f"%{name}%"))
     if town:
@@ -142,32 +153,312 @@ def get_all_clubs_service(db: Session, name: str = None, town: str = None, min_p
         query = query.filter(Club.hourly_price >= min_price)
     if max_price is not None:
         query = query.filter(Club.hourly_price <= max_price)
-        
-    return query.all()
+    return query
 
-def get_club_details_service(db: Session, club_id: int) -> Dict[str, Any]:
-    """Get detailed club info including review stats and owner details"""
-    club = db.query(Club).filter(Club.id == club_id).first()
+def get_opening_hours_service(db: Session, club: Club) -> Dict[str, Any]:
+    """Get a club's slot length and configured opening hours."""
+    days = db.query(ClubOpeningHours).filter(
+        ClubOpeningHours.club_id == club.id
+    ).order_by(ClubOpeningHours.weekday, ClubOpeningHours.open_time).all()
     
-    if not club:
-        return None
+    return {"slot_minutes": club.slot_minutes, "days": days}
+
+def set_opening_hours_service(db: Session, club_id: int, opening_hours: OpeningHours, owner_id: int) -> Dict[str, Any]:
+    """Replace a club's opening hours and slot length if the user is the owner."""
+    db_club = get_club_by_id(db, club_id)
+    if not db_club:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Club not found"
+        )
+    
+    # Verify ownership
+    if db_club.owner_id != owner_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the club owner can change opening hours"
+        )
+    
+    weekdays = [day.weekday for day in opening_hours.days]
+    if len(weekdays) != len(set(weekdays)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each weekday can only appear once"
+        )
+    
+    db.query(ClubOpeningHours).filter(ClubOpeningHours.club_id == club_id).delete(synchronize_session=False)
+    db.add_all([
+        ClubOpeningHours(
+            club_id=club_id,
+            weekday=day.weekday,
+            open_time=day.open_time,
+            close_time=day.close_time
+        )
+        for day in opening_hours.days
+    ])
+    
+    # Bumping updated_at invalidates the compiled slot template of the club
+    db_club.slot_minutes = opening_hours.slot_minutes
+    db_club.updated_at = func.now()
+    
+    db.add(db_club)
+    db.commit()
+    db.refresh(db_club)
+    
+    return get_opening_hours_service(db, db_club)
+
+def get_courts_service(db: Session, club: Club) -> List[Court]:
+    """Get a club's courts, active and retired, in assignment order."""
+    return db.query(Court).filter(Court.club_id == club.id).order_by(Court.position, Court.id).all()
+
+def _get_owned_club(db: Session, club_id: int, owner_id: int) -> Club:
+    db_club = get_club_by_id(db, club_id)
+    if not db_club:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Club not found"
+        )
+    if db_club.owner_id != owner_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the club owner can manage courts"
+        )
+    return db_club
+
+def add_court_service(db: Session, club_id: int, court: CourtCreate, owner_id: int) -> Court:
+    """Add a bookable court to a club if the user is the owner."""
+    _get_owned_club(db, club_id, owner_id)
+    
+    position = court.position
+    if position is None:
+        position = (db.query(func.max(Court.position)).filter(Court.club_id == club_id).scalar() or 0) + 1
+    db_court = Court(club_id=club_id, name=court.name, position=position)
+    db.add(db_court)
+    db.commit()
+    db.refresh(db_court)
     
-    # Get owner name
-    owner = db.query(User).filter(User.id == club.owner_id).first()
-    owner_name = owner.username if owner else None
+    # Cached availability lists the club's courts
+    booked_mask_cache.invalidate_club(club_id)
+    return db_court
+
+def deactivate_court_service(db: Session, club_id: int, court_id: int, owner_id: int) -> Court:
+    """Retire a court so it takes no new bookings. Courts with upcoming bookings cannot be retired."""
+    _get_owned_club(db, club_id, owner_id)
+    
+    db_court = db.query(Court).filter(Court.id == court_id, Court.club_id == club_id).first()
+    if not db_court:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Court not found"
+        )
+    
+    upcoming = db.query(Reservation.id).filter(
+        Reservation.court_id == court_id,
+        Reservation.status == ReservationStatusEnum.ACTIVE,
+        Reservation.reservation_time >= datetime.now()
+    ).first()
+    if upcoming:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The court has upcoming reservations; cancel or move them first"
+        )
+    
+    db_court.is_active = False
+    db.commit()
+    db.refresh(db_court)
+    
+    booked_mask_cache.invalidate_club(club_id)
+    return db_court
+
+# Columns the club list can return, in response order
+CLUB_LIST_FIELDS = (
+    "id", "name", "town", "telephone", "hourly_price", "description", "address",
+    "latitude", "longitude", "website", "social_media", "pictures", "slot_minutes", "owner_id", "created_at",
+    "average_rating", "reviews_count", "comments_count"
+)
+
+def _club_list_column(field: str):
+    if field == "average_rating":
+        return CLUB_AVERAGE_RATING.label("average_rating")
+    return getattr(Club, field)
+
+# Sort orders of the club list; each is a keyset on (sort value, id)
+CLUB_SORTS = ("id", "price", "-price", "rating", "newest")
+
+def parse_club_fields(fields: Optional[str]) -> List[str]:
+    """Parse a comma-separated fields= value; every column when omitted. The id is always included."""
+    if not fields:
+        return list(CLUB_LIST_FIELDS)
+    
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(CLUB_LIST_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return [field for field in CLUB_LIST_FIELDS if field == "id" or field in requested]
+
+def _club_sort_key(sort: str):
+    """The sort value of a club list order (None for id) and whether it descends."""
+    if sort == "price":
+        return Club.hourly_price, False
+    if sort == "-price":
+        return Club.hourly_price, True
+    if sort == "newest":
+        return Club.created_at, True
+    if sort == "rating":
+        return CLUB_AVERAGE_RATING, True
+    return None, False
+
+def encode_club_cursor(sort: str, value: Any, club_id: int) -> str:
+    """Opaque keyset cursor pointing just after the given club in the given sort order."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, club_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_club_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    """Inverse of encode_club_cursor; raises a 400 for malformed cursors or another sort's cursor."""
+    try:
+        cursor_sort, value, club_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if cursor_sort != sort:
+            raise ValueError(cursor_sort)
+        if sort == "newest":
+            value = datetime.fromisoformat(value)
+        return value, int(club_id)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def get_all_clubs_service(
+    db: Session,
+    name: str = None,
+    town: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    fields: Optional[List[str]] = None,
+    sort: str = "id",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get a page of clubs with optional filtering, selecting only the requested columns in SQL.
+
+    Returns the rows and the cursor for the next page (None on the last page).
+    Without a limit every matching club is returned.
+    """
+    fields = fields or list(CLUB_LIST_FIELDS)
+    query = db.query(*[_club_list_column(field) for field in fields])
+    query = apply_club_filters(query, name=name, town=town, min_price=min_price, max_price=max_price)
+    sort_value, descending = _club_sort_key(sort)
     
-    # Get average rating
-    avg_rating = db.query(func.avg(Review.rating)).filter(Review.club_id == club_id).scalar()
-    avg_rating = float(avg_rating) if avg_rating else 0.0
+    key = (sort_value, Club.id) if sort_value is not None else (Club.id,)
+    if sort_value is not None:
+        query = query.add_columns(sort_value.label("sort_value"))
+    if cursor:
+        after_value, after_id = decode_club_cursor(cursor, sort)
+        after = (after_value, after_id) if sort_value is not None else (after_id,)
+        if descending:
+            query = query.filter(tuple_(*key) < tuple_(*after))
+        else:
+            query = query.filter(tuple_(*key) > tuple_(*after))
+    query = query.order_by(*[column.desc() if descending else column for column in key])
     
-    # Get review count
-    reviews_count = db.query(func.count(Review.id)).filter(Review.club_id == club_id).scalar()
+    if limit is None:
+        rows, next_cursor = query.all(), None
+    else:
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_club_cursor(sort, last.sort_value if sort_value is not None else None, last.id)
     
-    # Get comment count
-    comments_count = db.query(func.count(Comment.id)).filter(Comment.club_id == club_id).scalar()
+    return [{field: getattr(row, field) for field in fields} for row in rows], next_cursor
+
+def _prefix_tsquery(text: str) -> Optional[str]:
+    """Turn free text into a tsquery matching every word as a prefix, e.g. 'pad:* & mad:*'."""
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+def search_clubs_service(
+    db: Session,
+    q: str,
+    town: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    limit: int = 20
+) -> List[Tuple[Club, float]]:
+    """Ranked club search over name, town and description.
+
+    A club matches when the search vector contains every word of the query
+    as a prefix, or when its name or town is trigram-similar to the query
+    (which catches typos). Both conditions are served by GIN indexes.
+    Results are ordered by text rank plus name similarity.
+    """
+    prefix_query = _prefix_tsquery(q)
+    if prefix_query is None:
+        return []
+    
+    tsquery = func.to_tsquery(SEARCH_CONFIG, prefix_query)
+    rank = (func.ts_rank_cd(Club.search_vector, tsquery) + func.similarity(Club.name, q)).label("rank")
+    query = db.query(Club, rank).filter(
+        or_(Club.search_vector.bool_op("@@")(tsquery), Club.name.bool_op("%")(q), Club.town.bool_op("%")(q))
+    )
+    query = apply_club_filters(query, town=town, min_price=min_price, max_price=max_price)
+    
+    return [
+        (club, float(score))
+        for club, score in query.order_by(rank.desc(), Club.id).limit(limit)
+    ]
+
+def find_clubs_near_service(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    limit: int = 10,
+    radius_km: Optional[float] = None,
+    name: str = None,
+    town: str = None,
+    min_price: float = None,
+    max_price: float = None
+) -> List[Tuple[Club, float]]:
+    """The nearest clubs to a point that pass the club list filters, nearest first.
+
+    Candidates come from the in-process location index in distance order;
+    the filters run in SQL over the candidate ids only. When filters reject
+    too many candidates, the candidate set grows and the query is repeated.
+    Returned distances use the coordinates just read from the database.
+    """
+    index = club_locations.get(db)
+    filtered = any(value is not None for value in (name, town, min_price, max_price))
+    candidates = limit * 4 if filtered else limit
+    while True:
+        ids, _ = index.nearest(latitude, longitude, candidates, max_radius_km=radius_km)
+        query = db.query(Club).filter(Club.id.in_(ids.tolist()))
+        clubs = apply_club_filters(query, name=name, town=town, min_price=min_price, max_price=max_price).all()
+        if len(clubs) >= limit or len(ids) < candidates:
+            break
+        candidates *= 4
     
-    # Add additional fields to club dict
-    result = {
+    clubs = [club for club in clubs if club.latitude is not None and club.longitude is not None]
+    if not clubs:
+        return []
+    distances = haversine_km(
+        latitude, longitude,
+        np.array([club.latitude for club in clubs]), np.array([club.longitude for club in clubs])
+    )
+    nearest = sorted(zip(clubs, distances.tolist()), key=lambda pair: (pair[1], pair[0].id))
+    if radius_km is not None:
+        nearest = [(club, distance) for club, distance in nearest if distance <= radius_km]
+    return nearest[:limit]
+
+def _club_details(club: Club, owner_name: Optional[str]) -> Dict[str, Any]:
+    return {
         "id": club.id,
         "name": club.name,
         "town": club.town,
@@ -175,15 +466,41 @@ def get_club_details_service(db: Session, club_id: int) -> Dict[str, Any]:
         "hourly_price": club.hourly_price,
         "description": club.description,
         "address": club.address,
+        "latitude": club.latitude,
+        "longitude": club.longitude,
         "website": club.website,
         "social_media": club.social_media,
         "pictures": club.get_pictures(),
         "owner_id": club.owner_id,
         "created_at": club.created_at,
-        "average_rating": avg_rating,
-        "reviews_count": reviews_count,
-        "comments_count": comments_count,
+        "average_rating": club.average_rating,
+        "reviews_count": club.reviews_count,
+        "comments_count": club.comments_count,
         "owner_name": owner_name
     }
+
+def _club_details_query(db: Session):
+    return db.query(Club, User.username).outerjoin(User, User.id == Club.owner_id)
+
+def get_club_details_service(db: Session, club_id: int) -> Dict[str, Any]:
+    """Get detailed club info including review stats and owner details, in one query"""
+    row = _club_details_query(db).filter(Club.id == club_id).first()
     
-    return result 
\ No newline at end of file
+    if not row:
+        return None
+    club, owner_name = row
+    return _club_details(club, owner_name)
+
+def get_clubs_details_service(db: Session, club_ids: List[int]) -> List[Dict[str, Any]]:
+    """Get the details of many clubs with a single query, in the order of club_ids.
+
+    Unknown ids are skipped and repeated ids are returned once.
+    """
+    if not club_ids:
+        return []
+    
+    details = {
+        club.id: _club_details(club, owner_name)
+        for club, owner_name in _club_details_query(db).filter(Club.id.in_(club_ids))
+    }
+    return [details[club_id] for club_id in dict.fromkeys(club_ids) if club_id in details]
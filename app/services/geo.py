@@ -0,0 +1,149 @@
+from sqlalchemy.orm import Session
+from typing import Optional, Tuple
+import math
+import threading
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.club import Club
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Grid cells are CELL_DEGREES on a side, about 28 km at the equator
+CELL_DEGREES = 0.25
+LAT_CELLS = int(180 / CELL_DEGREES)
+LON_CELLS = int(360 / CELL_DEGREES)
+
+# First radius tried by a nearest-neighbour query; it grows by NEAREST_GROWTH until k clubs are found
+NEAREST_START_KM = 10.0
+NEAREST_GROWTH = 4.0
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km from one point to arrays of points, all in degrees."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _lat_cell(lat: float) -> int:
+    return min(int((lat + 90) / CELL_DEGREES), LAT_CELLS - 1)
+
+
+def _lon_cell(lon: float) -> int:
+    return int(((lon + 180) % 360) / CELL_DEGREES) % LON_CELLS
+
+
+class ClubLocationIndex:
+    """Immutable grid index over the coordinates of geocoded clubs.
+
+    Points are sorted by cell key (latitude row * LON_CELLS + longitude
+    column), so the cells of one latitude row that a query touches form a
+    single key range found with two binary searches. Distances are exact
+    haversine distances computed for the candidates only.
+    """
+
+    def __init__(self, ids: np.ndarray, lats: np.ndarray, lons: np.ndarray):
+        lat_cells = np.minimum(((lats + 90) / CELL_DEGREES).astype(np.int64), LAT_CELLS - 1)
+        lon_cells = (((lons + 180) % 360) / CELL_DEGREES).astype(np.int64) % LON_CELLS
+        keys = lat_cells * LON_CELLS + lon_cells
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.ids = ids[order]
+        self.lats = lats[order]
+        self.lons = lons[order]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Positions of the points in the grid cells covering a circle."""
+        angle = radius_km / EARTH_RADIUS_KM
+        dlat = math.degrees(angle)
+        lat_lo, lat_hi = lat - dlat, lat + dlat
+        cos_lat = math.cos(math.radians(lat))
+        if lat_lo <= -90 or lat_hi >= 90 or angle >= math.pi / 2 or math.sin(angle) >= cos_lat:
+            # The circle covers a pole or half the globe: every longitude is in range
+            lon_ranges = [(0, LON_CELLS - 1)]
+        else:
+            dlon = math.degrees(math.asin(math.sin(angle) / cos_lat))
+            if dlon >= 180:
+                lon_ranges = [(0, LON_CELLS - 1)]
+            else:
+                first, last = _lon_cell(lon - dlon), _lon_cell(lon + dlon)
+                # Split ranges that wrap around the antimeridian
+                lon_ranges = [(first, last)] if first <= last else [(first, LON_CELLS - 1), (0, last)]
+
+        slices = []
+        for row in range(_lat_cell(max(lat_lo, -90)), _lat_cell(min(lat_hi, 90)) + 1):
+            for first, last in lon_ranges:
+                start, stop = np.searchsorted(self.keys, [row * LON_CELLS + first, row * LON_CELLS + last + 1])
+                if stop > start:
+                    slices.append(np.arange(start, stop))
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and distances of the clubs within radius_km, nearest first."""
+        positions = self._candidates(lat, lon, radius_km)
+        distances = haversine_km(lat, lon, self.lats[positions], self.lons[positions])
+        inside = distances <= radius_km
+        positions, distances = positions[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return self.ids[positions[order]], distances[order]
+
+    def nearest(self, lat: float, lon: float, k: int, max_radius_km: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and distances of the k nearest clubs, optionally no further than max_radius_km.
+
+        Searches a growing circle; once it holds k clubs they are the k
+        nearest overall, since the radius query is exact.
+        """
+        limit = min(max_radius_km, HALF_CIRCUMFERENCE_KM) if max_radius_km is not None else HALF_CIRCUMFERENCE_KM
+        radius = min(NEAREST_START_KM, limit)
+        while True:
+            ids, distances = self.within(lat, lon, radius)
+            if len(ids) >= k or radius >= limit:
+                return ids[:k], distances[:k]
+            radius = min(radius * NEAREST_GROWTH, limit)
+
+
+class ClubLocations:
+    """Per-process holder of the club location index, rebuilt when stale.
+
+    Club writes in this process invalidate it; the TTL bounds staleness
+    from writes made by other worker processes.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._index: Optional[ClubLocationIndex] = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> ClubLocationIndex:
+        with self._lock:
+            if self._index is None or self._expires < time.monotonic():
+                self._index = self._load(db)
+                self._expires = time.monotonic() + self.ttl_seconds
+            return self._index
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+
+    @staticmethod
+    def _load(db: Session) -> ClubLocationIndex:
+        rows = db.query(Club.id, Club.latitude, Club.longitude).filter(
+            Club.latitude.isnot(None),
+            Club.longitude.isnot(None)
+        ).all()
+        data = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        return ClubLocationIndex(data[:, 0].astype(np.int64), data[:, 1], data[:, 2])
+
+
+club_locations = ClubLocations(ttl_seconds=settings.CLUB_LOCATION_INDEX_TTL)
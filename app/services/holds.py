@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field
+from datetime import datetime, date, timedelta
+from typing import Dict, Optional, Set, Tuple
+import secrets
+import threading
+import time
+
+from app.core.config import settings
+
+
+@dataclass
+class SlotHold:
+    """A short-lived claim on a court's slots while the user completes a booking."""
+    hold_id: str
+    club_id: int
+    court_id: int
+    start_time: datetime
+    duration: float
+    day_masks: Dict[date, int]
+    user_id: Optional[int]
+    expires_at: datetime
+    deadline: float = field(repr=False)
+
+    def covers(self, club_id: int, start_time: datetime, duration: float) -> bool:
+        return (
+            self.club_id == club_id
+            and self.start_time == start_time
+            and self.duration == duration
+        )
+
+
+class InMemorySlotHoldBackend:
+    """Expiring slot holds kept in this process.
+
+    Stands in for a shared store when several workers run: another backend
+    only has to provide the same acquire/get/release/held_mask methods.
+    Holds are indexed by (court_id, day); expired holds are dropped lazily
+    whenever a day they touch is read.
+    """
+
+    def __init__(self, max_holds: int):
+        self.max_holds = max_holds
+        self._holds: Dict[str, SlotHold] = {}
+        self._by_day: Dict[Tuple[int, date], Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, hold: SlotHold) -> bool:
+        """Store the hold unless another live hold overlaps it."""
+        with self._lock:
+            for day, mask in hold.day_masks.items():
+                if self._held_mask(hold.court_id, day) & mask:
+                    return False
+            if len(self._holds) >= self.max_holds:
+                self._purge_all()
+                if len(self._holds) >= self.max_holds:
+                    return False
+
+            self._holds[hold.hold_id] = hold
+            for day in hold.day_masks:
+                self._by_day.setdefault((hold.court_id, day), set()).add(hold.hold_id)
+            return True
+
+    def get(self, hold_id: str) -> Optional[SlotHold]:
+        with self._lock:
+            hold = self._holds.get(hold_id)
+            if hold is None or hold.deadline < time.monotonic():
+                return None
+            return hold
+
+    def release(self, hold_id: str) -> Optional[SlotHold]:
+        with self._lock:
+            hold = self._holds.get(hold_id)
+            if hold is not None:
+                self._remove(hold)
+            return hold
+
+    def held_mask(self, court_id: int, day: date, exclude: Optional[str] = None) -> int:
+        """Slots of a court's day covered by live holds, optionally ignoring one hold."""
+        with self._lock:
+            return self._held_mask(court_id, day, exclude)
+
+    def _held_mask(self, court_id: int, day: date, exclude: Optional[str] = None) -> int:
+        now = time.monotonic()
+        mask = 0
+        for hold_id in list(self._by_day.get((court_id, day), ())):
+            hold = self._holds[hold_id]
+            if hold.deadline < now:
+                self._remove(hold)
+            elif hold_id != exclude:
+                mask |= hold.day_masks[day]
+        return mask
+
+    def _purge_all(self) -> None:
+        now = time.monotonic()
+        for hold in [hold for hold in self._holds.values() if hold.deadline < now]:
+            self._remove(hold)
+
+    def _remove(self, hold: SlotHold) -> None:
+        self._holds.pop(hold.hold_id, None)
+        for day in hold.day_masks:
+            hold_ids = self._by_day.get((hold.court_id, day))
+            if hold_ids is not None:
+                hold_ids.discard(hold.hold_id)
+                if not hold_ids:
+                    del self._by_day[(hold.court_id, day)]
+
+
+slot_holds = InMemorySlotHoldBackend(max_holds=settings.SLOT_HOLDS_MAX)
+
+
+def new_slot_hold(club_id: int, court_id: int, start_time: datetime, duration: float, day_masks: Dict[date, int], user_id: Optional[int]) -> SlotHold:
+    """Build a hold that expires after SLOT_HOLD_MINUTES."""
+    ttl = settings.SLOT_HOLD_MINUTES * 60
+    return SlotHold(
+        hold_id=secrets.token_urlsafe(16),
+        club_id=club_id,
+        court_id=court_id,
+        start_time=start_time,
+        duration=duration,
+        day_masks=day_masks,
+        user_id=user_id,
+        expires_at=datetime.utcnow() + timedelta(seconds=ttl),
+        deadline=time.monotonic() + ttl
+    )
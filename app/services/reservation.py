@@ -0,0 +1,552 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, func, literal_column, tuple_, select
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from datetime import datetime, date, time, timedelta
+import base64
+import csv
+import io
+import json
+import logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+from app.db.session import SessionLocal
+from app.db.partitions import MAX_BOOKING_HOURS, crosses_month_boundary
+from app.models import Club, Reservation, ReservationStatusEnum, User
+from app.schemas.reservation import ReservationSeriesCreate
+from app.services.availability import (
+    is_overlap_violation, mark_reservations_booked, reservations_committed, get_slot_template,
+    reservation_day_masks, held_by_others, get_active_court_ids
+)
+from app.services.stats import add_to_daily_stats
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the number of bookings created by one series request
+MAX_SERIES_OCCURRENCES = 60
+
+# Rows fetched per round trip when streaming listings from a server-side cursor
+STREAM_BATCH_SIZE = 500
+
+# Advisory lock namespace taken (with the club id) by bookings near a month boundary
+PARTITION_BOUNDARY_LOCK = 7001
+
+# Columns written by the club reservation export, in order
+EXPORT_COLUMNS = [
+    "id", "date", "start_time", "end_time", "duration", "status", "estimated_price",
+    "payment_method", "user_id", "user_name", "guest_name", "created_at"
+]
+
+if pa is not None:
+    EXPORT_PARQUET_TYPES = {
+        "id": pa.int64(),
+        "date": pa.string(),
+        "start_time": pa.string(),
+        "end_time": pa.string(),
+        "duration": pa.float64(),
+        "status": pa.string(),
+        "estimated_price": pa.float64(),
+        "payment_method": pa.string(),
+        "user_id": pa.int64(),
+        "user_name": pa.string(),
+        "guest_name": pa.string(),
+        "created_at": pa.string()
+    }
+
+
+def reservation_end():
+    """SQL expression for the end of a reservation."""
+    return Reservation.reservation_time + Reservation.duration * literal_column("interval '1 hour'")
+
+
+def reservation_range():
+    """The booked time range of a reservation, matching the overlap constraint's GiST expression."""
+    return func.tsrange(Reservation.reservation_time, reservation_end())
+
+
+def format_reservation(reservation: Reservation, club_name: Optional[str], now: datetime) -> Dict[str, Any]:
+    """Build the reservation dictionary shared by the listing endpoints."""
+    reservation_end_time = reservation.reservation_time + timedelta(hours=reservation.duration)
+    
+    # Determine status based on the stored status and reservation time
+    if reservation.status == ReservationStatusEnum.CANCELLED:
+        status = "cancelled"
+    elif reservation_end_time < now:
+        status = "completed"
+    else:
+        status = "confirmed"
+    
+    return {
+        "id": reservation.id,
+        "club_id": reservation.club_id,
+        "club_name": club_name,
+        "date": reservation.reservation_time.strftime('%Y-%m-%d'),
+        "start_time": reservation.reservation_time.strftime('%H:%M'),
+        "end_time": reservation_end_time.strftime('%H:%M'),
+        "duration": reservation.duration,
+        "status": status,
+        "estimated_price": reservation.estimated_price,
+        "payment_method": reservation.payment_method,
+        "reservation_time": reservation.reservation_time.isoformat(),
+        "court_id": reservation.court_id,
+        "created_at": reservation.created_at.isoformat() if reservation.created_at else None,
+        "cancelled_at": reservation.cancelled_at.isoformat() if reservation.cancelled_at else None
+    }
+
+
+def encode_cursor(reservation: Reservation) -> str:
+    """Opaque keyset cursor pointing just after the given reservation."""
+    raw = f"{reservation.reservation_time.isoformat()}|{reservation.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises a 400 for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        time_part, id_part = raw.split("|")
+        return datetime.fromisoformat(time_part), int(id_part)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _user_reservations_query(db: Session, user_id: int):
+    return db.query(Reservation, Club.name).outerjoin(
+        Club, Club.id == Reservation.club_id
+    ).filter(
+        Reservation.user_id == user_id
+    )
+
+
+def _club_reservations_query(db: Session, club_id: int):
+    return db.query(Reservation, User.username).outerjoin(
+        User, User.id == Reservation.user_id
+    ).filter(
+        Reservation.club_id == club_id
+    )
+
+
+def apply_listing_filters(
+    query,
+    scope: Optional[str] = None,
+    first_day: Optional[date] = None,
+    last_day: Optional[date] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    now: Optional[datetime] = None
+):
+    """Push the listing filters into SQL and order by the (reservation_time, id) keyset.
+
+    scope is "upcoming" (not yet finished), "past" (already finished),
+    "cancelled" or "all", matching how format_reservation derives the
+    status. Without a scope only active reservations are listed, as before
+    cancellations were kept. after
+    is a decoded cursor; only rows past that keyset position are returned.
+    """
+    now = now or datetime.now()
+    if scope == "upcoming":
+        query = query.filter(Reservation.status == ReservationStatusEnum.ACTIVE, reservation_end() >= now)
+    elif scope == "past":
+        query = query.filter(Reservation.status == ReservationStatusEnum.ACTIVE, reservation_end() < now)
+    elif scope == "cancelled":
+        query = query.filter(Reservation.status == ReservationStatusEnum.CANCELLED)
+    elif scope != "all":
+        query = query.filter(Reservation.status == ReservationStatusEnum.ACTIVE)
+    if first_day:
+        query = query.filter(Reservation.reservation_time >= datetime.combine(first_day, time.min))
+    if last_day:
+        query = query.filter(Reservation.reservation_time < datetime.combine(last_day + timedelta(days=1), time.min))
+    if after:
+        query = query.filter(tuple_(Reservation.reservation_time, Reservation.id) > tuple_(*after))
+    return query.order_by(Reservation.reservation_time, Reservation.id)
+
+
+def _user_row(reservation: Reservation, club_name: Optional[str], username: str, now: datetime) -> Dict[str, Any]:
+    reservation_data = format_reservation(reservation, club_name or "Unknown Club", now)
+    reservation_data["user_name"] = username
+    return reservation_data
+
+
+def _club_row(reservation: Reservation, username: Optional[str], club_name: str, now: datetime) -> Dict[str, Any]:
+    reservation_data = format_reservation(reservation, club_name, now)
+    reservation_data["user_id"] = reservation.user_id
+    reservation_data["user_name"] = username or reservation.guest_name or "Unknown"
+    reservation_data["guest_name"] = reservation.guest_name
+    return reservation_data
+
+
+def _fetch_page(query, limit: Optional[int]) -> Tuple[list, Optional[str]]:
+    """Run a keyset-ordered query, returning the rows and the cursor of the next page."""
+    if limit is None:
+        return query.all(), None
+    
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1][0])
+
+
+def get_user_reservations_service(
+    db: Session,
+    user: User,
+    limit: Optional[int] = None,
+    **filters
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get a page of a user's reservations with club names, using a single joined query.
+
+    Returns the rows and the cursor for the next page (None on the last page).
+    Without a limit every matching reservation is returned.
+    """
+    now = datetime.now()
+    query = apply_listing_filters(_user_reservations_query(db, user.id), now=now, **filters)
+    rows, next_cursor = _fetch_page(query, limit)
+    return [_user_row(reservation, club_name, user.username, now) for reservation, club_name in rows], next_cursor
+
+
+def get_club_reservations_service(
+    db: Session,
+    club: Club,
+    limit: Optional[int] = None,
+    **filters
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get a page of a club's reservations with booker names, using a single joined query.
+
+    Returns the rows and the cursor for the next page (None on the last page).
+    Without a limit every matching reservation is returned.
+    """
+    now = datetime.now()
+    query = apply_listing_filters(_club_reservations_query(db, club.id), now=now, **filters)
+    rows, next_cursor = _fetch_page(query, limit)
+    return [_club_row(reservation, username, club.name, now) for reservation, username in rows], next_cursor
+
+
+def _iter_rows(build_query, format_row) -> Iterator[Dict[str, Any]]:
+    """Yield formatted listing rows from a server-side cursor.
+
+    Uses its own session so the stream does not depend on the request's
+    session still being open while the response body is sent.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        query = build_query(db, now).yield_per(STREAM_BATCH_SIZE)
+        for reservation, name in query:
+            yield format_row(reservation, name, now)
+    finally:
+        db.close()
+
+
+def _iter_user_rows(user_id: int, username: str, **filters) -> Iterator[Dict[str, Any]]:
+    return _iter_rows(
+        lambda db, now: apply_listing_filters(_user_reservations_query(db, user_id), now=now, **filters),
+        lambda reservation, club_name, now: _user_row(reservation, club_name, username, now)
+    )
+
+
+def _iter_club_rows(club_id: int, club_name: str, **filters) -> Iterator[Dict[str, Any]]:
+    return _iter_rows(
+        lambda db, now: apply_listing_filters(_club_reservations_query(db, club_id), now=now, **filters),
+        lambda reservation, username, now: _club_row(reservation, username, club_name, now)
+    )
+
+
+def _ndjson(rows: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(jsonable_encoder(row)) + "\n"
+
+
+def stream_user_reservations(user_id: int, username: str, **filters) -> Iterator[str]:
+    """Stream a user's reservations as NDJSON without loading them all into memory."""
+    return _ndjson(_iter_user_rows(user_id, username, **filters))
+
+
+def stream_club_reservations(club_id: int, club_name: str, **filters) -> Iterator[str]:
+    """Stream a club's reservations as NDJSON without loading them all into memory."""
+    return _ndjson(_iter_club_rows(club_id, club_name, **filters))
+
+
+def _chunks(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _export_value(row: Dict[str, Any], column: str):
+    value = row.get(column)
+    # Enum members (payment_method) are exported as their plain value
+    return getattr(value, "value", value)
+
+
+def export_club_reservations_csv(club_id: int, club_name: str, **filters) -> Iterator[str]:
+    """Stream a club's reservations as CSV, one chunk of rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    
+    for chunk in _chunks(_iter_club_rows(club_id, club_name, **filters), STREAM_BATCH_SIZE):
+        for row in chunk:
+            writer.writerow([_export_value(row, column) for column in EXPORT_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    
+    # Header only, when there are no rows
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands out whatever has been written since the last take()."""
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def export_club_reservations_parquet(club_id: int, club_name: str, **filters) -> Iterator[bytes]:
+    """Stream a club's reservations as Parquet, writing one row group per chunk.
+
+    Requires the optional pyarrow package (check parquet_export_available()).
+    """
+    schema = pa.schema([(column, EXPORT_PARQUET_TYPES[column]) for column in EXPORT_COLUMNS])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for chunk in _chunks(_iter_club_rows(club_id, club_name, **filters), STREAM_BATCH_SIZE):
+            columns = {
+                column: [_export_value(row, column) for row in chunk]
+                for column in EXPORT_COLUMNS
+            }
+            writer.write_table(pa.table(columns, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def parquet_export_available() -> bool:
+    return pa is not None
+
+
+def expand_series(series: ReservationSeriesCreate) -> List[datetime]:
+    """Turn a series request into the start datetime of every occurrence."""
+    try:
+        start = datetime.strptime(series.start_time, '%H:%M').time()
+        if series.dates:
+            days = [datetime.strptime(d, '%Y-%m-%d').date() for d in series.dates]
+        elif series.first_date and series.occurrences:
+            first_day = datetime.strptime(series.first_date, '%Y-%m-%d').date()
+            days = [
+                first_day + timedelta(days=i * series.interval_days)
+                for i in range(series.occurrences)
+            ]
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Provide either dates or first_date and occurrences"
+            )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid date or time format: {e}"
+        )
+
+    if len(days) > MAX_SERIES_OCCURRENCES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A series cannot have more than {MAX_SERIES_OCCURRENCES} occurrences"
+        )
+
+    return sorted({datetime.combine(day, start) for day in days})
+
+
+def assign_courts(
+    db: Session,
+    club_id: int,
+    starts: List[datetime],
+    duration: float,
+    court_id: Optional[int] = None,
+    hold_id: Optional[str] = None
+) -> Tuple[Dict[datetime, int], Dict[datetime, str]]:
+    """Pick a free court for every occurrence, checking existing bookings with one query.
+
+    Courts are tried in order, or only court_id when given. Returns the
+    court assigned to each start that can be booked and a reason for each
+    start that cannot. Overlapping occurrences of the same series are never
+    put on the same court.
+    """
+    courts = [court_id] if court_id is not None else get_active_court_ids(db, club_id)
+    length = timedelta(hours=duration)
+    ranges = [(start, start + length) for start in starts]
+
+    # The plain bounds on reservation_time let the planner skip month
+    # partitions the series cannot touch
+    existing = db.query(Reservation.court_id, Reservation.reservation_time, Reservation.duration).filter(
+        Reservation.club_id == club_id,
+        Reservation.status == ReservationStatusEnum.ACTIVE,
+        Reservation.reservation_time >= min(starts) - timedelta(hours=MAX_BOOKING_HOURS),
+        Reservation.reservation_time < max(starts) + length,
+        or_(*[reservation_range().op("&&")(func.tsrange(lo, hi)) for lo, hi in ranges])
+    ).all()
+    booked = [
+        (res_court_id, reservation_time, reservation_time + timedelta(hours=res_duration))
+        for res_court_id, reservation_time, res_duration in existing
+    ]
+
+    assigned = {}
+    conflicts = {}
+    accepted = []
+    for lo, hi in ranges:
+        taken = {b_court for b_court, b_lo, b_hi in booked if lo < b_hi and hi > b_lo}
+        free = [court for court in courts if court not in taken]
+        if not free:
+            conflicts[lo] = "The requested time slot is already booked"
+            continue
+        day_masks = reservation_day_masks(lo, duration)
+        free = [court for court in free if not held_by_others(court, day_masks, hold_id)]
+        if not free:
+            conflicts[lo] = "Currently held by another user"
+            continue
+        own = {a_court for a_court, a_lo, a_hi in accepted if lo < a_hi and hi > a_lo}
+        free = [court for court in free if court not in own]
+        if not free:
+            conflicts[lo] = "Overlaps another occurrence in this series"
+            continue
+        assigned[lo] = free[0]
+        accepted.append((free[0], lo, hi))
+    return assigned, conflicts
+
+
+def lock_partition_boundary(db: Session, club_id: int, starts: List[datetime], duration: float) -> bool:
+    """Serialise bookings of a club that could overlap across a month partition.
+
+    Each monthly partition only rejects overlaps among its own rows, so a
+    booking that runs past midnight on the 1st is not checked against one
+    stored in the next partition. Bookings near a month start take a
+    transaction-scoped advisory lock before checking for overlaps themselves.
+    Returns True when the lock was taken and the caller must do that check.
+    """
+    if not any(crosses_month_boundary(start, duration) for start in starts):
+        return False
+    db.execute(select(func.pg_advisory_xact_lock(PARTITION_BOUNDARY_LOCK, club_id)))
+    return True
+
+
+def create_reservation_series(
+    db: Session,
+    club: Club,
+    series: ReservationSeriesCreate,
+    user_id: Optional[int]
+) -> Tuple[List[Reservation], List[Dict[str, Any]]]:
+    """Book every free occurrence of a series in one transaction.
+
+    Returns the created reservations and a conflict entry for each occurrence
+    that was already taken. When skip_conflicts is off, any conflict aborts
+    the whole series before anything is written.
+    """
+    starts = expand_series(series)
+    if series.court_id is not None and series.court_id not in get_active_court_ids(db, club.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Court not found")
+
+    template = get_slot_template(db, club)
+    outside = {
+        start: "Outside the club's opening hours"
+        for start in starts if not template.covers(start, series.duration)
+    }
+    bookable = [start for start in starts if start not in outside]
+    courts, conflicts = {}, dict(outside)
+    if bookable:
+        lock_partition_boundary(db, club.id, bookable, series.duration)
+        courts, taken = assign_courts(db, club.id, bookable, series.duration, court_id=series.court_id)
+        conflicts.update(taken)
+
+    conflict_list = [
+        {
+            "date": start.strftime('%Y-%m-%d'),
+            "start_time": start.strftime('%H:%M'),
+            "end_time": (start + timedelta(hours=series.duration)).strftime('%H:%M'),
+            "detail": reason
+        }
+        for start, reason in sorted(conflicts.items())
+    ]
+
+    if conflicts and not series.skip_conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Some occurrences are already booked", "conflicts": conflict_list}
+        )
+
+    estimated_price = club.hourly_price * series.duration
+    new_reservations = [
+        Reservation(
+            club_id=club.id,
+            court_id=courts[start],
+            user_id=user_id,
+            reservation_time=start,
+            duration=series.duration,
+            guest_name=series.guest_name,
+            payment_method=series.payment_method.value,
+            estimated_price=estimated_price
+        )
+        for start in starts if start not in conflicts
+    ]
+
+    if new_reservations:
+        db.add_all(new_reservations)
+        try:
+            db.flush()
+        except IntegrityError as e:
+            # Another request booked one of the slots after the conflict check
+            db.rollback()
+            if not is_overlap_violation(e):
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Some of the requested time slots were just booked, please try again"
+            )
+
+        mark_reservations_booked(db, new_reservations)
+        add_to_daily_stats(db, new_reservations)
+        ids = [new_reservation.id for new_reservation in new_reservations]
+        db.commit()
+
+        # Reload the committed rows with one query instead of refreshing each
+        new_reservations = db.query(Reservation).filter(
+            Reservation.id.in_(ids)
+        ).order_by(Reservation.reservation_time).all()
+        reservations_committed(new_reservations)
+
+    logger.info(f"Created {len(new_reservations)} reservations for club {club.id}, {len(conflict_list)} conflicts")
+    return new_reservations, conflict_list
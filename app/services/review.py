@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, update, or_
 from typing import List, Optional, Dict, Any
 from app.models import Review, Comment, User, Club, UserBadgeEnum
 from app.schemas.review import ReviewCreate, CommentCreate
@@ -14,6 +14,15 @@ def create_review_service(db: Session, review: ReviewCreate, user_id: int) -> Re
     )
     db.add(db_review)
     
+    # Bump the club's counters in the same transaction; the UPDATE takes the
+    # row lock, so concurrent reviews cannot lose an increment. updated_at is
+    # kept, since it tracks edits of the club (and keys its slot template)
+    db.query(Club).filter(Club.id == review.club_id).update({
+        Club.rating_sum: Club.rating_sum + review.rating,
+        Club.reviews_count: Club.reviews_count + 1,
+        Club.updated_at: Club.updated_at
+    }, synchronize_session=False)
+    
     # Award the reviewer badge
     user = db.query(User).filter(User.id == user_id).first()
     user.add_badge(UserBadgeEnum.REVIEWER)
@@ -52,9 +61,11 @@ def get_club_reviews_service(db: Session, club_id: int) -> List[Dict[str, Any]]:
     return result
 
 def get_club_average_rating_service(db: Session, club_id: int) -> float:
-    """Get the average rating for a club"""
-    result = db.query(func.avg(Review.rating)).filter(Review.club_id == club_id).scalar()
-    return float(result) if result else 0.0
+    """Get the average rating for a club from its stored counters"""
+    club = db.query(Club.rating_sum, Club.reviews_count).filter(Club.id == club_id).first()
+    if not club or not club.reviews_count:
+        return 0.0
+    return club.rating_sum / club.reviews_count
 
 def create_comment_service(db: Session, comment: CommentCreate, user_id: int) -> Comment:
     """Create a new comment for a club and award the commenter badge"""
@@ -66,6 +77,11 @@ def create_comment_service(db: Session, comment: CommentCreate, user_id: int) ->
     )
     db.add(db_comment)
     
+    db.query(Club).filter(Club.id == comment.club_id).update({
+        Club.comments_count: Club.comments_count + 1,
+        Club.updated_at: Club.updated_at
+    }, synchronize_session=False)
+    
     # Award the commenter badge
     user = db.query(User).filter(User.id == user_id).first()
     user.add_badge(UserBadgeEnum.COMMENTER)
@@ -141,4 +157,32 @@ def get_club_comments_service(db: Session, club_id: int) -> List[Dict[str, Any]]
         }
         result.append(comment_dict)
     
-    return result 
\ No newline at end of file
+    return result 
+
+def reconcile_club_counters(db: Session, club_id: Optional[int] = None) -> int:
+    """Recompute the review and comment counters of clubs from the source tables.
+
+    Only clubs whose stored counters disagree are written. Returns the
+    number of clubs that were corrected.
+    """
+    rating_sum = select(func.coalesce(func.sum(Review.rating), 0.0)).where(Review.club_id == Club.id).scalar_subquery()
+    reviews_count = select(func.count(Review.id)).where(Review.club_id == Club.id).scalar_subquery()
+    comments_count = select(func.count(Comment.id)).where(Comment.club_id == Club.id).scalar_subquery()
+    
+    statement = update(Club).values(
+        rating_sum=rating_sum,
+        reviews_count=reviews_count,
+        comments_count=comments_count,
+        updated_at=Club.updated_at
+    ).where(or_(
+        # Incremental float sums may differ from a fresh sum in the last bits
+        func.abs(Club.rating_sum - rating_sum) > 1e-6,
+        Club.reviews_count != reviews_count,
+        Club.comments_count != comments_count
+    ))
+    if club_id is not None:
+        statement = statement.where(Club.id == club_id)
+    
+    corrected = db.execute(statement.execution_options(synchronize_session=False)).rowcount
+    db.commit()
+    return corrected
@@ -0,0 +1,174 @@
+from datetime import date
+from typing import Dict, Iterable, Set, Tuple
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.availability_cache import booked_mask_cache
+
+logger = logging.getLogger(__name__)
+
+# Identifies this worker process in cross-worker notifications
+PROCESS_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+# Postgres LISTEN/NOTIFY channel used by the multi-worker backend
+NOTIFY_CHANNEL = "club_slot_changes"
+
+Subscription = Tuple[asyncio.AbstractEventLoop, asyncio.Event]
+
+
+class SlotEventHub:
+    """In-process fan-out of "slots changed" signals per (club_id, day).
+
+    Each subscriber owns an asyncio.Event that is set from whichever thread
+    publishes. Several changes before the subscriber wakes up collapse into
+    one wake-up, and the subscriber re-reads the day and sends only the
+    slots that changed, so a slow client can never build up a backlog.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[Tuple[int, date], Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, club_id: int, day: date) -> Subscription:
+        subscription = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._subscribers.setdefault((club_id, day), set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, club_id: int, day: date, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get((club_id, day))
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[(club_id, day)]
+
+    def dispatch(self, club_id: int, day: date) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get((club_id, day), ()))
+        for loop, event in subscribers:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The subscriber's event loop is gone
+                self.unsubscribe(club_id, day, (loop, event))
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+class LocalSlotEventBackend:
+    """Delivers slot changes to subscribers of this process only."""
+
+    def __init__(self, hub: SlotEventHub):
+        self.hub = hub
+
+    def start(self) -> None:
+        pass
+
+    def publish(self, club_id: int, days: Iterable[date]) -> None:
+        for day in days:
+            self.hub.dispatch(club_id, day)
+
+
+class PostgresSlotEventBackend(LocalSlotEventBackend):
+    """Relays slot changes between worker processes with LISTEN/NOTIFY.
+
+    Every worker runs one listener thread on a dedicated connection, started
+    with the process rather than with the first stream. Changes from other
+    workers also drop the matching entries of this worker's availability
+    cache, so they are visible before the cache TTL runs out even when
+    nobody is subscribed here.
+    """
+
+    RECONNECT_DELAY = 5
+
+    def __init__(self, hub: SlotEventHub):
+        super().__init__(hub)
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._listen_forever, name="slot-events-listener", daemon=True).start()
+
+    def publish(self, club_id: int, days: Iterable[date]) -> None:
+        days = list(days)
+        payload = json.dumps({
+            "origin": PROCESS_ID,
+            "club_id": club_id,
+            "days": [day.isoformat() for day in days]
+        })
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": payload})
+        except Exception as e:
+            # Subscribers of this worker still get the change
+            logger.error(f"Error publishing slot change for club {club_id}: {e}")
+            super().publish(club_id, days)
+
+    def _listen_forever(self) -> None:
+        while True:
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"Slot event listener disconnected: {e}")
+            time.sleep(self.RECONNECT_DELAY)
+
+    def _listen(self) -> None:
+        raw = engine.raw_connection()
+        raw.detach()
+        conn = raw.dbapi_connection
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            logger.info(f"Listening for slot changes on channel {NOTIFY_CHANNEL}")
+
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self._handle(conn.notifies.pop(0).payload)
+        finally:
+            conn.close()
+
+    def _handle(self, payload: str) -> None:
+        message = json.loads(payload)
+        club_id = message["club_id"]
+        days = [date.fromisoformat(day) for day in message["days"]]
+        if message["origin"] != PROCESS_ID:
+            booked_mask_cache.invalidate(club_id, days)
+        for day in days:
+            self.hub.dispatch(club_id, day)
+
+
+SLOT_EVENT_BACKENDS = {
+    "local": LocalSlotEventBackend,
+    "postgres": PostgresSlotEventBackend
+}
+
+slot_event_hub = SlotEventHub()
+slot_event_backend = SLOT_EVENT_BACKENDS[settings.SLOT_EVENTS_BACKEND](slot_event_hub)
+slot_event_backend.start()
+
+
+def publish_slot_change(club_id: int, days: Iterable[date]) -> None:
+    """Tell subscribers that the given days of a club changed. Call after commit."""
+    slot_event_backend.publish(club_id, list(days))
@@ -0,0 +1,160 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, cast, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, timedelta
+import logging
+
+from app.db.partitions import archive_horizon
+from app.models import Club, Reservation, ReservationStatusEnum
+from app.models.stats import ClubDailyStats
+from app.services.availability import get_slot_template, get_active_court_ids
+
+logger = logging.getLogger(__name__)
+
+# Longest date range served by the dashboard, in days
+MAX_STATS_DAYS = 731
+
+STATS_GRANULARITIES = ("day", "week", "month")
+
+
+def _apply_stats_deltas(db: Session, reservations: List[Reservation], sign: int) -> None:
+    deltas: Dict[Tuple[int, date], List[float]] = {}
+    for reservation in reservations:
+        key = (reservation.club_id, reservation.reservation_time.date())
+        delta = deltas.setdefault(key, [0, 0.0, 0.0])
+        delta[0] += sign
+        delta[1] += sign * reservation.duration
+        delta[2] += sign * (reservation.estimated_price or 0)
+    if not deltas:
+        return
+
+    stmt = pg_insert(ClubDailyStats).values([
+        {"club_id": club_id, "day": day, "reservations_count": count, "booked_hours": hours, "revenue": revenue}
+        for (club_id, day), (count, hours, revenue) in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ClubDailyStats.club_id, ClubDailyStats.day],
+        set_={
+            "reservations_count": ClubDailyStats.reservations_count + stmt.excluded.reservations_count,
+            "booked_hours": ClubDailyStats.booked_hours + stmt.excluded.booked_hours,
+            "revenue": ClubDailyStats.revenue + stmt.excluded.revenue,
+            "updated_at": func.now()
+        }
+    )
+    db.execute(stmt)
+
+
+def add_to_daily_stats(db: Session, reservations: List[Reservation]) -> None:
+    """Add new reservations to the daily rollup. Call inside the inserting transaction."""
+    _apply_stats_deltas(db, reservations, 1)
+
+
+def remove_from_daily_stats(db: Session, reservation: Reservation) -> None:
+    """Take a cancelled reservation out of the daily rollup. Call inside the cancelling transaction."""
+    _apply_stats_deltas(db, [reservation], -1)
+
+
+def rebuild_daily_stats(db: Session, club_id: Optional[int] = None) -> int:
+    """Recompute the daily rollup from the reservations table with one INSERT ... SELECT.
+
+    Rebuilds a single club when club_id is given, otherwise every club.
+    Days in archived partitions keep their rows, since their reservations
+    are no longer in the table. Returns the number of club/day rows written.
+    """
+    day = cast(Reservation.reservation_time, Date)
+    totals = db.query(
+        Reservation.club_id,
+        day,
+        func.count(Reservation.id),
+        func.sum(Reservation.duration),
+        func.coalesce(func.sum(Reservation.estimated_price), 0)
+    ).filter(
+        Reservation.status == ReservationStatusEnum.ACTIVE
+    ).group_by(Reservation.club_id, day)
+
+    stats_query = db.query(ClubDailyStats)
+    if club_id is not None:
+        totals = totals.filter(Reservation.club_id == club_id)
+        stats_query = stats_query.filter(ClubDailyStats.club_id == club_id)
+    horizon = archive_horizon(db.connection())
+    if horizon is not None:
+        totals = totals.filter(Reservation.reservation_time >= horizon)
+        stats_query = stats_query.filter(ClubDailyStats.day >= horizon)
+
+    stats_query.delete(synchronize_session=False)
+    result = db.execute(
+        pg_insert(ClubDailyStats).from_select(
+            ["club_id", "day", "reservations_count", "booked_hours", "revenue"],
+            totals.statement
+        )
+    )
+    db.commit()
+
+    logger.info(f"Rebuilt daily stats with {result.rowcount} club/day rows")
+    return result.rowcount
+
+
+def _period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def get_club_stats(db: Session, club: Club, first_day: date, last_day: date, granularity: str = "day") -> Dict[str, Any]:
+    """Revenue, booked hours and utilization of a club per day, week or month.
+
+    Reads one rollup row per day with a single range query; utilization is
+    booked hours over the court hours the club was open in each period,
+    counting the courts it has today.
+    """
+    rows = db.query(
+        ClubDailyStats.day,
+        ClubDailyStats.reservations_count,
+        ClubDailyStats.booked_hours,
+        ClubDailyStats.revenue
+    ).filter(
+        ClubDailyStats.club_id == club.id,
+        ClubDailyStats.day >= first_day,
+        ClubDailyStats.day <= last_day
+    ).all()
+    stats_by_day = {row.day: row for row in rows}
+    template = get_slot_template(db, club)
+    courts = len(get_active_court_ids(db, club.id))
+
+    periods: Dict[date, Dict[str, Any]] = {}
+    day = first_day
+    while day <= last_day:
+        period = periods.setdefault(_period_start(day, granularity), {
+            "reservations": 0, "booked_hours": 0.0, "revenue": 0.0, "open_hours": 0.0
+        })
+        period["open_hours"] += template.open_hours(day) * courts
+        row = stats_by_day.get(day)
+        if row is not None:
+            period["reservations"] += row.reservations_count
+            period["booked_hours"] += row.booked_hours
+            period["revenue"] += row.revenue
+        day += timedelta(days=1)
+
+    def summarize(period_start: Optional[date], values: Dict[str, Any]) -> Dict[str, Any]:
+        open_hours = values["open_hours"]
+        return {
+            "period_start": period_start,
+            "reservations": values["reservations"],
+            "booked_hours": round(values["booked_hours"], 2),
+            "revenue": round(values["revenue"], 2),
+            "open_hours": round(open_hours, 2),
+            "utilization": round(values["booked_hours"] / open_hours, 4) if open_hours else None
+        }
+
+    totals = {key: sum(period[key] for period in periods.values()) for key in ("reservations", "booked_hours", "revenue", "open_hours")}
+    return {
+        "club_id": club.id,
+        "granularity": granularity,
+        "date_from": first_day,
+        "date_to": last_day,
+        "totals": summarize(None, totals),
+        "periods": [summarize(start, values) for start, values in sorted(periods.items())]
+    }
@@ -0,0 +1,237 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException, status
+from typing import List
+from datetime import datetime, timedelta
+import logging
+import pytz
+
+from app.db.session import SessionLocal
+from app.db.partitions import MAX_BOOKING_HOURS
+from app.models import Club, Reservation, ReservationStatusEnum, User
+from app.models.waitlist import WaitlistEntry, WaitlistStatusEnum
+from app.schemas.reservation import PaymentMethodEnum
+from app.services.availability import (
+    get_free_courts, get_active_court_ids, get_slot_template, reservation_day_masks, held_by_others,
+    is_overlap_violation, mark_reservations_booked, reservations_committed
+)
+from app.services.reservation import lock_partition_boundary
+from app.services.stats import add_to_daily_stats
+
+logger = logging.getLogger(__name__)
+
+# Promotion retries when a direct booking grabs a freed slot at the same moment
+PROMOTION_ATTEMPTS = 3
+
+# Advisory lock namespace taken (with the user id) while promoting that user's entries
+WAITLIST_USER_LOCK = 7002
+
+
+def join_waitlist(
+    db: Session,
+    club: Club,
+    user: User,
+    start_time: datetime,
+    duration: float,
+    payment_method: PaymentMethodEnum
+) -> WaitlistEntry:
+    """Queue a user for a slot where every court is currently booked or held by someone else."""
+    if start_time < datetime.now():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot book time slots in the past"
+        )
+    if not get_slot_template(db, club).covers(start_time, duration):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The requested time is outside the club's opening hours"
+        )
+
+    if get_free_courts(db, club.id, start_time, duration):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The requested time slot is available, book it instead"
+        )
+
+    entry = WaitlistEntry(
+        club_id=club.id,
+        user_id=user.id,
+        reservation_time=start_time,
+        duration=duration,
+        payment_method=payment_method.value
+    )
+    db.add(entry)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You are already on the waitlist for this slot"
+        )
+    db.refresh(entry)
+
+    logger.info(f"User {user.id} joined the waitlist of club {club.id} at {start_time} for {duration}h")
+    return entry
+
+
+def get_user_waitlist(db: Session, user: User) -> List[WaitlistEntry]:
+    return db.query(WaitlistEntry).filter(
+        WaitlistEntry.user_id == user.id
+    ).order_by(WaitlistEntry.reservation_time, WaitlistEntry.id).all()
+
+
+def leave_waitlist(db: Session, entry_id: int, user: User) -> None:
+    entry = db.query(WaitlistEntry).filter(
+        WaitlistEntry.id == entry_id,
+        WaitlistEntry.user_id == user.id
+    ).first()
+    if entry is None or entry.status != WaitlistStatusEnum.WAITING:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Waitlist entry not found")
+    entry.status = WaitlistStatusEnum.CANCELLED
+    db.commit()
+
+
+def _promote_batch(db: Session, club_id: int, freed_start: datetime, freed_end: datetime) -> List[Reservation]:
+    """Book, in queue order, every waiting entry that fits the freed time, in one transaction.
+
+    Entries that overlap another active booking of the same user are skipped.
+    """
+    now = datetime.now()
+    # Waiting entries that touch the freed range; SKIP LOCKED lets concurrent
+    # promotions for neighbouring cancellations share the queue
+    entries = [
+        entry for entry in db.query(WaitlistEntry).filter(
+            WaitlistEntry.club_id == club_id,
+            WaitlistEntry.status == WaitlistStatusEnum.WAITING,
+            WaitlistEntry.reservation_time >= max(freed_start - timedelta(hours=MAX_BOOKING_HOURS), now),
+            WaitlistEntry.reservation_time < freed_end
+        ).order_by(WaitlistEntry.created_at, WaitlistEntry.id).with_for_update(skip_locked=True)
+        if entry.reservation_time + timedelta(hours=entry.duration) > freed_start
+    ]
+    if not entries:
+        db.rollback()
+        return []
+
+    # SKIP LOCKED only guards the entries: promotions for neighbouring
+    # cancellations can hold different entries of the same user, so users
+    # are serialised too (in id order, so batches cannot deadlock)
+    user_ids = sorted({entry.user_id for entry in entries})
+    for user_id in user_ids:
+        db.execute(select(func.pg_advisory_xact_lock(WAITLIST_USER_LOCK, user_id)))
+
+    club = db.query(Club).filter(Club.id == club_id).first()
+    template = get_slot_template(db, club)
+    courts = get_active_court_ids(db, club_id)
+    for entry in entries:
+        lock_partition_boundary(db, club_id, [entry.reservation_time], entry.duration)
+
+    # Everything the candidates could collide with, fetched with one range query
+    span_start = min(entry.reservation_time for entry in entries)
+    span_end = max(entry.reservation_time + timedelta(hours=entry.duration) for entry in entries)
+    taken = [
+        (court_id, reservation_time, reservation_time + timedelta(hours=duration))
+        for court_id, reservation_time, duration in db.query(
+            Reservation.court_id, Reservation.reservation_time, Reservation.duration
+        ).filter(
+            Reservation.club_id == club_id,
+            Reservation.status == ReservationStatusEnum.ACTIVE,
+            Reservation.reservation_time >= span_start - timedelta(hours=MAX_BOOKING_HOURS),
+            Reservation.reservation_time < span_end
+        )
+    ]
+    # The users' own bookings at any club, read after their locks were taken
+    user_bookings = [
+        (user_id, reservation_time, reservation_time + timedelta(hours=duration))
+        for user_id, reservation_time, duration in db.query(
+            Reservation.user_id, Reservation.reservation_time, Reservation.duration
+        ).filter(
+            Reservation.user_id.in_(user_ids),
+            Reservation.status == ReservationStatusEnum.ACTIVE,
+            Reservation.reservation_time >= span_start - timedelta(hours=MAX_BOOKING_HOURS),
+            Reservation.reservation_time < span_end
+        )
+    ]
+
+    promoted = []
+    for entry in entries:
+        start = entry.reservation_time
+        end = start + timedelta(hours=entry.duration)
+        if not template.covers(start, entry.duration):
+            continue
+        if any(
+            user_id == entry.user_id and start < b_end and end > b_start
+            for user_id, b_start, b_end in user_bookings
+        ):
+            # The user already has a booking then; the entry keeps waiting
+            continue
+        busy = {court_id for court_id, b_start, b_end in taken if start < b_end and end > b_start}
+        day_masks = reservation_day_masks(start, entry.duration)
+        free = [
+            court_id for court_id in courts
+            if court_id not in busy and not held_by_others(court_id, day_masks)
+        ]
+        if not free:
+            continue
+        taken.append((free[0], start, end))
+        user_bookings.append((entry.user_id, start, end))
+        promoted.append((entry, Reservation(
+            club_id=club_id,
+            court_id=free[0],
+            user_id=entry.user_id,
+            reservation_time=start,
+            duration=entry.duration,
+            payment_method=entry.payment_method,
+            estimated_price=club.hourly_price * entry.duration
+        )))
+    if not promoted:
+        db.rollback()
+        return []
+
+    new_reservations = [reservation for _, reservation in promoted]
+    db.add_all(new_reservations)
+    db.flush()
+    promoted_at = datetime.now(pytz.utc)
+    for entry, reservation in promoted:
+        entry.status = WaitlistStatusEnum.PROMOTED
+        entry.reservation_id = reservation.id
+        entry.promoted_at = promoted_at
+
+    mark_reservations_booked(db, new_reservations)
+    add_to_daily_stats(db, new_reservations)
+    db.commit()
+    reservations_committed(new_reservations)
+    return new_reservations
+
+
+def promote_waitlist(club_id: int, freed_start: datetime, freed_end: datetime) -> int:
+    """Promote waiting users into a freed time range. Runs as a background task.
+
+    Uses its own session, so it can run after the cancelling request has
+    returned. Returns the number of reservations created.
+    """
+    db = SessionLocal()
+    try:
+        for attempt in range(PROMOTION_ATTEMPTS):
+            try:
+                promoted = _promote_batch(db, club_id, freed_start, freed_end)
+                break
+            except IntegrityError as e:
+                # A direct booking took one of the slots after our check; retry
+                db.rollback()
+                if not is_overlap_violation(e):
+                    raise
+        else:
+            logger.warning(f"Gave up promoting the waitlist of club {club_id} at {freed_start}")
+            return 0
+
+        if promoted:
+            logger.info(f"Promoted {len(promoted)} waitlist entries into club {club_id} at {freed_start}")
+        return len(promoted)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error promoting the waitlist of club {club_id}: {e}", exc_info=True)
+        return 0
+    finally:
+        db.close()
@@ -1,8 +1,11 @@
 from app.db.session import engine, Base
 from app.models.user import User, UserRoleEnum, UserBadgeEnum
-from app.models.club import Club
+from app.models.club import Club, ClubOpeningHours, Court
 from app.models.review import Review, Comment
-from app.models.reservation import Reservation, PaymentMethodEnum
+from app.models.reservation import Reservation, PaymentMethodEnum, ReservationStatusEnum
+from app.models.availability import ClubDayAvailability
+from app.models.stats import ClubDailyStats
+from app.models.waitlist import WaitlistEntry
 import logging
 
 # Configure logging
@@ -0,0 +1,86 @@
+import csv
+import sys
+import logging
+
+from app.db.session import SessionLocal
+from app.models.club import Club
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _key(*parts):
+    return tuple((part or "").strip().lower() for part in parts)
+
+def _coordinates(row):
+    latitude, longitude = float(row["latitude"]), float(row["longitude"])
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError(f"coordinates out of range: {latitude}, {longitude}")
+    return latitude, longitude
+
+def load_locations(path):
+    """Read a CSV with latitude and longitude plus id, or name and town, or only town per row.
+
+    Rows with only a town form a gazetteer used for clubs that match no
+    other row; they place the club at the town's coordinates.
+    """
+    by_id, by_name, by_town = {}, {}, {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                coordinates = _coordinates(row)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping line {line}: {e}")
+                continue
+            if (row.get("id") or "").strip():
+                by_id[int(row["id"])] = coordinates
+            elif (row.get("name") or "").strip():
+                by_name[_key(row["name"], row.get("town"))] = coordinates
+            elif (row.get("town") or "").strip():
+                by_town[_key(row["town"])] = coordinates
+    return by_id, by_name, by_town
+
+def main(path, overwrite=False):
+    by_id, by_name, by_town = load_locations(path)
+    logger.info(f"Loaded {len(by_id)} club ids, {len(by_name)} club names and {len(by_town)} towns from {path}")
+    
+    db = SessionLocal()
+    try:
+        query = db.query(Club)
+        if not overwrite:
+            query = query.filter(Club.latitude.is_(None))
+        
+        exact = approximate = 0
+        for club in query.yield_per(1000):
+            coordinates = by_id.get(club.id) or by_name.get(_key(club.name, club.town))
+            if coordinates:
+                exact += 1
+            else:
+                coordinates = by_town.get(_key(club.town))
+                if not coordinates:
+                    continue
+                approximate += 1
+            club.latitude, club.longitude = coordinates
+        
+        db.commit()
+        logger.info(f"Located {exact} clubs exactly and {approximate} by town")
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error importing club locations: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python import_club_locations.py locations.csv [--overwrite]
+    # The CSV has latitude and longitude columns and identifies clubs by id, by
+    # name and town, or (for a town-level fallback) by town alone. Only clubs
+    # without coordinates are updated unless --overwrite is given.
+    if len(sys.argv) < 2:
+        print("Usage: python import_club_locations.py locations.csv [--overwrite]")
+        sys.exit(1)
+    if main(sys.argv[1], overwrite="--overwrite" in sys.argv[2:]):
+        print("Club locations imported successfully!")
+    else:
+        print("Failed to import club locations. Check logs for details.")
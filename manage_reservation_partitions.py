@@ -0,0 +1,36 @@
+import sys
+import logging
+from datetime import date
+
+from app.db.session import engine
+from app.db.partitions import ensure_partitions, archive_partitions, month_start, add_months, MONTHS_AHEAD
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main(keep_months=None, tablespace=None):
+    this_month = month_start(date.today())
+    try:
+        with engine.begin() as conn:
+            created = ensure_partitions(conn, this_month, add_months(this_month, MONTHS_AHEAD))
+            logger.info(f"Created {len(created)} partitions: {', '.join(created) or 'none'}")
+            
+            if keep_months is not None:
+                archived = archive_partitions(conn, add_months(this_month, -keep_months), tablespace)
+                logger.info(f"Archived {len(archived)} partitions: {', '.join(archived) or 'none'}")
+        return True
+    except Exception as e:
+        logger.error(f"Error managing reservation partitions: {e}")
+        return False
+
+if __name__ == "__main__":
+    # Usage: python manage_reservation_partitions.py [keep_months [tablespace]]
+    # Creates the partitions for the coming months and, with keep_months, moves
+    # partitions older than that many months into the reservations_archive schema.
+    keep_months = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    tablespace = sys.argv[2] if len(sys.argv) > 2 else None
+    if main(keep_months, tablespace):
+        print("Reservation partitions are up to date!")
+    else:
+        print("Failed to manage reservation partitions. Check logs for details.")
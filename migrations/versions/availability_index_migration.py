@@ -0,0 +1,34 @@
+"""Add per-club/day availability index and reservations (club_id, reservation_time) index
+
+Revision ID: availability_index_migration
+Revises: latest_migration
+Create Date: 2026-10-17 09:00:00.000000
+
+After upgrading, backfill the index with ``python rebuild_availability_index.py``.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'availability_index_migration'
+down_revision = 'latest_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('club_day_availability',
+        sa.Column('club_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('booked_mask', postgresql.BIT(96), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('club_id', 'day')
+    )
+    op.create_index('ix_reservations_club_id_reservation_time', 'reservations', ['club_id', 'reservation_time'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reservations_club_id_reservation_time', table_name='reservations')
+    op.drop_table('club_day_availability')
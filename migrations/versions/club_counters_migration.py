@@ -0,0 +1,51 @@
+"""Store review and comment counters on clubs
+
+Revision ID: club_counters_migration
+Revises: club_location_migration
+Create Date: 2026-10-17 21:00:00.000000
+
+Adds rating_sum, reviews_count and comments_count to clubs, backfills them
+from the reviews and comments tables, and indexes the average rating for
+the rating sort of the club list.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'club_counters_migration'
+down_revision = 'club_location_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('clubs', sa.Column('rating_sum', sa.Float(), server_default='0', nullable=False))
+    op.add_column('clubs', sa.Column('reviews_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('clubs', sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE clubs c SET rating_sum = r.rating_sum, reviews_count = r.reviews_count
+        FROM (
+            SELECT club_id, sum(rating) AS rating_sum, count(*) AS reviews_count
+            FROM reviews GROUP BY club_id
+        ) r
+        WHERE r.club_id = c.id
+    """)
+    op.execute("""
+        UPDATE clubs c SET comments_count = m.comments_count
+        FROM (SELECT club_id, count(*) AS comments_count FROM comments GROUP BY club_id) m
+        WHERE m.club_id = c.id
+    """)
+
+    op.execute("""
+        CREATE INDEX ix_clubs_average_rating_id ON clubs (
+            (CASE WHEN (reviews_count > 0) THEN rating_sum / reviews_count ELSE 0.0 END), id
+        )
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_clubs_average_rating_id', table_name='clubs')
+    op.drop_column('clubs', 'comments_count')
+    op.drop_column('clubs', 'reviews_count')
+    op.drop_column('clubs', 'rating_sum')
@@ -0,0 +1,41 @@
+"""Add the club_daily_stats rollup table and backfill it
+
+Revision ID: club_daily_stats_migration
+Revises: club_opening_hours_migration
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'club_daily_stats_migration'
+down_revision = 'club_opening_hours_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'club_daily_stats',
+        sa.Column('club_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('reservations_count', sa.Integer(), nullable=False),
+        sa.Column('booked_hours', sa.Float(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('club_id', 'day')
+    )
+
+    # Reservations count towards the day they start on
+    op.execute("""
+        INSERT INTO club_daily_stats (club_id, day, reservations_count, booked_hours, revenue)
+        SELECT club_id, reservation_time::date, count(*), sum(duration), coalesce(sum(estimated_price), 0)
+        FROM reservations
+        GROUP BY club_id, reservation_time::date
+    """)
+
+
+def downgrade():
+    op.drop_table('club_daily_stats')
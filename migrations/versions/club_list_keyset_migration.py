@@ -0,0 +1,24 @@
+"""Add keyset indexes for the sorted club list
+
+Revision ID: club_list_keyset_migration
+Revises: club_search_migration
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'club_list_keyset_migration'
+down_revision = 'club_search_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_clubs_hourly_price_id', 'clubs', ['hourly_price', 'id'])
+    op.create_index('ix_clubs_created_at_id', 'clubs', ['created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_clubs_created_at_id', table_name='clubs')
+    op.drop_index('ix_clubs_hourly_price_id', table_name='clubs')
@@ -0,0 +1,27 @@
+"""Add club coordinates
+
+Revision ID: club_location_migration
+Revises: club_list_keyset_migration
+Create Date: 2026-10-17 20:00:00.000000
+
+Coordinates are backfilled with import_club_locations.py. Proximity
+queries use an in-process grid index, so no spatial index is needed here.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'club_location_migration'
+down_revision = 'club_list_keyset_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('clubs', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('clubs', sa.Column('longitude', sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('clubs', 'longitude')
+    op.drop_column('clubs', 'latitude')
@@ -0,0 +1,39 @@
+"""Add per-club opening hours and slot length
+
+Revision ID: club_opening_hours_migration
+Revises: reservation_listing_index_migration
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'club_opening_hours_migration'
+down_revision = 'reservation_listing_index_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('clubs', sa.Column('slot_minutes', sa.Integer(), nullable=False, server_default='60'))
+
+    # Clubs without rows keep the previous 08:00-22:00 schedule
+    op.create_table(
+        'club_opening_hours',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('club_id', sa.Integer(), nullable=False),
+        sa.Column('weekday', sa.Integer(), nullable=False),
+        sa.Column('open_time', sa.Time(), nullable=False),
+        sa.Column('close_time', sa.Time(), nullable=False),
+        sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('club_id', 'weekday', name='uq_club_opening_hours_club_id_weekday')
+    )
+    op.create_index(op.f('ix_club_opening_hours_id'), 'club_opening_hours', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_club_opening_hours_id'), table_name='club_opening_hours')
+    op.drop_table('club_opening_hours')
+    op.drop_column('clubs', 'slot_minutes')
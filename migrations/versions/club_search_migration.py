@@ -0,0 +1,40 @@
+"""Full-text and trigram search over clubs
+
+Revision ID: club_search_migration
+Revises: courts_migration
+Create Date: 2026-10-17 18:00:00.000000
+
+Adds a stored generated tsvector over name, town and description with a
+GIN index, and trigram GIN indexes on name and town. The trigram indexes
+also serve the existing substring ILIKE filters of the club list.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'club_search_migration'
+down_revision = 'courts_migration'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(town, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('clubs', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True)))
+    op.create_index('ix_clubs_search_vector', 'clubs', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_clubs_name_trgm', 'clubs', ['name'], postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_clubs_town_trgm', 'clubs', ['town'], postgresql_using='gin', postgresql_ops={'town': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_clubs_town_trgm', table_name='clubs')
+    op.drop_index('ix_clubs_name_trgm', table_name='clubs')
+    op.drop_index('ix_clubs_search_vector', table_name='clubs')
+    op.drop_column('clubs', 'search_vector')
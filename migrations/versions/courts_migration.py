@@ -0,0 +1,122 @@
+"""Schedule reservations per court
+
+Revision ID: courts_migration
+Revises: waitlist_entries_migration
+Create Date: 2026-10-17 17:00:00.000000
+
+Adds the courts table with one "Court 1" per existing club and assigns
+every reservation to its club's court. The overlap constraints of all
+partitions and the availability index move from club to court. Partitions
+already detached into the reservations_archive schema get court_id too.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'courts_migration'
+down_revision = 'waitlist_entries_migration'
+branch_labels = None
+depends_on = None
+
+RESERVATION_RANGE = "tsrange(reservation_time, reservation_time + duration * interval '1 hour')"
+ARCHIVE_SCHEMA = "reservations_archive"
+
+
+def _archived_tables(conn):
+    return [
+        f"{ARCHIVE_SCHEMA}.{name}" for name in conn.execute(sa.text(
+            "SELECT tablename FROM pg_tables WHERE schemaname = :schema AND tablename LIKE 'reservations_y%'"
+        ), {"schema": ARCHIVE_SCHEMA}).scalars()
+    ]
+
+
+def _replace_overlap_constraints(column):
+    conn = op.get_bind()
+    constraints = conn.execute(sa.text("""
+        SELECT conrelid::regclass::text, conname
+        FROM pg_constraint
+        WHERE contype = 'x' AND conname LIKE 'reservations_no_overlap%'
+    """)).all()
+    for table, name in constraints:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+        op.execute(f"""
+            ALTER TABLE {table}
+            ADD CONSTRAINT {name}
+            EXCLUDE USING gist ({column} WITH =, {RESERVATION_RANGE} WITH &&) WHERE (status = 'active')
+        """)
+
+
+def upgrade():
+    op.create_table(
+        'courts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('club_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('position', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('is_active', sa.Boolean(), server_default='true', nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_courts_id', 'courts', ['id'])
+    op.create_index('ix_courts_club_id', 'courts', ['club_id'])
+    op.execute("INSERT INTO courts (club_id, name, position) SELECT id, 'Court 1', 1 FROM clubs")
+
+    # Existing bookings all go to the club's only court
+    op.add_column('reservations', sa.Column('court_id', sa.Integer(), nullable=True))
+    op.execute("UPDATE reservations r SET court_id = c.id FROM courts c WHERE c.club_id = r.club_id")
+    op.alter_column('reservations', 'court_id', nullable=False)
+    op.create_foreign_key('reservations_court_id_fkey', 'reservations', 'courts', ['court_id'], ['id'])
+    for table in _archived_tables(op.get_bind()):
+        op.execute(f"ALTER TABLE {table} ADD COLUMN court_id integer")
+        op.execute(f"UPDATE {table} r SET court_id = c.id FROM courts c WHERE c.club_id = r.club_id")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN court_id SET NOT NULL")
+    op.create_index(
+        'ix_reservations_court_id_reservation_time', 'reservations', ['court_id', 'reservation_time'],
+        postgresql_where=sa.text("status = 'active'")
+    )
+    _replace_overlap_constraints('court_id')
+
+    op.add_column('club_day_availability', sa.Column('court_id', sa.Integer(), nullable=True))
+    op.execute("UPDATE club_day_availability a SET court_id = c.id FROM courts c WHERE c.club_id = a.club_id")
+    op.alter_column('club_day_availability', 'court_id', nullable=False)
+    op.create_foreign_key(
+        'club_day_availability_court_id_fkey', 'club_day_availability', 'courts', ['court_id'], ['id'],
+        ondelete='CASCADE'
+    )
+    op.drop_constraint('club_day_availability_pkey', 'club_day_availability', type_='primary')
+    op.create_primary_key('club_day_availability_pkey', 'club_day_availability', ['club_id', 'day', 'court_id'])
+
+
+def downgrade():
+    # Only the first court of each club survives; bookings on the other courts
+    # would collide under a per-club constraint, so they are cancelled
+    archived = _archived_tables(op.get_bind())
+    for table in ["reservations"] + archived:
+        op.execute(f"""
+            UPDATE {table} r SET status = 'cancelled', cancelled_at = now()
+            WHERE r.status = 'active' AND r.court_id <> (
+                SELECT c.id FROM courts c WHERE c.club_id = r.club_id ORDER BY c.position, c.id LIMIT 1
+            )
+        """)
+    op.execute("""
+        DELETE FROM club_day_availability a
+        WHERE a.court_id <> (
+            SELECT c.id FROM courts c WHERE c.club_id = a.club_id ORDER BY c.position, c.id LIMIT 1
+        )
+    """)
+    op.drop_constraint('club_day_availability_pkey', 'club_day_availability', type_='primary')
+    op.create_primary_key('club_day_availability_pkey', 'club_day_availability', ['club_id', 'day'])
+    op.drop_constraint('club_day_availability_court_id_fkey', 'club_day_availability', type_='foreignkey')
+    op.drop_column('club_day_availability', 'court_id')
+
+    _replace_overlap_constraints('club_id')
+    op.drop_index('ix_reservations_court_id_reservation_time', table_name='reservations')
+    op.drop_constraint('reservations_court_id_fkey', 'reservations', type_='foreignkey')
+    op.drop_column('reservations', 'court_id')
+    for table in archived:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN court_id")
+
+    op.drop_index('ix_courts_club_id', table_name='courts')
+    op.drop_index('ix_courts_id', table_name='courts')
+    op.drop_table('courts')
@@ -0,0 +1,22 @@
+"""Index reservations by (user_id, reservation_time) for keyset-paginated listings
+
+Revision ID: reservation_listing_index_migration
+Revises: reservation_overlap_constraint_migration
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'reservation_listing_index_migration'
+down_revision = 'reservation_overlap_constraint_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_reservations_user_id_reservation_time', 'reservations', ['user_id', 'reservation_time'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reservations_user_id_reservation_time', table_name='reservations')
@@ -0,0 +1,49 @@
+"""Reject overlapping reservations with a GiST exclusion constraint
+
+Revision ID: reservation_overlap_constraint_migration
+Revises: availability_index_migration
+Create Date: 2026-10-17 10:00:00.000000
+
+The constraint cannot be added while overlapping bookings exist, so the
+upgrade stops with a clear error if any are found. Resolve them first.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'reservation_overlap_constraint_migration'
+down_revision = 'availability_index_migration'
+branch_labels = None
+depends_on = None
+
+RESERVATION_RANGE = "tsrange(reservation_time, reservation_time + duration * interval '1 hour')"
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    
+    conn = op.get_bind()
+    overlaps = conn.execute(sa.text("""
+        SELECT COUNT(*)
+        FROM reservations a
+        JOIN reservations b
+          ON a.club_id = b.club_id
+         AND a.id < b.id
+         AND tsrange(a.reservation_time, a.reservation_time + a.duration * interval '1 hour')
+          && tsrange(b.reservation_time, b.reservation_time + b.duration * interval '1 hour')
+    """)).scalar()
+    if overlaps:
+        raise RuntimeError(
+            f"Found {overlaps} pairs of overlapping reservations; "
+            "resolve them before adding reservations_no_overlap"
+        )
+    
+    op.execute(f"""
+        ALTER TABLE reservations
+        ADD CONSTRAINT reservations_no_overlap
+        EXCLUDE USING gist (club_id WITH =, {RESERVATION_RANGE} WITH &&)
+    """)
+
+
+def downgrade():
+    op.execute("ALTER TABLE reservations DROP CONSTRAINT reservations_no_overlap")
@@ -0,0 +1,102 @@
+"""Partition reservations by month of reservation_time
+
+Revision ID: reservation_partitioning_migration
+Revises: club_daily_stats_migration
+Create Date: 2026-10-17 14:00:00.000000
+
+The existing table is renamed, a RANGE-partitioned reservations table is
+created in its place with one partition per month (from the oldest booking
+to two years ahead) plus a default partition, and the rows are copied
+across. The exclusion constraint moves to the partitions, and the primary
+key becomes (id, reservation_time) because PostgreSQL requires the
+partition key in it. Run during a maintenance window; the copy holds an
+exclusive lock on reservations.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'reservation_partitioning_migration'
+down_revision = 'club_daily_stats_migration'
+branch_labels = None
+depends_on = None
+
+RESERVATION_RANGE = "tsrange(reservation_time, reservation_time + duration * interval '1 hour')"
+MONTHS_AHEAD = 24
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partition(name, bounds):
+    op.execute(f"CREATE TABLE {name} PARTITION OF reservations {bounds}")
+    op.execute(f"""
+        ALTER TABLE {name}
+        ADD CONSTRAINT reservations_no_overlap_{name[len('reservations_'):]}
+        EXCLUDE USING gist (club_id WITH =, {RESERVATION_RANGE} WITH &&)
+    """)
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    op.execute("ALTER TABLE reservations RENAME TO reservations_unpartitioned")
+    op.execute("ALTER TABLE reservations_unpartitioned DROP CONSTRAINT reservations_no_overlap")
+    op.execute("ALTER TABLE reservations_unpartitioned RENAME CONSTRAINT reservations_pkey TO reservations_unpartitioned_pkey")
+    for index in ("ix_reservations_id", "ix_reservations_club_id_reservation_time", "ix_reservations_user_id_reservation_time"):
+        op.execute(f"ALTER INDEX {index} RENAME TO {index.replace('reservations', 'reservations_unpartitioned', 1)}")
+
+    op.execute("""
+        CREATE TABLE reservations (LIKE reservations_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE (reservation_time)
+    """)
+    op.execute("ALTER TABLE reservations ADD CONSTRAINT reservations_pkey PRIMARY KEY (id, reservation_time)")
+    op.execute("ALTER TABLE reservations ADD CONSTRAINT reservations_club_id_fkey FOREIGN KEY (club_id) REFERENCES clubs (id)")
+    op.execute("ALTER TABLE reservations ADD CONSTRAINT reservations_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER SEQUENCE reservations_id_seq OWNED BY reservations.id")
+    op.create_index('ix_reservations_id', 'reservations', ['id'])
+    op.create_index('ix_reservations_club_id_reservation_time', 'reservations', ['club_id', 'reservation_time'])
+    op.create_index('ix_reservations_user_id_reservation_time', 'reservations', ['user_id', 'reservation_time'])
+
+    oldest = conn.execute(sa.text("SELECT min(reservation_time) FROM reservations_unpartitioned")).scalar()
+    this_month = date.today().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest and oldest.date() < this_month else this_month
+    _create_partition("reservations_default", "DEFAULT")
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        _create_partition(
+            f"reservations_y{month.year:04d}m{month.month:02d}",
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+    op.execute("INSERT INTO reservations SELECT * FROM reservations_unpartitioned")
+    op.execute("DROP TABLE reservations_unpartitioned")
+
+
+def downgrade():
+    op.execute("ALTER TABLE reservations RENAME TO reservations_partitioned")
+    op.execute("ALTER TABLE reservations_partitioned RENAME CONSTRAINT reservations_pkey TO reservations_partitioned_pkey")
+    for index in ("ix_reservations_id", "ix_reservations_club_id_reservation_time", "ix_reservations_user_id_reservation_time"):
+        op.execute(f"ALTER INDEX {index} RENAME TO {index.replace('reservations', 'reservations_partitioned', 1)}")
+
+    op.execute("CREATE TABLE reservations (LIKE reservations_partitioned INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE reservations ADD CONSTRAINT reservations_pkey PRIMARY KEY (id)")
+    op.execute("ALTER TABLE reservations ADD CONSTRAINT reservations_club_id_fkey FOREIGN KEY (club_id) REFERENCES clubs (id)")
+    op.execute("ALTER TABLE reservations ADD CONSTRAINT reservations_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER SEQUENCE reservations_id_seq OWNED BY reservations.id")
+    op.create_index('ix_reservations_id', 'reservations', ['id'])
+    op.create_index('ix_reservations_club_id_reservation_time', 'reservations', ['club_id', 'reservation_time'])
+    op.create_index('ix_reservations_user_id_reservation_time', 'reservations', ['user_id', 'reservation_time'])
+    op.execute(f"""
+        ALTER TABLE reservations
+        ADD CONSTRAINT reservations_no_overlap
+        EXCLUDE USING gist (club_id WITH =, {RESERVATION_RANGE} WITH &&)
+    """)
+
+    # Archived partitions are not copied back; reattach them first if needed
+    op.execute("INSERT INTO reservations SELECT * FROM reservations_partitioned")
+    op.execute("DROP TABLE reservations_partitioned CASCADE")
@@ -0,0 +1,91 @@
+"""Soft-cancel reservations with a status column and active-only indexes
+
+Revision ID: reservation_status_migration
+Revises: reservation_partitioning_migration
+Create Date: 2026-10-17 15:00:00.000000
+
+Cancelled reservations are kept with status = 'cancelled' and their audit
+fields. The club/time index and every partition's overlap constraint are
+rebuilt as partial, covering active reservations only, so the booking path
+never scans cancelled rows. Partitions already detached into the
+reservations_archive schema get the same columns, so they keep the shape
+of the live table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'reservation_status_migration'
+down_revision = 'reservation_partitioning_migration'
+branch_labels = None
+depends_on = None
+
+RESERVATION_RANGE = "tsrange(reservation_time, reservation_time + duration * interval '1 hour')"
+ARCHIVE_SCHEMA = "reservations_archive"
+
+
+def _archived_tables(conn):
+    return [
+        f"{ARCHIVE_SCHEMA}.{name}" for name in conn.execute(sa.text(
+            "SELECT tablename FROM pg_tables WHERE schemaname = :schema AND tablename LIKE 'reservations_y%'"
+        ), {"schema": ARCHIVE_SCHEMA}).scalars()
+    ]
+
+
+def _overlap_constraints(conn):
+    return conn.execute(sa.text("""
+        SELECT conrelid::regclass::text, conname
+        FROM pg_constraint
+        WHERE contype = 'x' AND conname LIKE 'reservations_no_overlap%'
+    """)).all()
+
+
+def _replace_overlap_constraints(where):
+    conn = op.get_bind()
+    for table, name in _overlap_constraints(conn):
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+        op.execute(f"""
+            ALTER TABLE {table}
+            ADD CONSTRAINT {name}
+            EXCLUDE USING gist (club_id WITH =, {RESERVATION_RANGE} WITH &&) {where}
+        """)
+
+
+def upgrade():
+    op.add_column('reservations', sa.Column('status', sa.String(length=9), server_default='active', nullable=False))
+    op.add_column('reservations', sa.Column('cancelled_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.add_column('reservations', sa.Column('cancelled_by_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('reservations_cancelled_by_id_fkey', 'reservations', 'users', ['cancelled_by_id'], ['id'])
+    for table in _archived_tables(op.get_bind()):
+        op.execute(f"""
+            ALTER TABLE {table}
+            ADD COLUMN status varchar(9) NOT NULL DEFAULT 'active',
+            ADD COLUMN cancelled_at timestamptz,
+            ADD COLUMN cancelled_by_id integer
+        """)
+
+    op.drop_index('ix_reservations_club_id_reservation_time', table_name='reservations')
+    op.create_index(
+        'ix_reservations_club_id_reservation_time', 'reservations', ['club_id', 'reservation_time'],
+        postgresql_where=sa.text("status = 'active'")
+    )
+    _replace_overlap_constraints("WHERE (status = 'active')")
+
+
+def downgrade():
+    # Cancelled rows would collide with the unconditional constraints
+    archived = _archived_tables(op.get_bind())
+    op.execute("DELETE FROM reservations WHERE status = 'cancelled'")
+    for table in archived:
+        op.execute(f"DELETE FROM {table} WHERE status = 'cancelled'")
+    _replace_overlap_constraints("")
+
+    op.drop_index('ix_reservations_club_id_reservation_time', table_name='reservations')
+    op.create_index('ix_reservations_club_id_reservation_time', 'reservations', ['club_id', 'reservation_time'])
+
+    op.drop_constraint('reservations_cancelled_by_id_fkey', 'reservations', type_='foreignkey')
+    op.drop_column('reservations', 'cancelled_by_id')
+    op.drop_column('reservations', 'cancelled_at')
+    op.drop_column('reservations', 'status')
+    for table in archived:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN cancelled_by_id, DROP COLUMN cancelled_at, DROP COLUMN status")
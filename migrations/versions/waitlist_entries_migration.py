@@ -0,0 +1,52 @@
+"""Add the waitlist for booked slots
+
+Revision ID: waitlist_entries_migration
+Revises: reservation_status_migration
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'waitlist_entries_migration'
+down_revision = 'reservation_status_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'waitlist_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('club_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('reservation_time', sa.DateTime(), nullable=False),
+        sa.Column('duration', sa.Float(), nullable=False),
+        sa.Column('payment_method', sa.String(length=4), nullable=False),
+        sa.Column('status', sa.String(length=9), server_default='waiting', nullable=False),
+        sa.Column('reservation_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('promoted_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['club_id'], ['clubs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_waitlist_entries_id'), 'waitlist_entries', ['id'], unique=False)
+    op.create_index(op.f('ix_waitlist_entries_user_id'), 'waitlist_entries', ['user_id'], unique=False)
+    op.create_index(
+        'ix_waitlist_entries_club_id_reservation_time', 'waitlist_entries', ['club_id', 'reservation_time'],
+        postgresql_where=sa.text("status = 'waiting'")
+    )
+    op.create_index(
+        'uq_waitlist_entries_waiting_slot', 'waitlist_entries', ['club_id', 'user_id', 'reservation_time'],
+        unique=True, postgresql_where=sa.text("status = 'waiting'")
+    )
+
+
+def downgrade():
+    op.drop_index('uq_waitlist_entries_waiting_slot', table_name='waitlist_entries')
+    op.drop_index('ix_waitlist_entries_club_id_reservation_time', table_name='waitlist_entries')
+    op.drop_index(op.f('ix_waitlist_entries_user_id'), table_name='waitlist_entries')
+    op.drop_index(op.f('ix_waitlist_entries_id'), table_name='waitlist_entries')
+    op.drop_table('waitlist_entries')
@@ -0,0 +1,39 @@
+import sys
+import logging
+
+from app.db.session import engine, Base, SessionLocal
+from app.models.availability import ClubDayAvailability
+from app.services.availability import rebuild_availability_index
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main(club_id=None):
+    # Make sure the index table exists before filling it
+    Base.metadata.create_all(bind=engine, tables=[ClubDayAvailability.__table__])
+    
+    db = SessionLocal()
+    try:
+        if club_id is not None:
+            logger.info(f"Rebuilding availability index for club {club_id}...")
+        else:
+            logger.info("Rebuilding availability index for all clubs...")
+        
+        entries = rebuild_availability_index(db, club_id=club_id)
+        logger.info(f"Availability index rebuilt: {entries} club/day entries")
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rebuilding availability index: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python rebuild_availability_index.py [club_id]
+    club_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    if main(club_id):
+        print("Availability index rebuilt successfully!")
+    else:
+        print("Failed to rebuild availability index. Check logs for details.")
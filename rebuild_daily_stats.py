@@ -0,0 +1,39 @@
+import sys
+import logging
+
+from app.db.session import engine, Base, SessionLocal
+from app.models.stats import ClubDailyStats
+from app.services.stats import rebuild_daily_stats
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main(club_id=None):
+    # Make sure the rollup table exists before filling it
+    Base.metadata.create_all(bind=engine, tables=[ClubDailyStats.__table__])
+    
+    db = SessionLocal()
+    try:
+        if club_id is not None:
+            logger.info(f"Rebuilding daily stats for club {club_id}...")
+        else:
+            logger.info("Rebuilding daily stats for all clubs...")
+        
+        rows = rebuild_daily_stats(db, club_id=club_id)
+        logger.info(f"Daily stats rebuilt: {rows} club/day rows")
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rebuilding daily stats: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python rebuild_daily_stats.py [club_id]
+    club_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    if main(club_id):
+        print("Daily stats rebuilt successfully!")
+    else:
+        print("Failed to rebuild daily stats. Check logs for details.")
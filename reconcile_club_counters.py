@@ -0,0 +1,36 @@
+import sys
+import logging
+
+from app.db.session import SessionLocal
+from app.services.review import reconcile_club_counters
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main(club_id=None):
+    db = SessionLocal()
+    try:
+        if club_id is not None:
+            logger.info(f"Reconciling review and comment counters for club {club_id}...")
+        else:
+            logger.info("Reconciling review and comment counters for all clubs...")
+        
+        corrected = reconcile_club_counters(db, club_id=club_id)
+        logger.info(f"Counters corrected on {corrected} clubs")
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error reconciling club counters: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python reconcile_club_counters.py [club_id]
+    # Run periodically (e.g. nightly) to repair counters after manual edits or deletes.
+    club_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    if main(club_id):
+        print("Club counters reconciled successfully!")
+    else:
+        print("Failed to reconcile club counters. Check logs for details.")
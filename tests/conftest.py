@@ -0,0 +1,66 @@
+import os
+
+# Tests never touch the configured database; the app's engine points at SQLite
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateColumn
+
+from app.db.session import Base
+from app.models import User, Club, Court, Reservation, Review, Comment
+
+
+# The club search vector is a PostgreSQL generated column; SQLite gets a plain column
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_sqlite(element, compiler, **kw):
+    return "TEXT"
+
+
+@compiles(CreateColumn, "sqlite")
+def _create_column_sqlite(element, compiler, **kw):
+    column = element.element
+    if isinstance(column.type, TSVECTOR):
+        return f"{column.name} TEXT"
+    if column.table.name == "reservations" and column.name == "id":
+        # Part of the composite partitioning key, which SQLite cannot autoincrement
+        return "id INTEGER NOT NULL"
+    return compiler.visit_create_column(element, **kw)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Club.__table__, Court.__table__, Reservation.__table__,
+        Review.__table__, Comment.__table__
+    ])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def count_queries(engine):
+    """Returns a callable giving the number of SQL statements run since it was last reset."""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    class Counter:
+        def reset(self):
+            statements.clear()
+
+        @property
+        def count(self):
+            return len(statements)
+
+    return Counter()
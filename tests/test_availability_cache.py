@@ -0,0 +1,55 @@
+from datetime import date
+
+from app.services.availability_cache import BookedMaskCache
+
+DAY = date(2030, 1, 15)
+NEXT_DAY = date(2030, 1, 16)
+
+
+def cache():
+    return BookedMaskCache(max_entries=10, ttl_seconds=60)
+
+
+def test_fill_survives_writes_to_other_keys():
+    booked = cache()
+    generation = booked.generation()
+    booked.invalidate(2, [DAY])
+    booked.patch(1, 1, {NEXT_DAY: 0b1})
+    booked.put(1, DAY, {1: 0b11}, generation)
+    assert booked.get(1, DAY) == {1: 0b11}
+
+
+def test_fill_racing_a_write_to_its_key_is_discarded():
+    booked = cache()
+    generation = booked.generation()
+    booked.patch(1, 1, {DAY: 0b100})
+    booked.put(1, DAY, {1: 0b11}, generation)
+    assert booked.get(1, DAY) is None
+
+    generation = booked.generation()
+    booked.put(1, DAY, {1: 0b111}, generation)
+    assert booked.get(1, DAY) == {1: 0b111}
+
+
+def test_fill_racing_a_club_or_full_invalidation_is_discarded():
+    booked = cache()
+    generation = booked.generation()
+    booked.invalidate_club(1)
+    booked.put(1, DAY, {1: 0b11}, generation)
+    booked.put(2, DAY, {2: 0b11}, generation)
+    assert booked.get(1, DAY) is None
+    assert booked.get(2, DAY) == {2: 0b11}
+
+    generation = booked.generation()
+    booked.clear()
+    booked.put(2, DAY, {2: 0b11}, generation)
+    assert booked.get(2, DAY) is None
+
+
+def test_fill_older_than_forgotten_writes_is_discarded():
+    booked = cache()
+    generation = booked.generation()
+    for club_id in range(2, booked._max_written + 3):
+        booked.invalidate(club_id, [DAY])
+    booked.put(1, DAY, {1: 0b11}, generation)
+    assert booked.get(1, DAY) is None
@@ -0,0 +1,42 @@
+"""Review and comment counters must not touch the club's updated_at."""
+from datetime import datetime
+
+from app.models import User, Club, Review
+from app.schemas.review import ReviewCreate, CommentCreate
+from app.services.review import create_review_service, create_comment_service, reconcile_club_counters
+
+EDITED_AT = datetime(2030, 1, 1, 12)
+
+
+def seed(db):
+    user = User(email="user@example.com", username="user", hashed_password="!")
+    db.add(user)
+    db.flush()
+    club = Club(name="Club", town="Town", telephone="0", hourly_price=10.0, owner_id=user.id, updated_at=EDITED_AT)
+    db.add(club)
+    db.commit()
+    return user, club
+
+
+def updated_at(db, club):
+    db.expire_all()
+    return db.get(Club, club.id).updated_at.replace(tzinfo=None)
+
+
+def test_reviews_and_comments_keep_updated_at(db):
+    user, club = seed(db)
+    create_review_service(db, ReviewCreate(club_id=club.id, rating=4, comment="Good"), user.id)
+    create_comment_service(db, CommentCreate(club_id=club.id, content="Nice"), user.id)
+
+    assert updated_at(db, club) == EDITED_AT
+    assert (club.reviews_count, club.comments_count) == (1, 1)
+
+
+def test_reconcile_keeps_updated_at(db):
+    user, club = seed(db)
+    db.add(Review(club_id=club.id, user_id=user.id, rating=5))
+    db.commit()
+
+    assert reconcile_club_counters(db, club.id) == 1
+    assert updated_at(db, club) == EDITED_AT
+    assert db.get(Club, club.id).reviews_count == 1
@@ -0,0 +1,32 @@
+"""Heatmap hours must add up to the booked durations."""
+from datetime import datetime
+
+import numpy as np
+
+from app.services.heatmap import compute_booked_hours
+
+# Monday 2030-01-14
+MONDAY = datetime(2030, 1, 14)
+
+
+def epoch_minutes(value):
+    return (value - datetime(1970, 1, 1)).total_seconds() / 60
+
+
+def test_partial_quarter_hours_count_only_the_booked_minutes():
+    starts = np.array([epoch_minutes(MONDAY.replace(hour=10, minute=5))])
+    booked = compute_booked_hours(np.array([0]), starts, np.array([1.0]), 1)
+
+    assert booked.sum() == np.float64(1.0)
+    assert np.isclose(booked[0, 0, 10], 55 / 60)
+    assert np.isclose(booked[0, 0, 11], 5 / 60)
+
+
+def test_totals_match_durations():
+    starts = np.array([epoch_minutes(MONDAY.replace(hour=h, minute=m)) for h, m in [(8, 0), (9, 50), (23, 20)]])
+    durations = np.array([1.5, 0.4, 2.0])
+    booked = compute_booked_hours(np.array([0, 1, 1]), starts, durations, 2)
+
+    assert np.allclose(booked.sum(axis=(1, 2)), [1.5, 2.4])
+    # The late booking runs into Tuesday
+    assert np.isclose(booked[1, 1].sum(), 80 / 60)
@@ -0,0 +1,54 @@
+"""Cancelled reservations stay out of the listings unless asked for."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import User, Club, Court, Reservation, PaymentMethodEnum, ReservationStatusEnum
+from app.services.reservation import get_user_reservations_service, get_club_reservations_service
+
+
+@pytest.fixture
+def booked(db):
+    user = User(email="user@example.com", username="user", hashed_password="!")
+    db.add(user)
+    db.flush()
+    club = Club(name="Club", town="Town", telephone="0", hourly_price=10.0, owner_id=user.id)
+    db.add(club)
+    db.flush()
+    court = Court(club_id=club.id, name="Court 1", position=1)
+    db.add(court)
+    db.flush()
+
+    start = datetime.now() + timedelta(days=1)
+    for i, status in enumerate([ReservationStatusEnum.ACTIVE, ReservationStatusEnum.CANCELLED, ReservationStatusEnum.ACTIVE]):
+        db.add(Reservation(
+            id=i + 1,
+            club_id=club.id,
+            court_id=court.id,
+            user_id=user.id,
+            reservation_time=start + timedelta(hours=i),
+            duration=1.0,
+            payment_method=PaymentMethodEnum.CASH,
+            estimated_price=10.0,
+            status=status
+        ))
+    db.commit()
+    return user, club
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+@pytest.mark.parametrize("listing", ["user", "club"])
+def test_listings_leave_out_cancelled_reservations_by_default(db, booked, listing):
+    user, club = booked
+
+    def fetch(**filters):
+        if listing == "user":
+            return get_user_reservations_service(db, user, **filters)[0]
+        return get_club_reservations_service(db, club, **filters)[0]
+
+    assert ids(fetch()) == [1, 3]
+    assert ids(fetch(scope="cancelled")) == [2]
+    assert ids(fetch(scope="all")) == [1, 2, 3]
@@ -0,0 +1,75 @@
+"""The reservation listings must not issue a query per reservation (N+1)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import User, Club, Court, Reservation, PaymentMethodEnum
+from app.services.reservation import decode_cursor, get_user_reservations_service, get_club_reservations_service
+
+
+def seed(db, count):
+    owner = User(email="owner@example.com", username="owner", hashed_password="!")
+    users = [User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="!") for i in range(3)]
+    db.add_all([owner] + users)
+    db.flush()
+
+    clubs = [Club(name=f"Club {i}", town="Town", telephone="0", hourly_price=10.0, owner_id=owner.id) for i in range(3)]
+    db.add_all(clubs)
+    db.flush()
+    courts = [Court(club_id=club.id, name="Court 1", position=1) for club in clubs]
+    db.add_all(courts)
+    db.flush()
+
+    start = datetime(2030, 1, 1, 8)
+    for i in range(count):
+        # The partitioned reservations table has a composite key, so ids are given explicitly
+        db.add(Reservation(
+            id=i + 1,
+            club_id=clubs[i % len(clubs)].id,
+            court_id=courts[i % len(courts)].id,
+            user_id=users[0].id if i % 2 == 0 else users[1].id,
+            reservation_time=start + timedelta(hours=i),
+            duration=1.0,
+            payment_method=PaymentMethodEnum.CASH,
+            estimated_price=10.0
+        ))
+    db.commit()
+
+    # Start from an empty identity map, except for the already-loaded
+    # user or club an endpoint would pass in
+    db.expire_all()
+    db.refresh(users[0])
+    db.refresh(clubs[0])
+    return users[0], clubs[0]
+
+
+@pytest.mark.parametrize("count", [3, 30])
+def test_user_reservations_take_one_query(db, count_queries, count):
+    user, _ = seed(db, count)
+    count_queries.reset()
+    rows, _ = get_user_reservations_service(db, user)
+
+    assert len(rows) == (count + 1) // 2
+    assert all(row["club_name"].startswith("Club") for row in rows)
+    assert count_queries.count == 1
+
+
+@pytest.mark.parametrize("count", [3, 30])
+def test_club_reservations_take_one_query(db, count_queries, count):
+    _, club = seed(db, count)
+    count_queries.reset()
+    rows, _ = get_club_reservations_service(db, club)
+
+    assert len(rows) == (count + 2) // 3
+    assert all(row["user_name"].startswith("user") for row in rows)
+    assert count_queries.count == 1
+
+
+def test_paged_listing_takes_one_query_per_page(db, count_queries):
+    user, _ = seed(db, 30)
+    count_queries.reset()
+    rows, cursor = get_user_reservations_service(db, user, limit=10)
+    assert len(rows) == 10 and cursor is not None
+    rows, cursor = get_user_reservations_service(db, user, limit=10, after=decode_cursor(cursor))
+    assert len(rows) == 5 and cursor is None
+    assert count_queries.count == 2
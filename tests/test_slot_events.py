@@ -0,0 +1,46 @@
+import json
+import threading
+from datetime import date
+
+from app.services import slot_events
+from app.services.availability_cache import BookedMaskCache
+from app.services.slot_events import PostgresSlotEventBackend, SlotEventHub, PROCESS_ID
+
+DAY = date(2030, 1, 15)
+
+
+def notification(origin, club_id=1, days=(DAY,)):
+    return json.dumps({"origin": origin, "club_id": club_id, "days": [day.isoformat() for day in days]})
+
+
+def test_listener_starts_without_subscribers(monkeypatch):
+    listening = threading.Event()
+    monkeypatch.setattr(PostgresSlotEventBackend, "_listen_forever", lambda self: listening.set())
+    hub = SlotEventHub()
+    PostgresSlotEventBackend(hub).start()
+    assert listening.wait(1)
+    assert hub.subscriber_count() == 0
+
+
+def test_change_from_another_worker_invalidates_cache_without_subscribers(monkeypatch):
+    cache = BookedMaskCache(max_entries=10, ttl_seconds=60)
+    monkeypatch.setattr(slot_events, "booked_mask_cache", cache)
+    cache.put(1, DAY, {1: 0b11}, cache.generation())
+    cache.put(2, DAY, {2: 0b11}, cache.generation())
+    backend = PostgresSlotEventBackend(SlotEventHub())
+
+    backend._handle(notification("other-worker"))
+
+    assert cache.get(1, DAY) is None
+    assert cache.get(2, DAY) == {2: 0b11}
+
+
+def test_own_change_keeps_patched_cache_entry(monkeypatch):
+    cache = BookedMaskCache(max_entries=10, ttl_seconds=60)
+    monkeypatch.setattr(slot_events, "booked_mask_cache", cache)
+    cache.put(1, DAY, {1: 0b11}, cache.generation())
+    backend = PostgresSlotEventBackend(SlotEventHub())
+
+    backend._handle(notification(PROCESS_ID))
+
+    assert cache.get(1, DAY) == {1: 0b11}